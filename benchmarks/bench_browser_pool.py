@@ -0,0 +1,50 @@
+# bench_browser_pool.py – Durchsatz des BrowserPools gegen den lokalen Nachbau
+#
+#   python benchmarks/bench_browser_pool.py --firmen 24 --latency 0.5 --sizes 1 2 4
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from browser_pool import BrowserPool  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--firmen", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    firmen = [f"Testfirma {i:03d} GmbH" for i in range(args.firmen)]
+
+    with FixtureServer(latency=args.latency) as server:
+        def suche(page, firma):
+            page.goto(f"{server.url}/sales/search/people")
+            suchfeld = page.locator("input[placeholder='Keywords für Suche']").first
+            suchfeld.fill(f'"{firma}" AND (IT OR HR)')
+            suchfeld.press("Enter")
+            page.wait_for_selector("li.artdeco-list__item")
+            texte = page.locator("li.artdeco-list__item").all_inner_texts()
+            return firma, len(texte)
+
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory() as profil:
+                with BrowserPool(size, profil, headless=True) as pool:
+                    start = time.perf_counter()
+                    ergebnisse = pool.map(suche, firmen)
+                    dauer = time.perf_counter() - start
+
+            assert [r[0] for r in ergebnisse] == firmen, "Reihenfolge der Ergebnisse stimmt nicht"
+            assert all(r[1] > 0 for r in ergebnisse), "Keine Karten gefunden"
+            print(f"Pool-Größe {size}: {len(firmen)} Firmen in {dauer:.1f}s "
+                  f"→ {len(firmen) / dauer * 60:.0f} Firmen/Minute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench_card_extraction.py – Karten-Extraktion pro Karte (viele Round-Trips) gegen ein page.evaluate
+#
+#   python benchmarks/bench_card_extraction.py --karten 25 --wiederholungen 50 [--selenium]
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fixture_server import render_search_page  # noqa: E402
+
+
+def pro_karte_playwright(page):
+    """Bisheriges Vorgehen: inner_text, locator().all() und get_attribute je Karte"""
+    ergebnis = []
+    for card in page.locator("li.artdeco-list__item").all():
+        lines = [l.strip() for l in card.inner_text().strip().split("\n") if l.strip()]
+        link = ""
+        for l in card.locator("a[href*='/sales/lead/']").all():
+            href = l.get_attribute("href")
+            if href and "/sales/lead/" in href:
+                link = urljoin("https://www.linkedin.com", href)
+                break
+        ergebnis.append((lines[:3], link))
+    return ergebnis
+
+
+def pro_karte_selenium(driver):
+    from selenium.webdriver.common.by import By
+
+    ergebnis = []
+    for card in driver.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item"):
+        lines = [l.strip() for l in card.text.strip().split("\n") if l.strip()]
+        link = ""
+        for l in card.find_elements(By.CSS_SELECTOR, "a[href*='/sales/lead/']"):
+            href = l.get_attribute("href")
+            if href and "/sales/lead/" in href:
+                link = href
+                break
+        ergebnis.append((lines[:3], link))
+    return ergebnis
+
+
+def messen(name, func, wiederholungen):
+    func()  # Aufwärmen
+    dauern = []
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        func()
+        dauern.append((time.perf_counter() - start) * 1000)
+    print(f"{name:<32} Median {statistics.median(dauern):7.2f} ms/Firma   p95 "
+          f"{sorted(dauern)[int(len(dauern) * 0.95) - 1]:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--karten", type=int, default=25)
+    parser.add_argument("--wiederholungen", type=int, default=50)
+    parser.add_argument("--selenium", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # testmain_neu legt beim Import Arbeitsverzeichnisse an
+        import testmain_neu as t
+
+        html = render_search_page('"ACME GmbH" AND (IT OR HR)', args.karten)
+        fixture = Path(tmp) / "suche.html"
+        fixture.write_text(html, encoding="utf-8")
+
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            page.set_content(html)
+            print(f"Playwright, {args.karten} Karten:")
+            messen("pro Karte (alt)", lambda: pro_karte_playwright(page), args.wiederholungen)
+            messen("ein page.evaluate (neu)", lambda: t.extract_cards_playwright(page), args.wiederholungen)
+            browser.close()
+
+        if args.selenium:
+            from selenium import webdriver
+
+            options = webdriver.ChromeOptions()
+            options.add_argument("--headless=new")
+            driver = webdriver.Chrome(options=options)
+            driver.get(fixture.as_uri())
+            print(f"\nSelenium, {args.karten} Karten:")
+            messen("pro Karte (alt)", lambda: pro_karte_selenium(driver), args.wiederholungen)
+            messen("ein execute_script (neu)", lambda: t.extract_cards_selenium(driver), args.wiederholungen)
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
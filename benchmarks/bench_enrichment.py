@@ -0,0 +1,156 @@
+# bench_enrichment.py – End-to-End-Durchsatz von run_enrichment gegen den lokalen Sales-Navigator-Nachbau
+#
+# Startet benchmarks/fixture_server.py, leitet testmain_neu per SALESNAV_BASE_URL dorthin um und
+# misst Firmen/Minute, Latenz je Phase (p50/p95) und Spitzen-RSS – für Playwright und Selenium
+# jeweils in einem eigenen Prozess, da das Backend beim Import festgelegt wird. Dazu kommen
+# Micro-Benchmarks für load_csv, detect_delimiter und detect_firmenspalte. Mit --assets lädt die
+# Suchseite Bilder, Webfont, Video und Tracking-Skript; Anfragen und Bytes je Firma zeigen dann, was
+# die Ressourcen-Politik spart (--ohne-blockieren schaltet sie zum Vergleich ab).
+#
+#   python benchmarks/bench_enrichment.py --firmen 40 --latency 0.2 --results 10 --backend both
+#   python benchmarks/bench_enrichment.py --backend playwright --pool 4
+#   python benchmarks/bench_enrichment.py --backend playwright --assets [--ohne-blockieren]
+#   python benchmarks/bench_enrichment.py --backend none          # nur Micro-Benchmarks
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fixture_server import FixtureServer  # noqa: E402
+from phasen import PhasenStatistik, add_observer  # noqa: E402
+
+ROLLEN = ["IT", "HR", "GF"]
+
+
+def erzeuge_csv(path, firmen, duplikate=0):
+    """Aussteller-Liste mit Semikolon; jede n-te Zeile wiederholt eine Firma in anderer Schreibweise"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nr", "Aussteller", "Halle", "Stand", "Ort"])
+        nr = 0
+        for i in range(firmen):
+            nr += 1
+            writer.writerow([nr, f"Testfirma {i:04d} GmbH", f"Halle {i % 12 + 1}", f"{i % 900 + 1}", "Köln"])
+            if duplikate and i % duplikate == 0:
+                nr += 1
+                writer.writerow([nr, f"TESTFIRMA {i:04d} gmbh", f"Halle {i % 12 + 1}", "A1", "Köln"])
+
+
+def spitzen_rss_mb(wer):
+    # ru_maxrss ist unter Linux in KB, unter macOS in Bytes
+    rss = resource.getrusage(wer).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def ende_zu_ende(args):
+    """Läuft in einem Prozess je Backend: Umgebung setzen, testmain_neu importieren, run_enrichment messen"""
+    with FixtureServer(latency=args.latency, results=args.results, assets=args.assets) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "SALESNAV_BASE_URL": server.url,
+            "SALESNAV_SKIP_WAITS": "0" if args.mit_wartezeiten else "1",
+            "BROWSER_HEADLESS": "0" if args.sichtbar else "1",
+            "BROWSER_BACKEND": args.backend,
+            "BROWSER_POOL_SIZE": str(args.pool),
+        })
+        if args.ohne_blockieren:
+            os.environ.update({"BLOCK_RESOURCE_TYPES": "", "BLOCK_URL_PATTERNS": ""})
+        os.chdir(tmp)  # testmain_neu legt beim Import Arbeitsverzeichnisse, Cache und Job-DB an
+        import testmain_neu as t
+
+        backend = "selenium" if t.USE_SELENIUM else "playwright"
+        if backend != args.backend:
+            raise SystemExit(f"❌ Backend {args.backend} nicht verfügbar (importiert wurde {backend})")
+
+        eingabe = Path(tmp) / "aussteller.csv"
+        erzeuge_csv(eingabe, args.firmen, args.duplikate)
+
+        statistik = add_observer(PhasenStatistik())
+        start = time.perf_counter()
+        ergebnis = t.run_enrichment(str(eingabe), ROLLEN, refresh_cache=True)
+        dauer = time.perf_counter() - start
+
+        with open(ergebnis, encoding="utf-8") as f:
+            kontakte = sum(1 for row in csv.DictReader(f, delimiter=";") if row.get("Name 1"))
+        anfragen, bytes_gesendet = server.anfragen, server.bytes_gesendet
+
+    pool = f", Pool {args.pool}" if backend == "playwright" and args.pool > 1 else ""
+    print(f"\n=== {backend}{pool}: {args.firmen} Firmen, Latenz {args.latency}s, {args.results} Karten/Suche ===")
+    print(f"Dauer {dauer:.1f}s → {args.firmen / dauer * 60:.1f} Firmen/Minute, {kontakte} Zeilen mit Kontakt")
+    print(f"Server: {anfragen / args.firmen:.1f} Anfragen und {bytes_gesendet / args.firmen / 1024:.0f} KB je Firma"
+          f"{' (ohne Blockieren)' if args.ohne_blockieren else ''}")
+    print(f"{'Phase':<18} {'Anzahl':>7} {'p50 ms':>9} {'p95 ms':>9} {'Summe s':>9}")
+    for name, werte in sorted(statistik.zusammenfassung().items()):
+        print(f"{name:<18} {werte['anzahl']:>7} {werte['p50'] * 1000:>9.1f} {werte['p95'] * 1000:>9.1f} "
+              f"{werte['summe']:>9.2f}")
+    # Kindprozesse (Treiber, Browser) zählen erst, wenn sie beendet und eingesammelt sind
+    print(f"Spitzen-RSS: Python {spitzen_rss_mb(resource.RUSAGE_SELF):.0f} MB, "
+          f"größter Kindprozess {spitzen_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB")
+
+
+def micro(args):
+    """timeit-Micro-Benchmarks der CSV-Hilfsfunktionen"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import testmain_neu as t
+
+        eingabe = Path(tmp) / "aussteller.csv"
+        erzeuge_csv(eingabe, args.micro_zeilen, duplikate=7)
+        encoding = t.detect_encoding(eingabe)
+        headers, _, _ = t.stream_csv(eingabe, encoding=encoding)
+        kandidaten = {
+            "load_csv": (lambda: t.load_csv(eingabe), 5),
+            "detect_delimiter": (lambda: t.detect_delimiter(eingabe, encoding), 200),
+            "detect_firmenspalte": (lambda: t.detect_firmenspalte(headers), 10000),
+        }
+
+        print(f"\n=== Micro-Benchmarks ({args.micro_zeilen} Zeilen) ===")
+        for name, (func, anzahl) in kandidaten.items():
+            with contextlib.redirect_stdout(io.StringIO()):  # Diagnose-Ausgaben der Funktionen
+                bestes = min(timeit.repeat(func, number=anzahl, repeat=5)) / anzahl
+            print(f"{name:<22} {bestes * 1e6:12.1f} µs/Aufruf")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["playwright", "selenium", "both", "none"], default="both")
+    parser.add_argument("--firmen", type=int, default=40)
+    parser.add_argument("--duplikate", type=int, default=0, help="jede n-te Firma doppelt (0 = keine)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Serverlatenz pro Suche in Sekunden")
+    parser.add_argument("--results", type=int, default=10, help="Ergebniskarten pro Suche")
+    parser.add_argument("--pool", type=int, default=1, help="BROWSER_POOL_SIZE (nur Playwright)")
+    parser.add_argument("--mit-wartezeiten", action="store_true", help="bewusste Wartezeiten nicht überspringen")
+    parser.add_argument("--sichtbar", action="store_true", help="Browser nicht headless starten")
+    parser.add_argument("--assets", action="store_true", help="Suchseite mit Bildern, Webfont, Video, Tracking")
+    parser.add_argument("--ohne-blockieren", action="store_true", help="Ressourcen-Politik abschalten")
+    parser.add_argument("--micro-zeilen", type=int, default=20000)
+    parser.add_argument("--ohne-micro", action="store_true")
+    args = parser.parse_args()
+
+    if args.backend == "both":
+        weitergeben = ["--firmen", str(args.firmen), "--duplikate", str(args.duplikate),
+                       "--latency", str(args.latency), "--results", str(args.results), "--pool", str(args.pool)]
+        weitergeben += ["--mit-wartezeiten"] * args.mit_wartezeiten + ["--sichtbar"] * args.sichtbar
+        weitergeben += ["--assets"] * args.assets + ["--ohne-blockieren"] * args.ohne_blockieren
+        for backend in ("playwright", "selenium"):
+            subprocess.run([sys.executable, __file__, *weitergeben, "--backend", backend, "--ohne-micro"])
+    elif args.backend != "none":
+        ende_zu_ende(args)
+
+    if not args.ohne_micro:
+        micro(args)
+
+
+if __name__ == "__main__":
+    main()
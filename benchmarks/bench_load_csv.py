@@ -0,0 +1,93 @@
+# bench_load_csv.py – Streaming-CSV-Reader gegen das bisherige load_csv (Zeit und Spitzen-Speicher)
+#
+#   python benchmarks/bench_load_csv.py --mb 200
+
+import argparse
+import codecs
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def legacy_load_csv(file_path, detect_encoding, detect_delimiter):
+    """Bisheriges load_csv (ganze Datei lesen, str.split) als Referenz"""
+    encoding = detect_encoding(file_path, sample_size=os.path.getsize(file_path))
+    delimiter = detect_delimiter(file_path, encoding)
+    with codecs.open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        lines = f.read().splitlines()
+    headers = [h.strip() for h in lines[0].split(delimiter)]
+    headers = [h for h in headers if h]
+    rows = []
+    for line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+        values = line.split(delimiter)
+        values = (values + [''] * len(headers))[:len(headers)]
+        rows.append({headers[j]: values[j].strip() for j in range(len(headers))})
+    return headers, rows, delimiter
+
+
+def erzeuge_csv(path, ziel_mb):
+    """Aussteller-Export mit Semikolon, Umlauten, quotierten Trennzeichen und mehrzeiligen Zellen"""
+    rnd = random.Random(42)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nr", "Aussteller", "Halle", "Stand", "Ort", "Beschreibung"])
+        i = 0
+        while f.tell() < ziel_mb * 1024 * 1024:
+            i += 1
+            writer.writerow([
+                i, f"Müller & Söhne {i % 5000} GmbH", f"Halle {rnd.randint(1, 12)}", f"{rnd.randint(1, 900)}",
+                "Köln; Deutschland", "Zeile eins\nZeile zwei" if i % 50 == 0 else "Maschinenbau, Logistik",
+            ])
+
+
+def messen(name, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ergebnis = func()
+    dauer = time.perf_counter() - start
+    _, spitze = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<38} {dauer:8.2f}s   Spitze {spitze / 1024 / 1024:8.1f} MB   {ergebnis}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # testmain_neu legt beim Import Arbeitsverzeichnisse an
+        import testmain_neu as t
+
+        path = Path(tmp) / "aussteller.csv"
+        erzeuge_csv(path, args.mb)
+        print(f"Testdatei: {path.stat().st_size / 1024 / 1024:.0f} MB\n")
+
+        def erste_zeile():
+            _, zeilen, _ = t.stream_csv(path)
+            next(zeilen)
+            return "1 Zeile"
+
+        def alle_zeilen_gestreamt():
+            _, zeilen, _ = t.stream_csv(path)
+            return f"{sum(1 for _ in zeilen)} Zeilen"
+
+        messen("stream_csv: erste Zeile", erste_zeile)
+        messen("stream_csv: alle Zeilen (lazy)", alle_zeilen_gestreamt)
+        messen("load_csv (neu, materialisiert)", lambda: f"{len(t.load_csv(path)[1])} Zeilen")
+        messen("load_csv (alt, f.read + split)",
+               lambda: f"{len(legacy_load_csv(path, t.detect_encoding, t.detect_delimiter)[1])} Zeilen")
+
+
+if __name__ == "__main__":
+    main()
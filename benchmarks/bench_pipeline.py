@@ -0,0 +1,121 @@
+# bench_pipeline.py – Speicherbedarf von run_enrichment über die Zeilenzahl der Eingabe
+#
+# Erzeugt synthetische CSV-Dateien (Zeilen verteilen sich auf eine feste Zahl von Firmen) und lässt
+# run_enrichment mit einem Stub-Scraper ohne Browser laufen – je Größe in einem eigenen Prozess.
+# Gemessen wird der aktuelle RSS (alle 0,1 s aus /proc/self/statm) und der Spitzenwert; bleibt die
+# Pipeline flach, ist der RSS bei 1 Mio. Zeilen nicht höher als bei 10.000 und wächst während des
+# Laufs nicht weiter (Anstieg = Maximum der zweiten Laufhälfte minus Maximum der ersten).
+#
+#   python benchmarks/bench_pipeline.py
+#   python benchmarks/bench_pipeline.py --zeilen 10000 100000 1000000 --firmen 5000
+
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+SEITE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_mb():
+    """Aktueller RSS; ohne /proc der Spitzenwert"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * SEITE / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def eingabe_erzeugen(pfad, zeilen, firmen):
+    with open(pfad, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nr", "Aussteller", "Halle", "Stand", "Land"])
+        for i in range(zeilen):
+            writer.writerow([i + 1, f"Testfirma {i % firmen:06d} GmbH", f"Halle {i % 12}", f"{i % 400}", "DE"])
+
+
+def messen(args):
+    """Läuft im eigenen Prozess: eine Eingabegröße, RSS-Verlauf während run_enrichment"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.setdefault("SALESNAV_SKIP_WAITS", "1")
+        import testmain_neu as t
+
+        def stub_scrape(page, firma, matcher, rollen):
+            return [{"Name": f"Kontakt {firma}", "Position": "IT-Leitung",
+                     "LinkedIn Profil": "https://www.linkedin.com/sales/lead/1"}]
+
+        t.scrape_firma = stub_scrape
+        t.start_browser = lambda *a, **k: ("STUB", None, None)
+        t.perform_login = lambda browser: True
+        t.close_browser = lambda *a: None
+
+        eingabe = Path(tmp) / "messe.csv"
+        eingabe_erzeugen(eingabe, args.zeilen, args.firmen)
+        groesse = eingabe.stat().st_size / 2**20
+
+        verlauf = []
+        fertig = threading.Event()
+
+        def abtasten():
+            start = time.perf_counter()
+            while not fertig.is_set():
+                verlauf.append((time.perf_counter() - start, rss_mb()))
+                fertig.wait(0.1)
+
+        basis = rss_mb()
+        sampler = threading.Thread(target=abtasten, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        with open(os.devnull, "w") as stille, redirect_stdout(stille):
+            t.run_enrichment(str(eingabe), ["IT"], refresh_cache=True)
+        dauer = time.perf_counter() - start
+        fertig.set()
+        sampler.join()
+
+    mitte = dauer / 2
+    erste = max((r for s, r in verlauf if s <= mitte), default=basis)
+    zweite = max((r for s, r in verlauf if s > mitte), default=erste)
+    spitze = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"ERGEBNIS {args.zeilen} {groesse:.1f} {dauer:.2f} {basis:.1f} {max(erste, zweite):.1f} "
+          f"{zweite - erste:.1f} {spitze:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zeilen", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--firmen", type=int, default=5000, help="eindeutige Firmen in der Eingabe")
+    parser.add_argument("--messen", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.messen:
+        args.zeilen = args.zeilen[0]
+        messen(args)
+        return
+
+    umgebung = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.getenv("PYTHONPATH")]))}
+    print(f"\n=== Stub-Scraper, {args.firmen} eindeutige Firmen ===")
+    print(f"{'Zeilen':>10} {'CSV MB':>8} {'Sekunden':>9} {'Zeilen/s':>10} {'RSS Start':>10} "
+          f"{'RSS max':>8} {'Anstieg':>8} {'Spitze':>8}")
+    for zeilen in args.zeilen:
+        ausgabe = subprocess.run([sys.executable, __file__, "--messen", "--zeilen", str(zeilen),
+                                  "--firmen", str(args.firmen)],
+                                 env=umgebung, capture_output=True, text=True, check=True).stdout
+        werte = ausgabe.rsplit("ERGEBNIS ", 1)[1].split()
+        groesse, dauer, basis, maximum, anstieg, spitze = map(float, werte[1:])
+        print(f"{zeilen:>10} {groesse:>8.1f} {dauer:>9.1f} {zeilen / dauer:>10.0f} {basis:>8.1f}MB "
+              f"{maximum:>6.1f}MB {anstieg:>+6.1f}MB {spitze:>6.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_replay.py – Wiedergabe aufgezeichneter Trefferlisten: Firmen pro Sekunde und Speicherbedarf
+#
+# Legt synthetische Trefferlisten (Karten wie im lokalen Nachbau, benchmarks/fixture_server.py) in
+# einer temporären Ablage ab und wertet sie mit aufnahmen.wiedergeben neu aus – einmal in einem
+# Prozess, einmal auf allen Kernen. Zum Vergleich: live dauert eine Firma mit Wartezeiten 10–20 s.
+#
+#   python benchmarks/bench_replay.py --firmen 5000 --karten 25
+#   python benchmarks/bench_replay.py --prozesse 1 2 4 8
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fixture_server import render_cards  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--firmen", type=int, default=5000)
+    parser.add_argument("--karten", type=int, default=25, help="Karten pro Trefferliste")
+    parser.add_argument("--prozesse", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        with redirect_stdout(open(os.devnull, "w")):
+            import testmain_neu as t
+        from aufnahmen import AufnahmeSpeicher, wiedergeben
+
+        speicher = AufnahmeSpeicher(Path(tmp) / "snapshots")
+        start = time.perf_counter()
+        for i in range(args.firmen):
+            suche = f'"Testfirma {i:05d} GmbH" AND (IT-Leitung OR CIO)'
+            speicher.ablegen(f"Testfirma {i:05d} GmbH", ["IT"], render_cards(suche, args.karten), suche=suche)
+        ablegen = time.perf_counter() - start
+        stats = speicher.stats()
+
+        print(f"\n=== {args.firmen} Trefferlisten à {args.karten} Karten ===")
+        print(f"Ablegen: {args.firmen / ablegen:,.0f} Firmen/s, {stats['bytes_roh'] / 2**20:.1f} MB HTML → "
+              f"{stats['bytes_gespeichert'] / 2**20:.1f} MB gespeichert "
+              f"({stats['bytes_roh'] / max(stats['bytes_gespeichert'], 1):.1f}×)")
+        print(f"{'Prozesse':>9} {'Sekunden':>9} {'Firmen/s':>10} {'Kontakte':>9}")
+        for prozesse in args.prozesse:
+            start = time.perf_counter()
+            with redirect_stdout(open(os.devnull, "w")):
+                kontakte = sum(len(k) for _, k in wiedergeben(speicher, t.kontakte_aus_html, prozesse=prozesse))
+            dauer = time.perf_counter() - start
+            print(f"{prozesse:>9} {dauer:>9.2f} {args.firmen / dauer:>10,.0f} {kontakte:>9}")
+        speicher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_rollen_matcher.py – Kompilierter RollenMatcher gegen Teilstring-Suche über alle Stichworte
+#
+#   python benchmarks/bench_rollen_matcher.py --titel 200000 --extra-stichworte 500
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from rollen_matcher import RollenMatcher  # noqa: E402
+
+BAUSTEINE = [
+    "Leitung", "Head of", "Senior", "Junior", "Teamleitung", "Sachbearbeiter", "Referent", "Manager",
+    "Vertrieb", "Einkauf", "Personal", "Marketing", "IT", "Produktion", "Logistik", "Controlling",
+    "Buchhaltung", "Geschäftsführer", "Werkstudent", "Kundenservice", "Qualität", "E-Commerce",
+    "SAP", "Recruiting", "Lager", "Projektleitung", "CIO", "CFO", "Assistenz", "Datenschutz",
+]
+
+
+def position_relevant(pos_text, relevante_keywords):
+    """Bisheriger Filter: Teilstring-Suche über alle Stichworte"""
+    if not relevante_keywords:
+        return True
+    text = pos_text.lower()
+    return any(kw in text for kw in relevante_keywords)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titel", type=int, default=200000)
+    parser.add_argument("--extra-stichworte", type=int, default=0,
+                        help="zusätzliche synthetische Stichworte für große Taxonomien")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # testmain_neu legt beim Import Arbeitsverzeichnisse an
+        import testmain_neu as t
+
+    rollen = list(t.POSITIONEN)
+    rnd = random.Random(1)
+    stichworte = [kw for r in rollen for kw in t.POSITIONEN[r] + t.ALLE_ROLLEN_STICHWORTE[r]]
+    stichworte += [f"{rnd.choice(BAUSTEINE)}spezialist{i}" for i in range(args.extra_stichworte)]
+    titel = [" ".join(rnd.sample(BAUSTEINE, rnd.randint(1, 3))) for _ in range(args.titel)]
+    print(f"{len(titel)} Positionstitel, {len(stichworte)} Stichworte\n")
+
+    alt_keywords = [kw.lower() for kw in stichworte]
+    start = time.perf_counter()
+    alt_treffer = sum(position_relevant(p, alt_keywords) for p in titel)
+    alt_dauer = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = RollenMatcher(stichworte)
+    kompiliert = time.perf_counter() - start
+    start = time.perf_counter()
+    neu_treffer = sum(matcher.score(p) > 0 for p in titel)
+    neu_dauer = time.perf_counter() - start
+
+    print(f"Teilstring any() (alt)  {alt_dauer:7.2f}s  {len(titel) / alt_dauer:10.0f} Titel/s  {alt_treffer} relevant")
+    print(f"RollenMatcher (neu)     {neu_dauer:7.2f}s  {len(titel) / neu_dauer:10.0f} Titel/s  {neu_treffer} relevant"
+          f"  (Kompilieren {kompiliert * 1000:.1f} ms)")
+
+    it_matcher = RollenMatcher(t.POSITIONEN["IT"])
+    falsch = "Leitung Vertrieb"
+    print(f"\n'{falsch}' für Rolle IT: alt {position_relevant(falsch, [k.lower() for k in t.POSITIONEN['IT']])}, "
+          f"neu {it_matcher.score(falsch) > 0}")
+
+
+if __name__ == "__main__":
+    main()
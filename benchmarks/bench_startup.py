@@ -0,0 +1,125 @@
+# bench_startup.py – Serverstart und Zeit bis zum ersten Ergebnis, kalt gegen vorgewärmt
+#
+# Misst die Importzeit von testmain_neu (= Start des Servers ohne Uvicorn) in frischen Prozessen.
+# Mit Backend kommt die Zeit bis zur ersten fertigen Firma gegen den lokalen Nachbau
+# (benchmarks/fixture_server.py) dazu: "kalt" startet Browser und Login erst mit dem Job, "warm"
+# wartet vorher auf die beim Start vorgewärmte Sitzung (BROWSER_WARM_START) – je in eigenem Prozess.
+#
+#   python benchmarks/bench_startup.py --wiederholungen 10
+#   python benchmarks/bench_startup.py --backend playwright --importtime
+
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+IMPORT_MESSUNG = (
+    "import time; t = time.perf_counter(); import testmain_neu; "
+    "print(f'IMPORT {time.perf_counter() - t:.6f}')"
+)
+
+
+def _umgebung(**extra):
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC), os.getenv("PYTHONPATH")])),
+            **extra}
+
+
+def importzeit(args):
+    """Importzeit und Prozess-Gesamtzeit über mehrere frische Interpreter"""
+    importe, gesamt = [], []
+    for _ in range(args.wiederholungen):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            ausgabe = subprocess.run([sys.executable, "-c", IMPORT_MESSUNG], cwd=tmp, env=_umgebung(),
+                                     capture_output=True, text=True, check=True).stdout
+            gesamt.append(time.perf_counter() - start)
+        importe.append(float(ausgabe.rsplit("IMPORT ", 1)[1]))
+    print(f"\n=== Serverstart ({args.wiederholungen} Prozesse) ===")
+    print(f"import testmain_neu   Median {statistics.median(importe) * 1000:8.1f} ms, "
+          f"bestes {min(importe) * 1000:8.1f} ms")
+    print(f"Prozess gesamt        Median {statistics.median(gesamt) * 1000:8.1f} ms")
+
+    if args.importtime:
+        with tempfile.TemporaryDirectory() as tmp:
+            fehler = subprocess.run([sys.executable, "-X", "importtime", "-c", "import testmain_neu"], cwd=tmp,
+                                    env=_umgebung(), capture_output=True, text=True).stderr
+        zeilen = []
+        for zeile in fehler.splitlines():
+            if not zeile.startswith("import time:") or "|" not in zeile:
+                continue
+            _, kumuliert, modul = zeile[len("import time:"):].split("|")
+            if kumuliert.strip().isdigit():
+                zeilen.append((int(kumuliert), modul.strip()))
+        print(f"\n{'Modul (kumuliert)':<40} {'ms':>8}")
+        for mikro, modul in sorted(zeilen, reverse=True)[:args.importtime_top]:
+            print(f"{modul:<40} {mikro / 1000:>8.1f}")
+
+
+def erste_firma(args):
+    """Läuft im eigenen Prozess: Zeit von Serverstart bzw. Job-Start bis zur ersten fertigen Firma"""
+    from fixture_server import FixtureServer
+
+    with FixtureServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "SALESNAV_BASE_URL": server.url,
+            "SALESNAV_SKIP_WAITS": "1",
+            "BROWSER_HEADLESS": "1",
+            "BROWSER_BACKEND": args.backend,
+            "BROWSER_POOL_SIZE": str(args.pool),
+        })
+        os.chdir(tmp)
+        serverstart = time.perf_counter()
+        import testmain_neu as t
+
+        vorwaermen = None
+        if args.modus == "warm":
+            t.firmen_scheduler.vorwaermen()
+            t.firmen_scheduler.warten_bis_bereit()
+            vorwaermen = time.perf_counter() - serverstart
+
+        eingabe = Path(tmp) / "eine_firma.csv"
+        with open(eingabe, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f, delimiter=";").writerows([["Aussteller"], ["Testfirma 0001 GmbH"]])
+        start = time.perf_counter()
+        t.run_enrichment(str(eingabe), ["IT"], refresh_cache=True, scheduler=t.firmen_scheduler)
+        erste = time.perf_counter() - start
+        t.firmen_scheduler.stop()
+
+    print(f"\n=== {args.backend}, {args.modus} ===")
+    if vorwaermen is not None:
+        print(f"Serverstart bis Sitzung bereit  {vorwaermen:8.2f} s (im Hintergrund, vor dem ersten Job)")
+    print(f"Job-Start bis erste Firma       {erste:8.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["playwright", "selenium", "none"], default="none")
+    parser.add_argument("--wiederholungen", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="teuerste Importe auflisten (-X importtime)")
+    parser.add_argument("--importtime-top", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.2, help="Serverlatenz pro Suche in Sekunden")
+    parser.add_argument("--pool", type=int, default=1, help="BROWSER_POOL_SIZE (nur Playwright)")
+    parser.add_argument("--modus", choices=["kalt", "warm"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modus:
+        erste_firma(args)
+        return
+
+    importzeit(args)
+    if args.backend != "none":
+        for modus in ("kalt", "warm"):
+            subprocess.run([sys.executable, __file__, "--backend", args.backend, "--pool", str(args.pool),
+                            "--latency", str(args.latency), "--modus", modus])
+
+
+if __name__ == "__main__":
+    main()
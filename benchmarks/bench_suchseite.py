@@ -0,0 +1,94 @@
+# bench_suchseite.py – Latenz je Firma: Suchseite neu laden gegen Suche auf der offenen Seite
+#
+# Beide Varianten laufen mit Playwright gegen den lokalen Nachbau (benchmarks/fixture_server.py),
+# ohne menschliche Wartezeiten. "neu laden" ist der bisherige Ablauf (goto, tippen, Enter, auf
+# Karten warten), "offen" nutzt SuchSeite. Die bisher fest eingeplanten 2 × 3–5 s je Firma
+# (nach dem Laden und nach dem Abschicken) entfallen zusätzlich und sind nicht mitgemessen.
+#
+#   python benchmarks/bench_suchseite.py --firmen 30 --latency 0.2 --shell-kb 2000
+#   python benchmarks/bench_suchseite.py --spa --assets
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fixture_server import FixtureServer  # noqa: E402
+from suchseite import SuchSeite  # noqa: E402
+
+SUCHFELD = "input[placeholder='Keywords für Suche']"
+KARTEN = "li.artdeco-list__item"
+FESTE_WARTEZEIT = 2 * 4.0  # Mittelwert der bisherigen 2 × 3–5 s
+
+
+def neu_laden(page, url, suche):
+    """Bisheriger Ablauf ohne feste Wartezeiten"""
+    page.goto(url)
+    suchfeld = page.locator(SUCHFELD).first
+    suchfeld.wait_for(state="visible", timeout=5000)
+    suchfeld.focus()
+    suchfeld.fill("")
+    for char in suche:
+        suchfeld.type(char)
+    page.keyboard.press("Enter")
+    page.wait_for_load_state()
+    page.wait_for_selector(KARTEN, state="attached", timeout=10000)
+
+
+def messen(page, url, firmen, variante):
+    seite = SuchSeite(page, url, SUCHFELD, KARTEN)
+    zeiten = []
+    for i in range(firmen):
+        suche = f'"Testfirma {i:04d} GmbH" AND (IT-Leitung OR CIO)'
+        start = time.perf_counter()
+        if variante == "offen":
+            seite.bereit()
+            seite.suchen(suche)
+        else:
+            neu_laden(page, url, suche)
+        zeiten.append(time.perf_counter() - start)
+    return zeiten, seite.neu_geladen
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--firmen", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="Serverlatenz pro Suche in Sekunden")
+    parser.add_argument("--spa", action="store_true", help="Suche lädt nur die Trefferliste nach (wie das Original)")
+    parser.add_argument("--shell-kb", type=int, default=1000, help="Größe des simulierten App-Skripts")
+    parser.add_argument("--assets", action="store_true", help="Bilder, Webfont, Video und Tracking-Skript mitladen")
+    args = parser.parse_args()
+
+    from playwright.sync_api import sync_playwright
+
+    with FixtureServer(latency=args.latency, assets=args.assets, spa=args.spa, shell_kb=args.shell_kb) as server, \
+            tempfile.TemporaryDirectory() as profil, sync_playwright() as p:
+        context = p.chromium.launch_persistent_context(profil, headless=True)
+        page = context.new_page()
+        url = f"{server.url}/sales/search/people"
+        ergebnisse = {}
+        for variante in ("neu laden", "offen"):
+            messen(page, url, 2, variante)  # Aufwärmen (Browser-Cache, JIT)
+            anfragen, gesendet = server.anfragen, server.bytes_gesendet
+            zeiten, geladen = messen(page, url, args.firmen, variante)
+            ergebnisse[variante] = (zeiten, geladen, server.anfragen - anfragen, server.bytes_gesendet - gesendet)
+        context.close()
+
+    modus = "SPA" if args.spa else "Navigation"
+    print(f"\n=== {args.firmen} Firmen, {modus}, Latenz {args.latency}s, App-Skript {args.shell_kb} KB ===")
+    print(f"{'Variante':<12} {'p50 ms':>9} {'p95 ms':>9} {'Anfr./Firma':>12} {'KB/Firma':>9} {'Seitenladungen':>15}")
+    for variante, (zeiten, geladen, anfragen, gesendet) in ergebnisse.items():
+        p95 = statistics.quantiles(zeiten, n=20)[-1] if len(zeiten) > 1 else zeiten[0]
+        print(f"{variante:<12} {statistics.median(zeiten) * 1000:>9.1f} {p95 * 1000:>9.1f} "
+              f"{anfragen / args.firmen:>12.1f} {gesendet / args.firmen / 1024:>9.0f} "
+              f"{geladen if variante == 'offen' else args.firmen:>15}")
+    gespart = statistics.median(ergebnisse["neu laden"][0]) - statistics.median(ergebnisse["offen"][0])
+    print(f"Gespart je Firma: {gespart * 1000:.0f} ms gemessen + ~{FESTE_WARTEZEIT:.0f} s feste Wartezeit")
+
+
+if __name__ == "__main__":
+    main()
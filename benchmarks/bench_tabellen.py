@@ -0,0 +1,143 @@
+# bench_tabellen.py – .xlsx und .ods zeilenweise lesen: Zeit und Spitzen-Speicher über die Zeilenzahl
+#
+# Erzeugt Arbeitsmappen wie ein typischer Aussteller-Export (Titelzeile, Leerzeile, Kopf in Zeile 3,
+# ein vorangestelltes Info-Blatt; .xlsx mit sharedStrings und Datumsformat, .ods mit hunderttausendfach
+# wiederholten Leerzeilen am Ende) und liest das Blatt "Aussteller" mit stream_tabelle. Die Spitze
+# soll nicht mit den Zeilen wachsen – nur mit der Zahl verschiedener Texte (sharedStrings der .xlsx).
+#
+#   python benchmarks/bench_tabellen.py
+#   python benchmarks/bench_tabellen.py --zeilen 10000 100000 --firmen 5000
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from tabellen import stream_tabelle  # noqa: E402
+
+TITEL = "Ausstellerliste Messe 2026"
+KOPF = ["Nr", "Aussteller", "Halle", "Stand", "Angemeldet", "Beschreibung"]
+
+
+def _datensatz(i, firmen):
+    return [i, f"Müller & Söhne {i % firmen} GmbH", f"Halle {i % 12 + 1}", f"{i % 900 + 1}",
+            45000 + i % 365, "Maschinenbau, Logistik" if i % 50 else "Zeile eins\nZeile zwei"]
+
+
+def erzeuge_xlsx(pfad, zeilen, firmen):
+    texte = {}
+
+    def text(wert):
+        return texte.setdefault(wert, len(texte))
+
+    def spalte(j):
+        return "ABCDEFGHIJ"[j]
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel_ns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    with zipfile.ZipFile(pfad, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("xl/worksheets/sheet2.xml", "w") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?><worksheet {ns}><sheetData>'.encode())
+            f.write(f'<row r="1"><c r="A1" t="s"><v>{text(TITEL)}</v></c></row>'.encode())
+            kopf = "".join(f'<c r="{spalte(j)}3" t="s"><v>{text(h)}</v></c>' for j, h in enumerate(KOPF))
+            f.write(f'<row r="3">{kopf}</row>'.encode())
+            for i in range(1, zeilen + 1):
+                nr = i + 3
+                nummer, firma, halle, stand, datum, beschreibung = _datensatz(i, firmen)
+                f.write((f'<row r="{nr}"><c r="A{nr}"><v>{nummer}</v></c>'
+                         f'<c r="B{nr}" t="s"><v>{text(firma)}</v></c><c r="C{nr}" t="s"><v>{text(halle)}</v></c>'
+                         f'<c r="D{nr}" t="s"><v>{text(stand)}</v></c><c r="E{nr}" s="1"><v>{datum}</v></c>'
+                         f'<c r="F{nr}" t="inlineStr"><is><t>{escape(beschreibung)}</t></is></c></row>').encode())
+            f.write(b"</sheetData></worksheet>")
+        zf.writestr("xl/worksheets/sheet1.xml", f'<worksheet {ns}><sheetData><row r="1"><c r="A1" t="inlineStr">'
+                                                f'<is><t>Info</t></is></c></row></sheetData></worksheet>')
+        zf.writestr("xl/sharedStrings.xml", f'<sst {ns} uniqueCount="{len(texte)}">'
+                    + "".join(f"<si><t>{escape(t)}</t></si>" for t in texte) + "</sst>")
+        zf.writestr("xl/styles.xml", f'<styleSheet {ns}><cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14"/>'
+                                     '</cellXfs></styleSheet>')
+        zf.writestr("xl/workbook.xml", f'<workbook {ns} {rel_ns}><sheets><sheet name="Info" sheetId="1" r:id="rId1"/>'
+                                       '<sheet name="Aussteller" sheetId="2" r:id="rId2"/></sheets></workbook>')
+        typ = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'<Relationship Id="rId1" Type="{typ}/worksheet" Target="worksheets/sheet1.xml"/>'
+                    f'<Relationship Id="rId2" Type="{typ}/worksheet" Target="worksheets/sheet2.xml"/>'
+                    f'<Relationship Id="rId3" Type="{typ}/sharedStrings" Target="sharedStrings.xml"/>'
+                    f'<Relationship Id="rId4" Type="{typ}/styles" Target="styles.xml"/></Relationships>')
+        zf.writestr("_rels/.rels", '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                                   f'<Relationship Id="rId1" Type="{typ}/officeDocument" Target="xl/workbook.xml"/>'
+                                   '</Relationships>')
+
+
+def erzeuge_ods(pfad, zeilen, firmen):
+    ns = ('xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+          'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+          'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"')
+
+    def zelle(wert):
+        if isinstance(wert, int):
+            return f'<table:table-cell office:value-type="float" office:value="{wert}"><text:p>{wert}</text:p></table:table-cell>'
+        absaetze = "".join(f"<text:p>{escape(z)}</text:p>" for z in wert.split("\n"))
+        return f'<table:table-cell office:value-type="string">{absaetze}</table:table-cell>'
+
+    leer = '<table:table-cell table:number-columns-repeated="1018"/>'
+    with zipfile.ZipFile(pfad, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+        with zf.open("content.xml", "w") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {ns}><office:body>'
+                    f'<office:spreadsheet><table:table table:name="Info"><table:table-row>{zelle("Info")}'
+                    f'</table:table-row></table:table><table:table table:name="Aussteller">'.encode())
+            f.write(f'<table:table-row>{zelle(TITEL)}{leer}</table:table-row>'
+                    f'<table:table-row table:number-rows-repeated="1"><table:table-cell/></table:table-row>'
+                    f'<table:table-row>{"".join(zelle(h) for h in KOPF)}{leer}</table:table-row>'.encode())
+            for i in range(1, zeilen + 1):
+                nummer, firma, halle, stand, datum, beschreibung = _datensatz(i, firmen)
+                f.write((f"<table:table-row>{zelle(nummer)}{zelle(firma)}{zelle(halle)}{zelle(stand)}"
+                         f'<table:table-cell office:value-type="date" office:date-value="2023-03-01">'
+                         f"<text:p>01.03.23</text:p></table:table-cell>{zelle(beschreibung)}{leer}"
+                         f"</table:table-row>").encode())
+            f.write(b'<table:table-row table:number-rows-repeated="1048000"><table:table-cell '
+                    b'table:number-columns-repeated="1024"/></table:table-row></table:table></office:spreadsheet>'
+                    b"</office:body></office:document-content>")
+
+
+def messen(name, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ergebnis = func()
+    dauer = time.perf_counter() - start
+    _, spitze = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<30} {dauer:8.2f}s   Spitze {spitze / 1024 / 1024:7.1f} MB   {ergebnis(dauer)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zeilen", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--firmen", type=int, default=5000, help="verschiedene Firmennamen")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for zeilen in args.zeilen:
+            for endung, erzeugen in ((".xlsx", erzeuge_xlsx), (".ods", erzeuge_ods)):
+                pfad = Path(tmp) / f"aussteller_{zeilen}{endung}"
+                erzeugen(pfad, zeilen, args.firmen)
+
+                def lesen():
+                    headers, rows = stream_tabelle(pfad, blatt="Aussteller", kopfzeile=3)
+                    anzahl, letzte = 0, None
+                    for letzte in rows:
+                        anzahl += 1
+                    assert headers == KOPF and anzahl == zeilen, (headers, anzahl)
+                    return lambda dauer: f"{anzahl / dauer:,.0f} Zeilen/s, letzte Zeile {letzte}"
+
+                messen(f"{pfad.name} ({pfad.stat().st_size / 2**20:.1f} MB)", lesen)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# fixture_server.py – Lokaler Nachbau der Sales-Navigator-Suchseite für Benchmarks
+#
+# Liefert eine Suchseite mit input[placeholder='Keywords für Suche'] und Ergebniskarten
+# (li.artdeco-list__item mit /sales/lead/-Links). Latenz und Trefferzahl sind konfigurierbar.
+# Mit assets lädt die Suchseite wie das Original Bilder, eine Webfont, ein Video und ein
+# Tracking-Skript; gezählt werden ausgelieferte Anfragen und Bytes (bytes_gesendet, anfragen).
+# Mit spa verhält sich die Suche wie die echte Single-Page-App: Enter lädt nur die Trefferliste
+# nach (fetch + history.pushState), shell_kb simuliert ein App-Skript dieser Größe.
+#
+#   python benchmarks/fixture_server.py --port 8765 --latency 0.5 --results 10
+
+import argparse
+import hashlib
+import html
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+VORNAMEN = ["Anna", "Ben", "Clara", "David", "Eva", "Felix", "Greta", "Hannes", "Ida", "Jonas", "Lena", "Max"]
+NACHNAMEN = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Hoffmann"]
+POSITIONEN = [
+    "Leitung Personal", "IT-Leitung", "Marketingleitung", "Geschäftsführer", "Leitung Produktion",
+    "Werkstudent Vertrieb", "Sachbearbeiterin Buchhaltung", "Leitung Recruiting", "Head of E-Commerce",
+    "Lagerleitung", "Chief Information Officer (CIO)", "Teamleitung Kundenservice",
+]
+
+SUCHSEITE = """<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>Sales Navigator</title></head>
+<body>{assets}
+<header><input type="text" placeholder="Keywords für Suche" value="{query}"></header>
+<main><ol class="artdeco-list">{cards}</ol></main>
+{shell}<script>{skript}</script>
+</body></html>"""
+
+NAVIGATION_SKRIPT = """
+document.querySelector("input").addEventListener("keydown", function (e) {
+  if (e.key === "Enter") {
+    window.location.search = "?query=" + encodeURIComponent(this.value);
+  }
+});
+"""
+
+SPA_SKRIPT = """
+document.querySelector("input").addEventListener("keydown", function (e) {
+  if (e.key === "Enter") {
+    const query = this.value;
+    const liste = document.querySelector("ol.artdeco-list");
+    liste.innerHTML = "";
+    fetch("/sales/search/people/karten?query=" + encodeURIComponent(query))
+      .then((r) => r.text())
+      .then((html) => {
+        history.pushState(null, "", "?query=" + encodeURIComponent(query));
+        liste.innerHTML = html;
+      });
+  }
+});
+"""
+
+KARTE = """<li class="artdeco-list__item"><div class="lead">
+<div><a href="/sales/lead/{lead_id},NAME_SEARCH">{name}</a></div>
+<div>{position}</div>
+<div>{firma}</div>
+<div><a href="/sales/company/{lead_id}">Unternehmen ansehen</a></div>
+</div></li>"""
+
+
+ASSET_GROESSEN = {
+    "/static/font.woff2": ("font/woff2", 45_000),
+    "/static/clip.mp4": ("video/mp4", 500_000),
+    "/li/track.js": ("application/javascript", 80_000),
+    **{f"/static/img/{i}.png": ("image/png", 30_000) for i in range(8)},
+}
+
+ASSETS = (
+    '<style>@font-face { font-family: "Salesnav"; src: url("/static/font.woff2") format("woff2"); } '
+    'body { font-family: "Salesnav", sans-serif; }</style>\n'
+    '<script src="/li/track.js"></script>\n'
+    + "".join(f'<img src="/static/img/{i}.png" width="48" height="48" alt="">' for i in range(8))
+    + '\n<video src="/static/clip.mp4" autoplay muted></video>'
+)
+
+
+def asset_inhalt(pfad):
+    """(Content-Type, Bytes) einer Ressource; Skripte als gültiges (leeres) JavaScript"""
+    content_type, groesse = ASSET_GROESSEN[pfad]
+    if content_type == "application/javascript":
+        return content_type, b"/*" + b"x" * (groesse - 4) + b"*/"
+    return content_type, bytes(groesse)
+
+
+def render_cards(query, results):
+    """Erzeugt deterministische Ergebniskarten für eine Suchanfrage"""
+    firma = query.split('"')[1] if query.count('"') >= 2 else query
+    karten = []
+    for i in range(results):
+        h = int(hashlib.sha1(f"{query}|{i}".encode("utf-8")).hexdigest(), 16)
+        name = f"{VORNAMEN[h % len(VORNAMEN)]} {NACHNAMEN[(h >> 8) % len(NACHNAMEN)]}"
+        karten.append(KARTE.format(
+            lead_id=f"ACw{h % 10**12:012d}",
+            name=html.escape(name),
+            position=html.escape(POSITIONEN[(h >> 16) % len(POSITIONEN)]),
+            firma=html.escape(firma),
+        ))
+    return "\n".join(karten)
+
+
+def render_search_page(query="", results=10, assets=False, spa=False, shell_kb=0):
+    cards = render_cards(query, results) if query else ""
+    return SUCHSEITE.format(
+        query=html.escape(query, quote=True), cards=cards, assets=ASSETS if assets else "",
+        shell='<script src="/static/app.js"></script>\n' if shell_kb else "",
+        skript=SPA_SKRIPT if spa else NAVIGATION_SKRIPT,
+    )
+
+
+class FixtureServer:
+    """Startet den Nachbau in einem Hintergrund-Thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, results=10, assets=False, spa=False, shell_kb=0):
+        self.latency = latency
+        self.results = results
+        self.assets = assets
+        self.spa = spa
+        self.shell_kb = shell_kb
+        self.anfragen = 0
+        self.bytes_gesendet = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                content_type = "text/html; charset=utf-8"
+                if url.path.startswith("/sales/search/people/karten"):
+                    query = params.get("query", [""])[0]
+                    if server.latency:
+                        time.sleep(server.latency)
+                    anzahl = int(params.get("results", [server.results])[0])
+                    data = render_cards(query, anzahl).encode("utf-8")
+                elif url.path.startswith("/sales/search/people"):
+                    query = params.get("query", [""])[0]
+                    if query and server.latency:
+                        time.sleep(server.latency)
+                    anzahl = int(params.get("results", [server.results])[0])
+                    data = render_search_page(query, anzahl, server.assets, server.spa, server.shell_kb).encode("utf-8")
+                elif url.path.startswith("/sales"):
+                    data = b"<!DOCTYPE html><html><body><h1>Sales Navigator</h1></body></html>"
+                elif url.path == "/static/app.js" and server.shell_kb:
+                    content_type = "application/javascript"
+                    data = b"var shell = [" + b"1," * (server.shell_kb * 512) + b"1];"
+                elif url.path in ASSET_GROESSEN:
+                    content_type, data = asset_inhalt(url.path)
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                with server._lock:
+                    server.anfragen += 1
+                    server.bytes_gesendet += len(data)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler Sales-Navigator-Nachbau")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Serverlatenz pro Suche in Sekunden")
+    parser.add_argument("--results", type=int, default=10, help="Ergebniskarten pro Suche")
+    parser.add_argument("--assets", action="store_true", help="Bilder, Webfont, Video und Tracking-Skript mitladen")
+    parser.add_argument("--spa", action="store_true", help="Suche lädt nur die Trefferliste nach")
+    parser.add_argument("--shell-kb", type=int, default=0, help="Größe des simulierten App-Skripts")
+    args = parser.parse_args()
+    srv = FixtureServer(port=args.port, latency=args.latency, results=args.results, assets=args.assets,
+                        spa=args.spa, shell_kb=args.shell_kb)
+    print(f"🧪 Fixture-Server läuft auf {srv.url}")
+    srv.httpd.serve_forever()
@@ -40,13 +40,87 @@ export default function SalesNavFrontendLive() {
   const [progress, setProgress] = useState(0);
   const [resultUrl, setResultUrl] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [statusText, setStatusText] = useState<string | null>(null);
   const [ausgewaehlteKategorien, setAusgewaehlteKategorien] = useState<string[]>([]);
 
+  const pollJob = async (jobId: string) => {
+    while (true) {
+      const res = await fetch(`${API_URL}/jobs/${jobId}`);
+      if (!res.ok) throw new Error("Status konnte nicht abgerufen werden");
+      const job = await res.json();
+
+      if (job.rows_total > 0) {
+        setProgress(Math.max(10, Math.round((job.rows_done / job.rows_total) * 100)));
+      }
+      if (job.status === "done") return job;
+      if (["failed", "cancelled", "needs_reauth"].includes(job.status)) {
+        throw new Error(job.error || "Job fehlgeschlagen");
+      }
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+    }
+  };
+
+  const formatEta = (sekunden: number | null) => {
+    if (sekunden == null) return "";
+    if (sekunden < 60) return ` – noch ca. ${sekunden} s`;
+    return ` – noch ca. ${Math.round(sekunden / 60)} min`;
+  };
+
+  // Live-Fortschritt per Server-Sent Events; bricht die Verbindung ab, wird auf Polling umgeschaltet
+  const followJob = (jobId: string) =>
+    new Promise<any>((resolve, reject) => {
+      if (typeof EventSource === "undefined") {
+        pollJob(jobId).then(resolve, reject);
+        return;
+      }
+      const source = new EventSource(`${API_URL}/jobs/${jobId}/events`);
+      const parse = (e: Event) => JSON.parse((e as MessageEvent).data);
+      let beendet = false;
+      const finish = (job: any) => {
+        beendet = true;
+        source.close();
+        if (job.status === "done") resolve(job);
+        else reject(new Error(job.error || "Job fehlgeschlagen"));
+      };
+
+      source.addEventListener("status", (e) => {
+        const job = parse(e);
+        if (job.rows_total > 0) {
+          setProgress(Math.max(10, Math.round((job.rows_done / job.rows_total) * 100)));
+        }
+        if (["done", "failed", "cancelled", "needs_reauth"].includes(job.status)) finish(job);
+      });
+      source.addEventListener("progress", (e) => {
+        const p = parse(e);
+        if (p.rows_total > 0) {
+          setProgress(Math.max(10, Math.round((p.rows_done / p.rows_total) * 100)));
+          setStatusText(`${p.rows_done} von ${p.rows_total} Zeilen${formatEta(p.eta_seconds)}`);
+        }
+      });
+      source.addEventListener("contacts", (e) => {
+        const c = parse(e);
+        setStatusText(`${c.firms_done} von ${c.firms_total} Firmen gesucht, ${c.contacts_total} Kontakte gefunden`);
+      });
+      source.addEventListener("pause_started", (e) => {
+        const p = parse(e);
+        setStatusText(`Pause für ${p.minutes} Minuten (bis ${p.until.slice(11, 16)} Uhr)`);
+      });
+      source.addEventListener("pause_ended", () => setStatusText("Pause beendet, Suche läuft weiter"));
+      source.addEventListener("done", (e) => finish(parse(e)));
+      source.onerror = () => {
+        if (beendet) return;
+        beendet = true;
+        source.close();
+        pollJob(jobId).then(resolve, reject);
+      };
+    });
+
   const handleUpload = async () => {
     if (!file) return;
     setUploading(true);
     setProgress(10);
     setError(null);
+    setStatusText(null);
 
     const formData = new FormData();
     formData.append("file", file);
@@ -60,10 +134,11 @@ export default function SalesNavFrontendLive() {
 
       if (!res.ok) throw new Error("Upload fehlgeschlagen");
 
+      // Der Server reiht nur einen Job ein – Fortschritt kommt live per Event-Stream
       const data = await res.json();
-      const resultFile = data.result_file;
+      const job = await followJob(data.job_id);
       setProgress(100);
-      setResultUrl(`${API_URL}/result/${resultFile}`);
+      setResultUrl(`${API_URL}/result/${job.result_file}`);
     } catch (err) {
       setError("Fehler beim Upload. Bitte erneut versuchen.");
     } finally {
@@ -96,11 +171,11 @@ export default function SalesNavFrontendLive() {
           <CardContent className="space-y-4 p-6">
             <h1 className="text-2xl font-bold">Sales Navigator Scraper</h1>
             <div className="space-y-2">
-              <Label htmlFor="csv" className="block font-medium">CSV-Datei hochladen</Label>
+              <Label htmlFor="csv" className="block font-medium">CSV- oder Excel-Datei hochladen</Label>
               <Input
                 id="csv"
                 type="file"
-                accept=".csv"
+                accept=".csv,.xlsx,.ods"
                 onChange={(e) => setFile(e.target.files?.[0] || null)}
                 className="border border-gray-300 p-2 rounded"
               />
@@ -147,6 +222,8 @@ export default function SalesNavFrontendLive() {
               </div>
             )}
 
+            {uploading && statusText && <p className="text-sm text-gray-600">{statusText}</p>}
+
             {resultUrl && (
               <div className="pt-4">
                 
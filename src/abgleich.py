@@ -0,0 +1,98 @@
+# abgleich.py – Delta-Lauf gegen eine frühere Ergebnisdatei
+#
+# Kunden schicken alle paar Wochen eine aktualisierte Fassung derselben Ausstellerliste. Im
+# Delta-Lauf werden die Firmen der neuen Liste über den Firmenschlüssel mit einer früheren
+# _result.csv abgeglichen: Firmen mit unverändertem Namen, deren Kontakte höchstens max_alter
+# Sekunden alt sind, übernehmen die Kontakte der Referenz – gesucht werden nur neue, geänderte
+# und veraltete Firmen.
+# Wann die Kontakte einer Firma gesucht wurden, steht in der Stand-Datei neben jedem Ergebnis
+# ({stem}_result.stand.json, auch bei übernommenen Firmen der ursprüngliche Zeitpunkt). Fehlt sie
+# (Ergebnisse von vor dem Delta-Lauf), gilt das Änderungsdatum der Ergebnisdatei.
+
+import json
+import os
+import time
+from pathlib import Path
+
+from firmen import firmen_key
+
+KONTAKT_FELDER = ("Name", "Position", "LinkedIn Profil")
+
+
+def stand_pfad(ergebnis):
+    """Pfad der Stand-Datei zu einer Ergebnisdatei"""
+    ergebnis = Path(ergebnis)
+    return ergebnis.with_name(f"{ergebnis.stem}.stand.json")
+
+
+def stand_laden(ergebnis):
+    """(rollen, {Firmenschlüssel: Zeitpunkt}) der Stand-Datei; (None, None) wenn es keine gibt"""
+    pfad = stand_pfad(ergebnis)
+    if not pfad.exists():
+        return None, None
+    with pfad.open("r", encoding="utf-8") as f:
+        stand = json.load(f)
+    return stand["rollen"], stand["firmen"]
+
+
+def stand_speichern(ergebnis, rollen, zeitpunkte):
+    """Schreibt die Stand-Datei (Rollenauswahl und Zeitpunkt je Firmenschlüssel)"""
+    pfad = stand_pfad(ergebnis)
+    tmp = pfad.with_name(pfad.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"rollen": sorted(rollen), "firmen": zeitpunkte}, f, ensure_ascii=False)
+    os.replace(tmp, pfad)
+
+
+def referenz_kontakte(zeilen, firma_field, max_kontakte, felder=KONTAKT_FELDER):
+    """{Firmenschlüssel: (Firmenname, Kontakte)} aus den Zeilen einer Ergebnisdatei
+
+    Eine Firma mit Kontakten steht dort mit einer Zeile je Kontakt, Kontakt i in den Spalten
+    "Name i", "Position i", "LinkedIn Profil i"; mehrfach vorkommende Firmen wiederholen ihre
+    Kontakte. Maßgeblich ist wie beim Scrapen das erste Vorkommen des Schlüssels.
+    """
+    referenz = {}
+    for row in zeilen:
+        firma = row.get(firma_field, "").strip()
+        if not firma:
+            continue
+        _, kontakte = referenz.setdefault(firmen_key(firma), (firma, {}))
+        for i in range(1, max_kontakte + 1):
+            kontakt = {feld: row.get(f"{feld} {i}", "") for feld in felder}
+            if any(kontakt.values()):
+                kontakte.setdefault(i, kontakt)
+    return {key: (firma, [kontakte[i] for i in sorted(kontakte)]) for key, (firma, kontakte) in referenz.items()}
+
+
+def _name(firma):
+    return " ".join(firma.casefold().split())
+
+
+def abgleichen(firmen, referenz, zeitpunkte, max_alter, max_alter_leer=None, jetzt=None):
+    """Teilt die Firmen eines Delta-Laufs auf
+
+    firmen: {Firmenschlüssel: Firmenname} der neuen Liste, referenz: aus referenz_kontakte,
+    zeitpunkte: {Firmenschlüssel: Zeitpunkt} der Referenz. Firmen ohne Kontakte gelten schon nach
+    max_alter_leer als veraltet (wie im Lead-Cache). Liefert (uebernehmen, gruende):
+    {Firmenschlüssel: (Kontakte, Zeitpunkt)} der unveränderten Firmen und die Anzahl Firmen je
+    Grund ("uebernommen", "neu", "geaendert", "veraltet").
+    """
+    jetzt = time.time() if jetzt is None else jetzt
+    uebernehmen = {}
+    gruende = {"uebernommen": 0, "neu": 0, "geaendert": 0, "veraltet": 0}
+    for key, firma in firmen.items():
+        if key not in referenz:
+            gruende["neu"] += 1
+            continue
+        alt_firma, kontakte = referenz[key]
+        if _name(alt_firma) != _name(firma):  # gesucht wird mit dem Namen, nicht mit dem Schlüssel
+            gruende["geaendert"] += 1
+            continue
+        zeitpunkt = zeitpunkte.get(key, 0)
+        grenze = max_alter if kontakte or max_alter_leer is None else min(max_alter, max_alter_leer)
+        if jetzt - zeitpunkt > grenze:
+            gruende["veraltet"] += 1
+            continue
+        uebernehmen[key] = (kontakte, zeitpunkt)
+        gruende["uebernommen"] += 1
+    return uebernehmen, gruende
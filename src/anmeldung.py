@@ -0,0 +1,171 @@
+# anmeldung.py – Gespeicherter Login-Zustand für kopflose Browser-Kontexte
+#
+# Einmal angemeldet, wird der Storage-State (Cookies, localStorage) als JSON gespeichert und in
+# beliebig viele kopflose Kontexte geladen, statt jeden Browser sichtbar auf einem gemeinsamen
+# Profil zu starten. Ob die Anmeldung noch gilt, wird ohne Seitenaufbau geprüft: zuerst das
+# Ablaufdatum des Auth-Cookies in der Datei, dann eine einzelne HTTP-Anfrage ohne Weiterleitungen
+# mit den Cookies des Kontexts. Ist sie ungültig, wird ReauthRequired ausgelöst – der Job wird als
+# "needs_reauth" markiert, statt im Server auf eine Eingabe im Terminal zu warten.
+#
+#   python src/anmeldung.py --login                 # sichtbaren Browser öffnen, anmelden, speichern
+#   python src/anmeldung.py --aus-profil profile    # Zustand aus einem eingeloggten Profil übernehmen
+#   python src/anmeldung.py --pruefen
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from jobs import ReauthRequired
+
+AUTH_COOKIE = "li_at"
+LOGIN_MARKER = ("login", "checkpoint", "authwall")
+
+
+def ist_login_url(url):
+    return any(marker in (url or "") for marker in LOGIN_MARKER)
+
+
+class AnmeldeZustand:
+    """Storage-State-Datei einer Anmeldung mit günstiger Gültigkeitsprüfung"""
+
+    def __init__(self, pfad, base_url, auth_cookie=AUTH_COOKIE, cache_sekunden=60.0):
+        self.pfad = Path(pfad)
+        self.base_url = base_url.rstrip("/")
+        self.auth_cookie = auth_cookie  # leer = Cookie nicht prüfen (z.B. lokaler Nachbau)
+        self.cache_sekunden = cache_sekunden
+        self._lock = threading.Lock()
+        self._geprueft = None  # (Zeitpunkt, gültig)
+
+    def vorhanden(self):
+        return self.pfad.exists()
+
+    def kontext_optionen(self):
+        """Keyword-Argumente für browser.new_context()"""
+        return {"storage_state": str(self.pfad)}
+
+    def cookie_gueltig(self):
+        """Auth-Cookie vorhanden und nicht abgelaufen (nur die Datei, keine Anfrage)"""
+        try:
+            zustand = json.loads(self.pfad.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if not self.auth_cookie:
+            return True
+        for cookie in zustand.get("cookies", []):
+            if cookie.get("name") == self.auth_cookie:
+                ablauf = cookie.get("expires", -1)
+                return ablauf is None or ablauf < 0 or ablauf > time.time()
+        return False
+
+    def http_gueltig(self, request):
+        """Eine Anfrage ohne Weiterleitungen mit den Cookies des Kontexts (context.request)"""
+        antwort = request.get(f"{self.base_url}/sales/", max_redirects=0, timeout=15000)
+        if 300 <= antwort.status < 400:
+            return not ist_login_url(antwort.headers.get("location"))
+        return antwort.ok
+
+    def pruefen(self, request=None):
+        """Gültigkeit, für cache_sekunden zwischengespeichert; ohne request nur das Cookie"""
+        with self._lock:
+            if self._geprueft and time.monotonic() - self._geprueft[0] < self.cache_sekunden:
+                return self._geprueft[1]
+        gueltig = self.cookie_gueltig()
+        if gueltig and request is not None:
+            gueltig = self.http_gueltig(request)
+        if request is not None or not gueltig:
+            with self._lock:
+                self._geprueft = (time.monotonic(), gueltig)
+        return gueltig
+
+    def sicherstellen(self, request=None):
+        if not self.pruefen(request):
+            raise ReauthRequired("LinkedIn-Anmeldung abgelaufen – bitte neu anmelden "
+                                 "(python src/anmeldung.py --login), danach den Job erneut starten")
+
+    def speichern(self, context):
+        """Speichert den Zustand eines angemeldeten Kontexts (atomar ersetzt)"""
+        tmp = self.pfad.with_name(self.pfad.name + ".tmp")
+        context.storage_state(path=str(tmp))
+        os.replace(tmp, self.pfad)
+        with self._lock:
+            self._geprueft = None
+
+    def status(self):
+        vorhanden = self.vorhanden()
+        return {
+            "vorhanden": vorhanden,
+            "gespeichert_am": self.pfad.stat().st_mtime if vorhanden else None,
+            "cookie_gueltig": self.cookie_gueltig() if vorhanden else False,
+        }
+
+
+def _login(zustand, timeout):
+    """Sichtbarer Browser: wartet, bis die Sales-Navigator-Startseite ohne Login erreicht ist"""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=False)
+        context = browser.new_context()
+        page = context.new_page()
+        page.goto(f"{zustand.base_url}/sales/")
+        print("🔐 Bitte im geöffneten Browser anmelden...")
+        ende = time.monotonic() + timeout
+        while ist_login_url(page.url) or "/sales" not in page.url:
+            if time.monotonic() > ende:
+                raise SystemExit("❌ Zeitüberschreitung beim Login")
+            page.wait_for_timeout(1000)
+        zustand.speichern(context)
+        browser.close()
+
+
+def _aus_profil(zustand, profil):
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        context = p.chromium.launch_persistent_context(str(profil), headless=True)
+        zustand.speichern(context)
+        context.close()
+
+
+def _pruefen(zustand):
+    from playwright.sync_api import sync_playwright
+
+    if not zustand.vorhanden():
+        return False
+    with sync_playwright() as p:
+        request = p.request.new_context(storage_state=str(zustand.pfad))
+        try:
+            return zustand.pruefen(request)
+        finally:
+            request.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-Zustand für kopflose Browser verwalten")
+    aktion = parser.add_mutually_exclusive_group(required=True)
+    aktion.add_argument("--login", action="store_true", help="anmelden und Zustand speichern")
+    aktion.add_argument("--aus-profil", metavar="PROFIL", help="Zustand aus einem eingeloggten Profil übernehmen")
+    aktion.add_argument("--pruefen", action="store_true", help="gespeicherten Zustand prüfen")
+    parser.add_argument("--pfad", default=os.getenv("SESSION_STATE_PATH", "session_state.json"))
+    parser.add_argument("--base-url", default=os.getenv("SALESNAV_BASE_URL", "https://www.linkedin.com"))
+    parser.add_argument("--timeout", type=int, default=600, help="Sekunden für den manuellen Login")
+    args = parser.parse_args()
+
+    zustand = AnmeldeZustand(args.pfad, args.base_url, os.getenv("SESSION_AUTH_COOKIE", AUTH_COOKIE))
+    if args.login:
+        _login(zustand, args.timeout)
+        print(f"✅ Anmeldung gespeichert unter {zustand.pfad}")
+    elif args.aus_profil:
+        _aus_profil(zustand, args.aus_profil)
+        print(f"✅ Zustand aus {args.aus_profil} gespeichert unter {zustand.pfad}")
+    elif _pruefen(zustand):
+        print("✅ Gespeicherte Anmeldung gültig")
+    else:
+        raise SystemExit("❌ Keine gültige Anmeldung gespeichert")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# aufnahmen.py – Trefferlisten aufzeichnen und ohne Browser neu auswerten
+#
+# Mit RECORD_SNAPSHOTS=1 wird nach jeder Suche das HTML der Trefferliste (alle Karten) gespeichert:
+# zlib-komprimiert unter seinem SHA-256 (gleiche Listen liegen nur einmal auf der Platte), dazu ein
+# SQLite-Index mit Firma, Rollenauswahl, Suche und Zeitpunkt. Ändert sich die Auswertung der
+# Karten oder der Rollenfilter, rechnet die Wiedergabe die neueste Aufnahme je Firma und
+# Rollenauswahl auf allen Kernen neu aus und schreibt das Ergebnis in den Lead-Cache – danach
+# liefert ein erneuter Job die korrigierten Kontakte, ohne eine einzige Seite zu laden.
+#
+#   python src/aufnahmen.py --wiedergabe                        # alles neu auswerten, Cache aktualisieren
+#   python src/aufnahmen.py --wiedergabe --rollen IT --ausgabe kontakte.jsonl --ohne-cache
+#   python src/aufnahmen.py --stats
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from firmen import firmen_key
+
+
+def rollen_text(rollen):
+    """Rollenauswahl in der Schreibweise des Lead-Caches (sortiert, kommagetrennt)"""
+    return ",".join(sorted(r.strip() for r in rollen if r.strip()))
+
+
+class AufnahmeSpeicher:
+    """Inhaltsadressierte Ablage komprimierter Trefferlisten mit SQLite-Index"""
+
+    def __init__(self, wurzel, stufe=6):
+        self.wurzel = Path(wurzel)
+        self.stufe = stufe  # zlib-Kompressionsstufe
+        (self.wurzel / "objekte").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.wurzel / "index.sqlite3"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS aufnahmen (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    firmen_key TEXT NOT NULL,
+                    firma TEXT NOT NULL,
+                    rollen TEXT NOT NULL,
+                    suche TEXT,
+                    hash TEXT NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    aufgenommen REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_aufnahmen_firma ON aufnahmen(firmen_key, rollen)")
+
+    def objekt_pfad(self, hash_):
+        return self.wurzel / "objekte" / hash_[:2] / f"{hash_}.html.z"
+
+    def ablegen(self, firma, rollen, html, suche=None):
+        """Speichert eine Trefferliste; liefert ihren Hash"""
+        daten = html.encode("utf-8")
+        hash_ = hashlib.sha256(daten).hexdigest()
+        pfad = self.objekt_pfad(hash_)
+        if not pfad.exists():
+            pfad.parent.mkdir(exist_ok=True)
+            tmp = pfad.with_name(f"{pfad.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(zlib.compress(daten, self.stufe))
+            os.replace(tmp, pfad)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO aufnahmen (firmen_key, firma, rollen, suche, hash, bytes, aufgenommen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (firmen_key(firma), firma, rollen_text(rollen), suche, hash_, len(daten), time.time()),
+            )
+        return hash_
+
+    def laden(self, hash_):
+        return zlib.decompress(self.objekt_pfad(hash_).read_bytes()).decode("utf-8")
+
+    def eintraege(self, rollen=None):
+        """Neueste Aufnahme je Firma und Rollenauswahl (optional nur eine Rollenauswahl)"""
+        sql = ("SELECT firma, rollen, suche, hash, aufgenommen FROM aufnahmen WHERE id IN "
+               "(SELECT MAX(id) FROM aufnahmen GROUP BY firmen_key, rollen)")
+        parameter = ()
+        if rollen is not None:
+            sql += " AND rollen = ?"
+            parameter = (rollen_text(rollen),)
+        with self._lock:
+            zeilen = self._conn.execute(sql + " ORDER BY id", parameter).fetchall()
+        return [{"firma": firma, "rollen": [r for r in rollen_.split(",") if r], "suche": suche,
+                 "hash": hash_, "aufgenommen": aufgenommen}
+                for firma, rollen_, suche, hash_, aufgenommen in zeilen]
+
+    def stats(self):
+        with self._lock:
+            aufnahmen, roh = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM aufnahmen").fetchone()
+            firmen = self._conn.execute("SELECT COUNT(DISTINCT firmen_key) FROM aufnahmen").fetchone()[0]
+        objekte = list((self.wurzel / "objekte").glob("*/*.html.z"))
+        return {
+            "aufnahmen": aufnahmen,
+            "firmen": firmen,
+            "objekte": len(objekte),
+            "bytes_roh": roh,
+            "bytes_gespeichert": sum(p.stat().st_size for p in objekte),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _still():
+    """Initializer der Wiedergabe-Prozesse: Ausgaben der Auswertung unterdrücken"""
+    sys.stdout = open(os.devnull, "w")
+
+
+def _auswerten(paket):
+    auswerten, pfad, rollen = paket
+    return auswerten(zlib.decompress(Path(pfad).read_bytes()).decode("utf-8"), rollen)
+
+
+def wiedergeben(speicher, auswerten, rollen=None, prozesse=None, stapel=64):
+    """Wertet die neuesten Aufnahmen neu aus; liefert (eintrag, kontakte) in Index-Reihenfolge
+
+    auswerten(html, rollen) muss eine Funktion auf Modulebene sein – sie läuft in
+    `prozesse` Worker-Prozessen (Standard: alle Kerne, 1 = im aufrufenden Prozess).
+    """
+    eintraege = speicher.eintraege(rollen)
+    pakete = [(auswerten, str(speicher.objekt_pfad(e["hash"])), e["rollen"]) for e in eintraege]
+    prozesse = prozesse or os.cpu_count() or 1
+    if prozesse == 1 or len(pakete) < 2 * stapel:
+        yield from zip(eintraege, map(_auswerten, pakete))
+        return
+    with multiprocessing.Pool(prozesse, initializer=_still) as pool:
+        yield from zip(eintraege, pool.imap(_auswerten, pakete, chunksize=stapel))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aufgezeichnete Trefferlisten verwalten und neu auswerten")
+    aktion = parser.add_mutually_exclusive_group(required=True)
+    aktion.add_argument("--wiedergabe", action="store_true", help="Aufnahmen neu auswerten")
+    aktion.add_argument("--stats", action="store_true", help="Größe der Ablage anzeigen")
+    parser.add_argument("--pfad", help="Ablage (Standard: SNAPSHOT_DIR)")
+    parser.add_argument("--rollen", help="nur Aufnahmen dieser Rollenauswahl, kommagetrennt")
+    parser.add_argument("--prozesse", type=int, help="Worker-Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--ausgabe", help="Ergebnisse zusätzlich als JSONL schreiben")
+    parser.add_argument("--ohne-cache", action="store_true", help="Lead-Cache nicht aktualisieren")
+    args = parser.parse_args()
+
+    import testmain_neu as t
+
+    speicher = AufnahmeSpeicher(args.pfad or t.SNAPSHOT_DIR)
+    if args.stats:
+        print(json.dumps(speicher.stats(), indent=2))
+        return
+
+    rollen = args.rollen.split(",") if args.rollen else None
+    start = time.perf_counter()
+    ausgabe = open(args.ausgabe, "w", encoding="utf-8") if args.ausgabe else None
+    cache_eintraege = []
+    anzahl = kontakte_gesamt = 0
+    try:
+        for eintrag, kontakte in wiedergeben(speicher, t.kontakte_aus_html, rollen, args.prozesse):
+            anzahl += 1
+            kontakte_gesamt += len(kontakte)
+            if ausgabe:
+                ausgabe.write(json.dumps({"firma": eintrag["firma"], "rollen": eintrag["rollen"],
+                                          "contacts": kontakte}, ensure_ascii=False) + "\n")
+            if not args.ohne_cache:
+                # Leere Ergebnisse wie beim Scrapen nur kurz cachen
+                cache_eintraege.append((eintrag["firma"], eintrag["rollen"], kontakte,
+                                        None if kontakte else t.LEAD_CACHE_TTL_LEER_SECONDS))
+    finally:
+        if ausgabe:
+            ausgabe.close()
+    if cache_eintraege:
+        t.lead_cache.put_many(cache_eintraege)
+    dauer = time.perf_counter() - start
+    print(f"✅ {anzahl} Firmen neu ausgewertet ({kontakte_gesamt} Kontakte) in {dauer:.1f} s "
+          f"({anzahl / max(dauer, 1e-9):.0f} Firmen/s)" + ("" if args.ohne_cache else ", Lead-Cache aktualisiert"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# browser_pool.py – Mehrere parallele Playwright-Seiten in einem gemeinsamen Browser-Prozess
+#
+# Der Besitzer-Thread startet einen persistenten Kontext (gemeinsames Profil, gemeinsamer Login)
+# mit Remote-Debugging-Port. Jeder Worker-Thread verbindet sich mit eigener Playwright-Instanz
+# per CDP und öffnet darin eine eigene Seite – Playwrights Sync-API ist nicht thread-sicher,
+# der Browser-Prozess wird so trotzdem nur einmal gestartet.
+# Mit storage_state (gespeicherte Anmeldung, siehe anmeldung.py) wird statt des Profils ein
+# normaler Browser gestartet; jeder Worker öffnet darin einen eigenen Kontext mit diesem Zustand.
+
+import itertools
+import queue
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+
+
+def _freier_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BrowserPool:
+    """Pool aus `size` Seiten, die Firmen parallel abarbeiten"""
+
+    def __init__(self, size, profile_dir, headless=False, launch_args=None, context_setup=None, page_setup=None,
+                 storage_state=None):
+        self.size = max(1, size)
+        self.profile_dir = str(profile_dir)
+        self.headless = headless
+        self.launch_args = list(launch_args or [])
+        self.context_setup = context_setup  # optional: context_setup(context) je verbundenem Kontext
+        self.page_setup = page_setup  # optional: page_setup(page) je Seite, im Thread der Seite
+        self.storage_state = str(storage_state) if storage_state else None
+        self.port = None
+        self.page = None  # Seite des Besitzer-Threads, z.B. für Login-Prüfungen
+        self._p = None
+        self._browser = None
+        self._context = None
+        self._gate = threading.Event()
+        self._gate.set()
+
+    def start(self):
+        from playwright.sync_api import sync_playwright
+
+        self.port = _freier_port()
+        self._p = sync_playwright().start()
+        args = [f"--remote-debugging-port={self.port}", *self.launch_args]
+        if self.storage_state:
+            self._browser = self._p.chromium.launch(headless=self.headless, args=args)
+            self._context = self._browser.new_context(storage_state=self.storage_state)
+        else:
+            self._context = self._p.chromium.launch_persistent_context(
+                self.profile_dir, headless=self.headless, args=args,
+            )
+        if self.context_setup:
+            self.context_setup(self._context)
+        self.page = self._context.pages[0] if self._context.pages else self._context.new_page()
+        if self.page_setup:
+            self.page_setup(self.page)
+        print(f"🌐 Browser-Pool gestartet ({self.size} Seiten, CDP-Port {self.port})")
+        return self
+
+    def close(self):
+        try:
+            if self._context:
+                self._context.close()
+            if self._browser:
+                self._browser.close()
+            if self._p:
+                self._p.stop()
+        except Exception as e:
+            print(f"⚠️ Fehler beim Schließen des Browser-Pools: {e}")
+        self._context = None
+        self._browser = None
+        self._p = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pause(self):
+        """Worker nehmen nach der aktuellen Firma keine neue Arbeit an"""
+        self._gate.clear()
+
+    def resume(self):
+        self._gate.set()
+
+    @contextmanager
+    def worker_page(self):
+        """Eigene Playwright-Instanz mit eigener Seite für den aufrufenden Thread (per CDP verbunden)"""
+        from playwright.sync_api import sync_playwright
+
+        p = sync_playwright().start()
+        try:
+            browser = p.chromium.connect_over_cdp(f"http://127.0.0.1:{self.port}")
+            if self.storage_state:
+                context = browser.new_context(storage_state=self.storage_state)
+            else:
+                context = browser.contexts[0]
+            if self.context_setup:
+                self.context_setup(context)
+            page = context.new_page()
+            if self.page_setup:
+                self.page_setup(page)
+            try:
+                yield page
+            finally:
+                page.close()
+                if self.storage_state:
+                    context.close()
+        finally:
+            p.stop()
+
+    def imap_unordered(self, func, items, max_concurrency=None, fenster=None):
+        """Verarbeitet `items` parallel mit func(page, item) und liefert (index, ergebnis) sobald fertig
+
+        Fehler in func werden geloggt und als Ergebnis None geliefert. Bricht der Aufrufer die
+        Iteration ab (z.B. durch JobCancelled), beenden die Worker nach ihrer aktuellen Firma.
+        Mit `fenster` stehen höchstens so viele Einträge gleichzeitig an; der nächste wird erst
+        aus `items` gelesen, wenn der Aufrufer ein Ergebnis abgeholt hat.
+        """
+        quelle = enumerate(items)
+        vorrat = list(itertools.islice(quelle, fenster))
+        worker_count = min(self.size, max_concurrency or self.size, len(vorrat))
+        if worker_count == 0:
+            return
+
+        arbeit = queue.Queue()
+        for eintrag in vorrat:
+            arbeit.put(eintrag)
+        offen = len(vorrat)
+        erschoepft = not fenster or len(vorrat) < fenster
+        if erschoepft:
+            for _ in range(worker_count):
+                arbeit.put(None)  # keine weiteren Einträge
+        ergebnisse = queue.Queue()
+        stop = threading.Event()
+
+        def worker(nr):
+            try:
+                with self.worker_page() as page:
+                    while True:
+                        eintrag = arbeit.get()
+                        if eintrag is None:
+                            break
+                        self._gate.wait()
+                        if stop.is_set():
+                            break
+                        idx, item = eintrag
+                        try:
+                            result = func(page, item)
+                        except Exception as e:
+                            print(f"❌ Worker {nr}: Fehler bei '{item}': {e}")
+                            traceback.print_exc()
+                            result = None
+                        ergebnisse.put((idx, result))
+            except Exception as e:
+                print(f"❌ Worker {nr} beendet: {e}")
+            finally:
+                ergebnisse.put((None, nr))  # Abmeldung des Workers
+
+        threads = [
+            threading.Thread(target=worker, args=(i + 1,), name=f"browser-worker-{i + 1}", daemon=True)
+            for i in range(worker_count)
+        ]
+        for t in threads:
+            t.start()
+
+        aktiv = worker_count
+        try:
+            while aktiv:
+                idx, result = ergebnisse.get()
+                if idx is None:
+                    aktiv -= 1
+                    continue
+                offen -= 1
+                yield idx, result
+                if not erschoepft:
+                    nachschub = next(quelle, None)
+                    if nachschub is None:
+                        erschoepft = True
+                        for _ in range(worker_count):
+                            arbeit.put(None)
+                    else:
+                        arbeit.put(nachschub)
+                        offen += 1
+        finally:
+            stop.set()
+            self._gate.set()
+            for _ in threads:
+                arbeit.put(None)  # wartende Worker wecken
+            for t in threads:
+                t.join()
+
+        # Alle Worker sind ausgefallen, bevor die Arbeit erledigt war
+        if offen:
+            raise RuntimeError("Browser-Pool: alle Worker ausgefallen, Firmen unbearbeitet")
+
+    def map(self, func, items, max_concurrency=None):
+        """Wie imap_unordered, liefert aber eine Liste in der ursprünglichen Reihenfolge"""
+        items = list(items)
+        results = [None] * len(items)
+        for idx, result in self.imap_unordered(func, items, max_concurrency):
+            results[idx] = result
+        return results
@@ -0,0 +1,231 @@
+# downloads.py – Auslieferung der Ergebnisdateien mit Kompression, ETag und Range
+#
+# Unabhängig vom Web-Framework: datei_auslieferung() wertet die Request-Header aus und liefert
+# (Status, Header, Body-Iterator). Ergebnis-CSVs mit vielen angehängten Spalten schrumpfen mit
+# gzip/zstd auf einen Bruchteil. Range-Anfragen (Download fortsetzen) werden unkomprimiert
+# beantwortet, damit die Byte-Offsets zur Datei passen. verfolgen() liefert die Datei eines noch
+# laufenden Jobs und danach alle neu geschriebenen Zeilen, bis der Job fertig ist.
+# vorkomprimieren() legt im Leerlauf eine gzip-Variante neben fertige Ergebnisse; solange sie
+# aktuell ist, wird sie für gzip-Anfragen ohne erneute Kompression ausgeliefert.
+
+import os
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+MIN_KOMPRIMIEREN = 1024  # kleinere Dateien lohnen die Kompression nicht
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def etag_fuer(stat, kodierung="identity"):
+    """ETag aus Änderungszeit und Größe; komprimierte Varianten bekommen ein eigenes Suffix"""
+    basis = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return f'"{basis}"' if kodierung == "identity" else f'"{basis}-{kodierung}"'
+
+
+def waehle_kodierung(accept_encoding):
+    """Bevorzugt zstd, dann gzip, sonst unkomprimiert – unter Beachtung der q-Werte"""
+    angebote = {}
+    for teil in (accept_encoding or "").split(","):
+        name, _, parameter = teil.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        parameter = parameter.strip()
+        if parameter.startswith("q="):
+            try:
+                q = float(parameter[2:])
+            except ValueError:
+                q = 0.0
+        angebote[name.strip().lower()] = q
+    for kodierung in ("zstd", "gzip"):
+        if kodierung == "zstd" and zstandard is None:
+            continue
+        if angebote.get(kodierung, angebote.get("*", 0.0)) > 0:
+            return kodierung
+    return "identity"
+
+
+def _range_parsen(range_header, groesse):
+    """Ein einzelner Byte-Bereich als (start, ende inkl.); None = ignorieren, False = nicht erfüllbar"""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None  # Mehrfachbereiche werden mit der ganzen Datei beantwortet
+    von, _, bis = range_header[6:].strip().partition("-")
+    try:
+        if von == "":
+            laenge = int(bis)
+            if laenge <= 0:
+                return False
+            return max(groesse - laenge, 0), groesse - 1
+        start = int(von)
+        ende = int(bis) if bis else groesse - 1
+    except ValueError:
+        return None
+    if start >= groesse or ende < start:
+        return False
+    return start, min(ende, groesse - 1)
+
+
+def _etag_passt(header, etag):
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def _nicht_geaendert(headers, etag, stat):
+    if headers.get("if-none-match"):
+        return _etag_passt(headers["if-none-match"], etag)
+    if headers.get("if-modified-since"):
+        try:
+            return int(stat.st_mtime) <= parsedate_to_datetime(headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _lesen(path, start=0, laenge=None):
+    with open(path, "rb") as f:
+        f.seek(start)
+        rest = laenge
+        while rest is None or rest > 0:
+            chunk = f.read(CHUNK_SIZE if rest is None else min(CHUNK_SIZE, rest))
+            if not chunk:
+                return
+            if rest is not None:
+                rest -= len(chunk)
+            yield chunk
+
+
+def komprimieren(chunks, kodierung, sofort_senden=False):
+    """Komprimiert einen Byte-Strom; mit sofort_senden wird nach jedem Stück geflusht (Live-Verfolgung)"""
+    if kodierung == "identity":
+        yield from chunks
+        return
+    if kodierung == "zstd":
+        komp = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        zwischen_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+    else:
+        komp = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip-Header
+        zwischen_flush = zlib.Z_SYNC_FLUSH
+    for chunk in chunks:
+        daten = komp.compress(chunk)
+        if sofort_senden:
+            daten += komp.flush(zwischen_flush)
+        if daten:
+            yield daten
+    yield komp.flush()
+
+
+def vorkomprimiert(path):
+    """Pfad der gzip-Variante einer Datei"""
+    return path.with_name(path.name + ".gz")
+
+
+def _vorkomprimiert_aktuell(path, stat):
+    """stat der gzip-Variante, wenn es sie gibt und sie nicht älter als die Datei ist"""
+    try:
+        gz_stat = vorkomprimiert(path).stat()
+    except FileNotFoundError:
+        return None
+    return gz_stat if gz_stat.st_mtime_ns >= stat.st_mtime_ns else None
+
+
+def vorkomprimieren(path):
+    """Schreibt die gzip-Variante einer fertigen Datei – als Generator, ein Schritt je CHUNK_SIZE
+
+    Gedacht als Hintergrundaufgabe (leerlauf.py). Ändert sich die Datei währenddessen, wird die
+    Variante verworfen.
+    """
+    stat = path.stat()
+    if _vorkomprimiert_aktuell(path, stat) or stat.st_size < MIN_KOMPRIMIEREN:
+        return
+    ziel = vorkomprimiert(path)
+    tmp = ziel.with_name(ziel.name + ".tmp")
+    komp = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    with open(tmp, "wb") as f:
+        for chunk in _lesen(path):
+            f.write(komp.compress(chunk))
+            yield
+        f.write(komp.flush())
+    neu = path.stat()
+    if (neu.st_mtime_ns, neu.st_size) != (stat.st_mtime_ns, stat.st_size):
+        tmp.unlink()
+        return
+    os.replace(tmp, ziel)
+
+
+def datei_auslieferung(path, headers, filename, media_type="text/csv; charset=utf-8", komprimierbar=True):
+    """Beantwortet einen GET auf eine fertige Datei: (status, antwort_header, body_iterator oder None)
+
+    `headers` sind die Request-Header mit kleingeschriebenen Namen. Bereits komprimierte Formate
+    (ZIP) mit komprimierbar=False ausliefern.
+    """
+    stat = path.stat()
+    basis = {
+        "Content-Type": media_type,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+    }
+
+    bereich = _range_parsen(headers.get("range"), stat.st_size)
+    if bereich is not None and headers.get("if-range") and headers["if-range"] != etag_fuer(stat):
+        bereich = None  # Datei hat sich geändert – ganze Datei senden
+    kodierung = "identity"
+    if bereich is None and komprimierbar and stat.st_size >= MIN_KOMPRIMIEREN:
+        kodierung = waehle_kodierung(headers.get("accept-encoding"))
+    etag = etag_fuer(stat, kodierung)
+    basis["ETag"] = etag
+
+    if _nicht_geaendert(headers, etag, stat):
+        return 304, basis, None
+    if bereich is False:
+        return 416, {**basis, "Content-Range": f"bytes */{stat.st_size}"}, None
+    if bereich is not None:
+        start, ende = bereich
+        laenge = ende - start + 1
+        return 206, {**basis, "Content-Range": f"bytes {start}-{ende}/{stat.st_size}",
+                     "Content-Length": str(laenge)}, _lesen(path, start, laenge)
+    if kodierung == "identity":
+        return 200, {**basis, "Content-Length": str(stat.st_size)}, _lesen(path)
+    gz_stat = _vorkomprimiert_aktuell(path, stat) if kodierung == "gzip" else None
+    if gz_stat:
+        gz_headers = {**basis, "Content-Encoding": "gzip", "Content-Length": str(gz_stat.st_size)}
+        return 200, gz_headers, _lesen(vorkomprimiert(path))
+    return 200, {**basis, "Content-Encoding": kodierung}, komprimieren(_lesen(path), kodierung)
+
+
+def verfolgen(path, laeuft, folgen=True, intervall=1.0):
+    """Liefert die bisher geschriebenen Zeilen und danach neue, solange laeuft() True ist
+
+    Solange der Job schreibt, wird nur bis zum letzten Zeilenende ausgeliefert. Ohne `folgen`
+    endet die Auslieferung nach den bisher geschriebenen Zeilen.
+    """
+    pos = 0
+    rest = b""  # angefangene Zeile, wird erst mit ihrem Zeilenende ausgeliefert
+    while True:
+        aktiv = laeuft()  # vor dem Lesen prüfen, damit nach dem Ende nichts mehr fehlt
+        if path.exists():
+            with open(path, "rb") as f:
+                f.seek(pos)
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    pos += len(chunk)
+                    daten = rest + chunk
+                    schnitt = daten.rfind(b"\n") + 1
+                    rest = daten[schnitt:]
+                    if schnitt:
+                        yield daten[:schnitt]
+        if not aktiv:
+            if rest:
+                yield rest
+            return
+        if not folgen:
+            return
+        time.sleep(intervall)
@@ -0,0 +1,100 @@
+# ereignisse.py – Live-Fortschritt laufender Jobs als Server-Sent Events
+#
+# run_enrichment meldet Ereignisse über den JobHandle (handle.emit), Clients lesen sie über
+# GET /jobs/{id}/events. Häufige Ereignisse (progress, row_started, contacts) werden zusammengefasst:
+# je Typ zählt nur der neueste Stand, der dafür kumulierte Werte enthält. Clients holen in festen
+# Intervallen alles Neue auf einmal ab – ein schneller Job erzeugt so höchstens ein Paket pro
+# Intervall und Client, egal wie viele Zeilen er in der Zeit schafft.
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+ZUSAMMENFASSBAR = {"progress", "row_started", "contacts"}
+START = "started"
+ENDE = "done"
+
+
+def _sse(seq, typ, daten):
+    """Formatiert ein Ereignis im text/event-stream-Format"""
+    kopf = f"id: {seq}\n" if seq is not None else ""
+    return f"{kopf}event: {typ}\ndata: {json.dumps(daten, ensure_ascii=False)}\n\n"
+
+
+class _JobEreignisse:
+    def __init__(self, max_einzeln):
+        self.seq = 0
+        self.neueste = {}  # Typ -> (seq, daten) für zusammenfassbare Ereignisse
+        self.einzeln = deque(maxlen=max_einzeln)  # (seq, typ, daten)
+        self.fertig = False
+
+
+class EreignisBus:
+    """Hält die letzten Ereignisse je Job im Speicher (thread-sicher, für beliebig viele Leser)"""
+
+    def __init__(self, max_jobs=200, max_einzeln=500):
+        self.max_jobs = max_jobs
+        self.max_einzeln = max_einzeln
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def emit(self, job_id, typ, **daten):
+        daten["ts"] = round(time.time(), 3)
+        with self._lock:
+            je = self._jobs.get(job_id)
+            if je is None:
+                je = self._jobs[job_id] = _JobEreignisse(self.max_einzeln)
+                while len(self._jobs) > self.max_jobs:
+                    self._jobs.popitem(last=False)
+            else:
+                self._jobs.move_to_end(job_id)
+            if typ == START:
+                # Neuer Lauf (z.B. Retry): alte Ereignisse verwerfen, Sequenz läuft für Last-Event-ID weiter
+                je.neueste.clear()
+                je.einzeln.clear()
+                je.fertig = False
+            je.seq += 1
+            if typ in ZUSAMMENFASSBAR:
+                je.neueste[typ] = (je.seq, daten)
+            else:
+                je.einzeln.append((je.seq, typ, daten))
+            if typ == ENDE:
+                je.fertig = True
+
+    def seit(self, job_id, seq):
+        """Ereignisse nach `seq` als sortierte Liste [(seq, typ, daten)] und ob der Job beendet ist"""
+        with self._lock:
+            je = self._jobs.get(job_id)
+            if je is None:
+                return [], False
+            if je.seq <= seq:
+                return [], je.fertig
+            neu = [(s, t, d) for s, t, d in je.einzeln if s > seq]
+            neu += [(s, t, d) for t, (s, d) in je.neueste.items() if s > seq]
+            fertig = je.fertig
+        neu.sort(key=lambda e: e[0])
+        return neu, fertig
+
+    async def stream(self, job_id, seit=0, snapshot=None, beendet=False, intervall=0.5, heartbeat=15.0):
+        """Liefert Ereignisse als SSE-Text, gebündelt je Intervall; endet nach dem done-Ereignis
+
+        `snapshot` (aktueller Job-Status) wird vorweg als status-Ereignis gesendet. Ist der Job laut
+        Datenbank schon `beendet`, werden nur noch die vorhandenen Ereignisse ausgeliefert.
+        """
+        if snapshot is not None:
+            yield _sse(None, "status", snapshot)
+        letzte_ausgabe = time.monotonic()
+        while True:
+            neu, fertig = self.seit(job_id, seit)
+            if neu:
+                seit = neu[-1][0]
+                yield "".join(_sse(s, t, d) for s, t, d in neu)
+                letzte_ausgabe = time.monotonic()
+            if fertig or beendet:
+                return
+            if time.monotonic() - letzte_ausgabe >= heartbeat:
+                yield ": ping\n\n"  # hält Proxys und EventSource-Verbindung offen
+                letzte_ausgabe = time.monotonic()
+            await asyncio.sleep(intervall)
@@ -0,0 +1,44 @@
+# firmen.py – Kanonische Firmenschlüssel für Deduplizierung und Cache
+# "ACME GmbH", "acme  gmbh & Co. KG" und "ACME AG" ergeben denselben Schlüssel "acme".
+
+import re
+
+# Rechtsform-Bestandteile, die am Namensende entfernt werden (bereits ohne Punkte/Klammern)
+RECHTSFORM_TOKENS = {
+    "gmbh", "mbh", "ggmbh", "ag", "se", "kg", "kgaa", "ohg", "gbr", "ug", "haftungsbeschränkt",
+    "ek", "ev", "eg", "co", "&", "+", "und",
+    "ltd", "limited", "inc", "llc", "corp", "corporation", "plc", "bv", "nv", "sa", "sas",
+    "sarl", "srl", "spa", "sro", "ab", "as", "aps", "oy", "kft", "zoo", "spzoo",
+}
+
+# Mehrteilige Kürzel, die vor dem Zerlegen zusammengezogen werden ("e. K." -> "ek", "S.à r.l." -> "sarl")
+_ABKUERZUNGEN = [
+    (re.compile(r"\be\.\s*k\.?(?=\s|$)"), "ek"),
+    (re.compile(r"\be\.\s*v\.?(?=\s|$)"), "ev"),
+    (re.compile(r"\bs\.\s*à\s*r\.\s*l\.?(?=\s|$)"), "sarl"),
+    (re.compile(r"\bsp\.\s*z\s*o\.\s*o\.?(?=\s|$)"), "spzoo"),
+]
+# Übrige Kürzel aus einzelnen Buchstaben mit Punkten ("B.V.", "N.V.", "S.A.", "S.p.A.", "S.A.S.") -> "bv" usw.
+_PUNKT_KUERZEL = re.compile(r"(?<![\w.])(?:[^\W\d_]\.\s?)+[^\W\d_]\.?(?!\w)")
+_SATZZEICHEN = re.compile(r"[.,;:()\[\]\"'/]")
+
+
+def firmen_key(firma):
+    """Bildet einen kanonischen Schlüssel: Kleinschreibung, Leerzeichen vereinheitlicht, Rechtsform entfernt
+
+    >>> firmen_key("Sony Europe B.V.") == firmen_key("Sony Europe BV") == "sony europe"
+    True
+    >>> [firmen_key(f) for f in ("Telefonica S.A.", "Philips N.V.", "Eni S.p.A.", "Lagardère S.A.S.")]
+    ['telefonica', 'philips', 'eni', 'lagardère']
+    >>> [firmen_key(f) for f in ("Muster e. K.", "Kowalski sp. z o.o.", "Dupont S.à r.l.", "Müller u. Söhne")]
+    ['muster', 'kowalski', 'dupont', 'müller u söhne']
+    """
+    text = " ".join(firma.casefold().split())
+    for muster, ersatz in _ABKUERZUNGEN:
+        text = muster.sub(ersatz, text)
+    text = _PUNKT_KUERZEL.sub(lambda m: m.group().replace(".", "").replace(" ", ""), text)
+    tokens = _SATZZEICHEN.sub(" ", text).split()
+    # Rechtsformen nur am Ende entfernen, mindestens ein Token bleibt stehen
+    while len(tokens) > 1 and tokens[-1] in RECHTSFORM_TOKENS:
+        tokens.pop()
+    return " ".join(tokens)
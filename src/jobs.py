@@ -0,0 +1,334 @@
+# jobs.py – Persistente Job-Warteschlange für Enrichment-Läufe
+# Jobs liegen in einer lokalen SQLite-Datei und überleben damit Neustarts des Servers.
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_NEEDS_REAUTH = "needs_reauth"  # wartet auf eine neue LinkedIn-Anmeldung
+
+FINAL_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED, STATUS_NEEDS_REAUTH)
+
+JSON_FIELDS = ("rollen", "options", "summary")
+
+
+def _eta(started_at, rows_done, rows_total):
+    """Restlaufzeit in Sekunden, hochgerechnet aus dem bisherigen Tempo"""
+    if not (started_at and rows_done and rows_total):
+        return None
+    verstrichen = time.time() - started_at
+    return round(verstrichen / rows_done * max(rows_total - rows_done, 0))
+
+
+class JobCancelled(Exception):
+    """Wird ausgelöst, wenn ein laufender Job abgebrochen wurde"""
+
+
+class ReauthRequired(Exception):
+    """Wird ausgelöst, wenn die Anmeldung ungültig ist – der Job wartet dann auf eine neue Anmeldung"""
+
+
+class JobStore:
+    """SQLite-Speicher für Jobs (thread-sicher über ein gemeinsames Lock)"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    input_file TEXT NOT NULL,
+                    rollen TEXT,
+                    options TEXT,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    rows_total INTEGER DEFAULT 0,
+                    rows_done INTEGER DEFAULT 0,
+                    result_file TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER DEFAULT 0,
+                    summary TEXT
+                )
+            """)
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        for feld in JSON_FIELDS:
+            job[feld] = json.loads(job[feld]) if job.get(feld) else ({} if feld != "rollen" else [])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def create(self, input_file, rollen, filename=None, options=None, summary=None):
+        """Legt einen neuen Job in der Warteschlange an (mit `summary` schon vorab bekannte Kennzahlen)"""
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, filename, input_file, rollen, options, created_at, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, filename, str(input_file),
+                 json.dumps(list(rollen)), json.dumps(options or {}), time.time(),
+                 json.dumps(summary) if summary else None),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def list(self, limit=50):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def stats(self):
+        """Anzahl Jobs je Status und noch offene Zeilen laufender Jobs"""
+        with self._lock:
+            je_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            offen = self._conn.execute(
+                "SELECT COALESCE(SUM(MAX(rows_total - rows_done, 0)), 0) FROM jobs WHERE status = ?",
+                (STATUS_RUNNING,),
+            ).fetchone()[0]
+        return {"jobs": je_status, "rows_in_flight": offen}
+
+    def update(self, job_id, **fields):
+        """Aktualisiert einzelne Felder eines Jobs"""
+        if not fields:
+            return
+        for feld in JSON_FIELDS:
+            if feld in fields:
+                fields[feld] = json.dumps(fields[feld])
+        spalten = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {spalten} WHERE id = ?", (*fields.values(), job_id))
+
+    def next_queued(self, limit=1):
+        """Die ältesten wartenden Jobs (in der Reihenfolge, in der claim_next sie holt)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?", (STATUS_QUEUED, limit)
+            ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def claim_next(self):
+        """Holt den ältesten wartenden Job und markiert ihn atomar als laufend"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (STATUS_RUNNING, time.time(), row["id"]),
+            )
+        return self.get(row["id"])
+
+    def request_cancel(self, job_id, events=None):
+        """Bricht einen Job ab; wartende Jobs sofort, laufende beim nächsten Prüfpunkt
+
+        Ein wartender Job läuft nie durch einen Worker – das done-Ereignis für seine Live-Clients
+        (optionaler EreignisBus `events`) wird deshalb hier gesendet.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return job
+        with self._lock, self._conn:
+            # Nur solange er noch wartet – sonst hat ihn inzwischen ein Worker übernommen
+            sofort = self._conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ? AND status = ?",
+                (STATUS_CANCELLED, time.time(), job_id, STATUS_QUEUED),
+            ).rowcount
+            if not sofort:
+                self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        if sofort and events is not None:
+            events.emit(job_id, "done", status=STATUS_CANCELLED)
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def requeue(self, job_id):
+        """Reiht einen fehlgeschlagenen oder abgebrochenen Job erneut ein (setzt über das Journal fort)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 0, error = NULL, started_at = NULL, "
+                "finished_at = NULL, rows_done = 0 WHERE id = ? AND status IN (?, ?, ?)",
+                (STATUS_QUEUED, job_id, STATUS_FAILED, STATUS_CANCELLED, STATUS_NEEDS_REAUTH),
+            )
+        return self.get(job_id)
+
+    def requeue_reauth(self):
+        """Reiht alle Jobs, die auf eine Anmeldung gewartet haben, wieder ein"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, started_at = NULL, finished_at = NULL, rows_done = 0 "
+                "WHERE status = ?",
+                (STATUS_QUEUED, STATUS_NEEDS_REAUTH),
+            )
+        return cur.rowcount
+
+    def requeue_interrupted(self):
+        """Setzt nach einem Neustart unterbrochene Jobs zurück in die Warteschlange"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (STATUS_QUEUED, STATUS_RUNNING),
+            )
+        return cur.rowcount
+
+
+class JobHandle:
+    """Wird an run_enrichment übergeben, um Fortschritt zu melden und Abbrüche zu prüfen"""
+
+    def __init__(self, store, job_id, events=None):
+        self.store = store
+        self.job_id = job_id
+        self.events = events  # optionaler EreignisBus für Live-Fortschritt
+        self.started_at = time.time()
+        self.rows_total = 0
+        self.rows_done = 0
+
+    def emit(self, typ, **daten):
+        """Meldet ein Fortschritts-Ereignis an die Live-Clients (ohne EreignisBus ein No-op)"""
+        if self.events is not None:
+            self.events.emit(self.job_id, typ, **daten)
+
+    def _progress(self):
+        self.emit("progress", rows_done=self.rows_done, rows_total=self.rows_total,
+                  eta_seconds=_eta(self.started_at, self.rows_done, self.rows_total))
+
+    def set_total(self, rows_total):
+        self.rows_total = rows_total
+        self.store.update(self.job_id, rows_total=rows_total)
+        self._progress()
+
+    def advance(self, n=1):
+        self.rows_done += n
+        self.store.update(self.job_id, rows_done=self.rows_done)
+        self._progress()
+
+    def set_summary(self, **werte):
+        summary = self.store.get(self.job_id)["summary"]
+        summary.update(werte)
+        self.store.update(self.job_id, summary=summary)
+        self.emit("summary", **summary)
+
+    def check_cancelled(self):
+        if self.store.cancel_requested(self.job_id):
+            raise JobCancelled(f"Job {self.job_id} wurde abgebrochen")
+
+    def sleep(self, seconds, step=1.0):
+        """Wartet wie time.sleep, reagiert aber zwischendurch auf Abbrüche"""
+        ende = time.monotonic() + seconds
+        while True:
+            self.check_cancelled()
+            rest = ende - time.monotonic()
+            if rest <= 0:
+                return
+            time.sleep(min(step, rest))
+
+
+def job_status(job):
+    """Bereitet einen Job für die API auf (inkl. ETA in Sekunden)"""
+    if job is None:
+        return None
+    eta = None
+    if job["status"] == STATUS_RUNNING:
+        eta = _eta(job["started_at"], job["rows_done"], job["rows_total"])
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "filename": job["filename"],
+        "rollen": job["rollen"],
+        "rows_total": job["rows_total"],
+        "rows_done": job["rows_done"],
+        "eta_seconds": eta,
+        "result_file": job["result_file"],
+        "error": job["error"],
+        "cancel_requested": job["cancel_requested"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "summary": job["summary"],
+    }
+
+
+class JobWorkerPool:
+    """Hintergrund-Worker, die wartende Jobs aus dem JobStore abarbeiten"""
+
+    def __init__(self, store, runner, workers=1, poll_interval=1.0, events=None):
+        self.store = store
+        self.runner = runner  # runner(job, handle) -> Path der Ergebnisdatei
+        self.events = events
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        wieder_eingereiht = self.store.requeue_interrupted()
+        if wieder_eingereiht:
+            print(f"🔁 {wieder_eingereiht} unterbrochene Jobs wieder eingereiht")
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"job-worker-{i + 1}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        print(f"👷 {self.workers} Job-Worker gestartet")
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _loop(self):
+        while not self._stop.is_set():
+            job = self.store.claim_next()
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        handle = JobHandle(self.store, job["id"], events=self.events)
+        print(f"▶️ Starte Job {job['id']} ({job['filename']})")
+        handle.emit("started", filename=job["filename"])
+        try:
+            result_path = self.runner(job, handle)
+            self.store.update(job["id"], status=STATUS_DONE, result_file=Path(result_path).name,
+                              finished_at=time.time())
+            handle.emit("done", status=STATUS_DONE, result_file=Path(result_path).name)
+            print(f"✅ Job {job['id']} abgeschlossen")
+        except JobCancelled:
+            self.store.update(job["id"], status=STATUS_CANCELLED, finished_at=time.time())
+            handle.emit("done", status=STATUS_CANCELLED)
+            print(f"⏹️ Job {job['id']} abgebrochen")
+        except ReauthRequired as e:
+            self.store.update(job["id"], status=STATUS_NEEDS_REAUTH, error=str(e), finished_at=time.time())
+            handle.emit("done", status=STATUS_NEEDS_REAUTH, error=str(e))
+            print(f"🔐 Job {job['id']} wartet auf neue Anmeldung")
+        except Exception as e:
+            self.store.update(job["id"], status=STATUS_FAILED, error=str(e), finished_at=time.time())
+            handle.emit("done", status=STATUS_FAILED, error=str(e))
+            print(f"❌ Job {job['id']} fehlgeschlagen: {e}")
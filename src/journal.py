@@ -0,0 +1,79 @@
+# journal.py – Append-only Journal je Job für Checkpoint/Resume
+# Jede fertig gescrapte Firma wird als JSON-Zeile angehängt und sofort auf die Platte geschrieben.
+# Ein neu gestarteter Job liest das Journal, überspringt erledigte Firmen und baut die
+# Ergebnisdatei daraus neu auf. Nach einem erfolgreichen Lauf wird das Journal gelöscht.
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class EnrichmentJournal:
+    """Journal der erledigten Firmen eines Jobs (eine JSON-Zeile pro Firma)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self, rollen):
+        """Liest erledigte Firmen als {Firmenschlüssel: Kontakte}; unvollständige Zeilen werden ignoriert"""
+        erledigt = {}
+        if not self.path.exists():
+            return erledigt
+        rollen = sorted(rollen)
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    eintrag = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # z.B. abgeschnittene letzte Zeile nach einem Absturz
+                if eintrag.get("rollen") == rollen:
+                    erledigt[eintrag["key"]] = eintrag["contacts"]
+        return erledigt
+
+    def append(self, key, firma, contacts, rollen):
+        eintrag = {"key": key, "firma": firma, "rollen": sorted(rollen), "contacts": contacts, "ts": time.time()}
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._reparieren()
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(eintrag, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _reparieren(self):
+        """Schneidet eine nach einem Absturz unvollständige letzte Zeile ab – sonst klebt der nächste
+        Eintrag an ihr und beide gehen beim Laden verloren"""
+        try:
+            f = self.path.open("r+b")
+        except FileNotFoundError:
+            return
+        with f:
+            ende = f.seek(0, os.SEEK_END)
+            pos = ende
+            while pos > 0:
+                block = min(64 * 1024, pos)
+                f.seek(pos - block)
+                daten = f.read(block)
+                umbruch = daten.rfind(b"\n")
+                if umbruch >= 0:
+                    pos = pos - block + umbruch + 1
+                    break
+                pos -= block
+            if pos < ende:
+                f.truncate(pos)
+
+    def remove(self):
+        """Schließt und löscht das Journal (nach erfolgreichem Lauf, das Ergebnis ist geschrieben)"""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
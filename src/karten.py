@@ -0,0 +1,146 @@
+# karten.py – Ergebniskarten in Name, Position, Firmenzeile und Lead-Link zerlegen
+#
+# Im Browser werden je Karte nur der sichtbare Text (innerText) und der Lead-Link gelesen; die
+# Zerlegung in Felder passiert hier in Python. Dieselbe Zerlegung läuft bei der Wiedergabe
+# aufgezeichneter Trefferlisten (siehe aufnahmen.py) über gespeichertes HTML, dessen Text
+# karten_aus_html() ohne Browser nachbildet: Blockelemente und <br> trennen Zeilen, Leerraum wird
+# zusammengefasst, Skripte, Styles und versteckte Elemente (hidden, display:none) fallen weg.
+
+import re
+from html import unescape
+
+KARTEN_KLASSE = "artdeco-list__item"
+LEAD_PFAD = "/sales/lead/"
+
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+})
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                       "source", "track", "wbr"})
+
+
+def karte_aus_text(text, href=""):
+    """Felder einer Karte aus ihrem Text: Zeile 1 Name, Zeile 2 Position, Zeile 3 Firma"""
+    lines = [l.strip() for l in text.split("\n") if l.strip()]
+    return {
+        "text": text,
+        "name": lines[0] if len(lines) > 0 else "",
+        "position": lines[1] if len(lines) > 1 else "",
+        "firmaline": lines[2] if len(lines) > 2 else "",
+        "href": href or "",
+    }
+
+
+_ATTRIBUTE = r"""[^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*"""  # Attribute bis ">", auch mit ">" in Anführungszeichen
+_UNSICHTBAR = re.compile(r"<!--.*?-->|<(script|style|template|noscript|head)\b.*?</\1\s*>", re.S | re.I)
+_LI = re.compile(r"<(/?)li\b(" + _ATTRIBUTE + ")>", re.I)
+_BLOCK = re.compile(r"</?(?:br|" + "|".join(sorted(BLOCK_TAGS)) + r")\b[^>]*>", re.I)
+_TAG = re.compile(r"<[a-zA-Z/!][^>]*>")
+_LINK_START = re.compile(r"<a\s", re.I)
+_KLASSE = re.compile(r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+_LEERRAUM = re.compile(r"[^\S\n]+")
+_UMBRUECHE = re.compile(r" ?\n[ \n]*")
+# Hinweis auf versteckte Elemente (hidden-Attribut, display:none) – nur dann der genaue Weg
+_VERSTECKT = re.compile(r"""\shidden(?=[\s=/>])|display\s*:\s*none""", re.I)
+# (Kommentar/Doctype, "/" bei Endtags, Tag, Attribute, Text)
+_TOKEN = re.compile(r"(<!.*?>)|<(/?)([a-zA-Z][^\s/>]*)(" + _ATTRIBUTE + r")>|([^<]+|<)", re.S)
+_ATTRIBUT = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+_TRENNER = "\x00"  # trennt die Karten, wenn ihr Text in einem Durchgang gebildet wird
+
+
+def _attribute(text):
+    return {m.group(1).lower(): unescape(m.group(2) or m.group(3) or m.group(4) or "")
+            for m in _ATTRIBUT.finditer(text)}
+
+
+def _zeilen(text):
+    """Leerraum je Zeile zusammenfassen, leere Zeilen weglassen"""
+    zeilen = (" ".join(zeile.split()) for zeile in text.split("\n"))
+    return "\n".join(z for z in zeilen if z)
+
+
+def _versteckt(fragment):
+    return ("hidden" in fragment or "display" in fragment) and _VERSTECKT.search(fragment) is not None
+
+
+def _texte_schnell(fragmente):
+    """Texte ohne versteckte Elemente: Blockgrenzen werden Zeilenumbrüche, übrige Tags fallen weg
+
+    Alle Karten in einem Durchgang (getrennt durch _TRENNER) – die regulären Ausdrücke laufen so
+    einmal je Trefferliste statt einmal je Karte.
+    """
+    text = _TRENNER.join(f.replace(_TRENNER, "") for f in fragmente).replace("\n", " ")  # Quelltext-Umbrüche sind Leerraum
+    text = unescape(_TAG.sub("", _BLOCK.sub("\n", text)))
+    text = _UMBRUECHE.sub("\n", _LEERRAUM.sub(" ", text))  # wie _zeilen, für alle Karten auf einmal
+    return [t.strip(" \n") for t in text.split(_TRENNER)]
+
+
+def _text_genau(fragment):
+    """Text mit versteckten Elementen: Tag für Tag, versteckte Teilbäume werden übersprungen"""
+    teile = []
+    versteckt = None  # [tag, tiefe] des versteckten Elements, in dem wir stehen
+    for _, ende, tag, rest, text in _TOKEN.findall(fragment):
+        if not tag:
+            if text and not versteckt:
+                teile.append(unescape(text).replace("\n", " "))
+            continue
+        tag = tag.lower()
+        if versteckt:
+            if tag == versteckt[0]:
+                versteckt[1] += -1 if ende else 1
+                if not versteckt[1]:
+                    versteckt = None
+            continue
+        if not ende and tag not in VOID_TAGS and not rest.rstrip().endswith("/"):
+            attrs = _attribute(rest)
+            if "hidden" in attrs or "display:none" in attrs.get("style", "").replace(" ", ""):
+                versteckt = [tag, 1]
+                continue
+        if tag == "br" or tag in BLOCK_TAGS:
+            teile.append("\n")
+    return _zeilen("".join(teile))
+
+
+def _lead_link(fragment):
+    """Erster Link auf ein Lead-Profil (wie querySelectorAll, auch in versteckten Elementen)"""
+    if LEAD_PFAD not in fragment:
+        return ""
+    for m in _LINK_START.finditer(fragment):
+        ende = fragment.find(">", m.end())
+        attrs = fragment[m.end():ende if ende >= 0 else len(fragment)]
+        if LEAD_PFAD in attrs:
+            href = _attribute(attrs).get("href") or ""
+            if LEAD_PFAD in href:
+                return href
+    return ""
+
+
+def karten_aus_html(html, klasse=KARTEN_KLASSE):
+    """Karten (wie die Live-Extraktion) aus dem HTML einer Trefferliste
+
+    Je <li class="…artdeco-list__item…"> wird der Text wie innerText zusammengesetzt und der
+    erste Lead-Link gemerkt. Kartengrenzen und Text entstehen über reguläre Ausdrücke; nur Karten
+    mit versteckten Elementen werden Tag für Tag gelesen.
+    """
+    html = _UNSICHTBAR.sub("", html)
+    fragmente = []
+    start = None  # Beginn der offenen Karte
+    tiefe = 0
+    for m in _LI.finditer(html):
+        if start is None:
+            k = not m.group(1) and klasse in m.group(2) and _KLASSE.search(m.group(2))
+            if k and klasse in unescape(k.group(1) or k.group(2) or k.group(3) or "").split():
+                start, tiefe = m.end(), 1
+            continue
+        tiefe += -1 if m.group(1) else 1
+        if not tiefe:
+            fragmente.append(html[start:m.start()])
+            start = None
+    if start is not None:  # abgeschnittenes HTML: offene Karte trotzdem übernehmen
+        fragmente.append(html[start:])
+
+    genau = [_versteckt(f) for f in fragmente]
+    schnell = iter(_texte_schnell([f for f, g in zip(fragmente, genau) if not g]))
+    return [karte_aus_text(_text_genau(f) if g else next(schnell), _lead_link(f)) for f, g in zip(fragmente, genau)]
@@ -0,0 +1,116 @@
+# lead_cache.py – Persistenter Cache für gescrapte Kontakte
+# Schlüssel: kanonischer Firmenschlüssel (siehe firmen.py) + sortierte Rollenauswahl.
+# Einträge laufen nach einer TTL ab, bei Überschreiten von max_entries werden die am längsten
+# nicht genutzten Einträge verdrängt (LRU).
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from firmen import firmen_key
+
+
+def cache_key(firma, rollen):
+    return f"{firmen_key(firma)}|{','.join(sorted(r.strip() for r in rollen if r.strip()))}"
+
+
+class LeadCache:
+    """SQLite-Cache für die Kontakte je Firma und Rollenauswahl"""
+
+    def __init__(self, db_path, ttl_seconds=7 * 24 * 3600, max_entries=50000):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS leads (
+                    key TEXT PRIMARY KEY,
+                    firma TEXT,
+                    contacts TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_last_access ON leads(last_access)")
+
+    def get(self, firma, rollen):
+        """Liefert die gecachten Kontakte oder None (abgelaufen bzw. nicht vorhanden)"""
+        key = cache_key(firma, rollen)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT contacts, expires_at FROM leads WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM leads WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE leads SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, firma, rollen, contacts, ttl_seconds=None):
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leads (key, firma, contacts, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(firma, rollen), firma, json.dumps(contacts, ensure_ascii=False), now, now + ttl, now),
+            )
+            self._evict()
+
+    def put_many(self, eintraege):
+        """Wie put für viele (firma, rollen, contacts, ttl_seconds) in einer Transaktion"""
+        now = time.time()
+        zeilen = [
+            (cache_key(firma, rollen), firma, json.dumps(contacts, ensure_ascii=False), now,
+             now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds), now)
+            for firma, rollen, contacts, ttl_seconds in eintraege
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO leads (key, firma, contacts, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                zeilen,
+            )
+            self._evict()
+
+    def _evict(self):
+        """Verdrängt die am längsten nicht genutzten Einträge über max_entries hinaus"""
+        anzahl = self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        ueberzaehlig = anzahl - self.max_entries
+        if ueberzaehlig > 0:
+            self._conn.execute(
+                "DELETE FROM leads WHERE key IN (SELECT key FROM leads ORDER BY last_access LIMIT ?)",
+                (ueberzaehlig,),
+            )
+            self.evictions += ueberzaehlig
+
+    def purge_expired(self):
+        """Entfernt alle abgelaufenen Einträge"""
+        with self._lock, self._conn:
+            cur = self._conn.execute("DELETE FROM leads WHERE expires_at < ?", (time.time(),))
+        return cur.rowcount
+
+    def stats(self):
+        with self._lock:
+            anzahl = self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+        anfragen = self.hits + self.misses
+        return {
+            "entries": anzahl,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / anfragen, 3) if anfragen else None,
+            "evictions": self.evictions,
+        }
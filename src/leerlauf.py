@@ -0,0 +1,126 @@
+# leerlauf.py – Hintergrundaufgaben in den Leerlaufphasen der Browser-Sitzung
+#
+# Pausen der Sitzung (mehrere Minuten) und die Wartezeiten zwischen Firmen haben bisher nur
+# geschlafen. warten(sekunden) wartet jetzt kooperativ: solange Zeit bleibt, arbeitet es eingereihte
+# Aufgaben ohne Browser ab (Cache-Pflege, fertige Ergebnisse vorkomprimieren, die Firmenliste des
+# nächsten Jobs vorbereiten) und schläft nur den Rest. Eine Aufgabe ist eine Funktion oder ein
+# Generator: nach jedem yield wird die verbleibende Zeit geprüft, ein unfertiger Generator wird im
+# nächsten Leerlauf fortgesetzt. Ein Schritt sollte deshalb deutlich unter einer Sekunde bleiben.
+#
+#   leerlauf.einreihen("lead_cache_pflege", lead_cache.purge_expired)
+#   erledigt = leerlauf.warten(300, stop=stop_event)
+
+import collections
+import inspect
+import threading
+import time
+
+
+class _Aufgabe:
+    def __init__(self, name, func, args):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.schritte = None  # laufender Generator einer schrittweisen Aufgabe
+
+
+class Leerlauf:
+    """Warteschlange von Hintergrundaufgaben, abgearbeitet in Wartezeiten"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._aufgaben = collections.deque()
+        self._namen = set()  # eingereiht oder gerade in Arbeit
+        self.erledigt = 0
+        self.fehlgeschlagen = 0
+        self.arbeit_sekunden = 0.0
+
+    def einreihen(self, name, func, *args):
+        """Reiht func(*args) ein; False, wenn eine Aufgabe dieses Namens schon ansteht"""
+        with self._lock:
+            if name in self._namen:
+                return False
+            self._namen.add(name)
+            self._aufgaben.append(_Aufgabe(name, func, args))
+            return True
+
+    def wartend(self):
+        with self._lock:
+            return len(self._aufgaben)
+
+    def abarbeiten(self, sekunden, stop=None, pruefen=None):
+        """Arbeitet Aufgaben ab, bis die Zeit um ist oder keine mehr ansteht; liefert die Zahl erledigter"""
+        ende = time.monotonic() + sekunden
+        erledigt = 0
+        while time.monotonic() < ende and not (stop and stop.is_set()):
+            if pruefen:
+                pruefen()
+            with self._lock:
+                if not self._aufgaben:
+                    break
+                aufgabe = self._aufgaben.popleft()
+            erledigt += self._ausfuehren(aufgabe, ende)
+        return erledigt
+
+    def warten(self, sekunden, stop=None, pruefen=None):
+        """Wartet `sekunden` und arbeitet währenddessen Aufgaben ab; liefert die Zahl erledigter
+
+        Mit `stop` (threading.Event) endet das Warten vorzeitig; pruefen() wird etwa jede Sekunde
+        aufgerufen (z.B. für Abbrüche). Während des Wartens eingereihte Aufgaben laufen noch mit.
+        """
+        ende = time.monotonic() + sekunden
+        erledigt = 0
+        while not (stop and stop.is_set()):
+            rest = ende - time.monotonic()
+            if rest <= 0:
+                break
+            if self.wartend():
+                erledigt += self.abarbeiten(rest, stop, pruefen)
+                continue
+            if pruefen:
+                pruefen()
+            if stop:
+                stop.wait(min(rest, 1.0))
+            else:
+                time.sleep(min(rest, 1.0))
+        return erledigt
+
+    def _ausfuehren(self, aufgabe, ende):
+        """Führt eine Aufgabe aus bzw. fort, bis sie fertig oder die Zeit um ist; 1 = erledigt"""
+        start = time.monotonic()
+        fertig = True
+        try:
+            if aufgabe.schritte is None:
+                ergebnis = aufgabe.func(*aufgabe.args)
+                if inspect.isgenerator(ergebnis):
+                    aufgabe.schritte = ergebnis
+            if aufgabe.schritte is not None:
+                fertig = False
+                while time.monotonic() < ende:
+                    next(aufgabe.schritte)
+        except StopIteration:
+            fertig = True
+        except Exception as e:
+            print(f"⚠️ Leerlauf: Aufgabe '{aufgabe.name}' fehlgeschlagen: {e}")
+            with self._lock:
+                self.fehlgeschlagen += 1
+                self._namen.discard(aufgabe.name)
+                self.arbeit_sekunden += time.monotonic() - start
+            return 0
+        with self._lock:
+            self.arbeit_sekunden += time.monotonic() - start
+            if not fertig:  # Zeit um: im nächsten Leerlauf als erste fortsetzen
+                self._aufgaben.appendleft(aufgabe)
+                return 0
+            self.erledigt += 1
+            self._namen.discard(aufgabe.name)
+        return 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "wartend": len(self._aufgaben),
+                "erledigt": self.erledigt,
+                "fehlgeschlagen": self.fehlgeschlagen,
+                "arbeit_sekunden": round(self.arbeit_sekunden, 1),
+            }
@@ -0,0 +1,184 @@
+# metriken.py – Zähler, Messwerte und Histogramme im Prometheus-Textformat (ohne externe Abhängigkeit)
+#
+# Metriken melden sich beim Anlegen in REGISTRY an; REGISTRY.render() liefert den Text für /metrics.
+# Labels werden als Keyword-Argumente übergeben: FEHLER.inc(type="TimeoutError").
+
+import bisect
+import math
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Sekunden; deckt Klicks (ms) bis zu den Pausen (Minuten) ab
+STANDARD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 600)
+
+
+def _wert(zahl):
+    if zahl == math.inf:
+        return "+Inf"
+    if isinstance(zahl, float) and zahl.is_integer():
+        return str(int(zahl))
+    return repr(zahl)
+
+
+def _escape(text):
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(namen, werte, extra=()):
+    paare = [*zip(namen, werte), *extra]
+    if not paare:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(w)}"' for n, w in paare) + "}"
+
+
+class Registry:
+    """Sammlung aller Metriken eines Prozesses"""
+
+    def __init__(self):
+        self._metriken = []
+        self._lock = threading.Lock()
+
+    def register(self, metrik):
+        with self._lock:
+            if any(m.name == metrik.name for m in self._metriken):
+                raise ValueError(f"Metrik {metrik.name} ist bereits registriert")
+            self._metriken.append(metrik)
+        return metrik
+
+    def render(self):
+        """Alle Metriken im Prometheus-Textformat"""
+        with self._lock:
+            metriken = list(self._metriken)
+        zeilen = []
+        for m in metriken:
+            zeilen.append(f"# HELP {m.name} {_escape(m.hilfe)}")
+            zeilen.append(f"# TYPE {m.name} {m.typ}")
+            zeilen.extend(m.samples())
+        return "\n".join(zeilen) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metrik:
+    typ = "untyped"
+
+    def __init__(self, name, hilfe, labels=(), registry=REGISTRY):
+        self.name = name
+        self.hilfe = hilfe
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} erwartet die Labels {self.labels}, bekam {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+
+class Counter(_Metrik):
+    """Monoton steigender Zähler"""
+
+    typ = "counter"
+
+    def __init__(self, name, hilfe, labels=(), registry=REGISTRY):
+        super().__init__(name, hilfe, labels, registry)
+        self._werte = {} if self.labels else {(): 0.0}
+
+    def inc(self, betrag=1, **labels):
+        if betrag < 0:
+            raise ValueError("Counter können nur steigen")
+        key = self._key(labels)
+        with self._lock:
+            self._werte[key] = self._werte.get(key, 0.0) + betrag
+
+    def value(self, **labels):
+        with self._lock:
+            return self._werte.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            werte = sorted(self._werte.items())
+        return [f"{self.name}{_labels_text(self.labels, k)} {_wert(v)}" for k, v in werte]
+
+
+class Gauge(_Metrik):
+    """Momentanwert; alternativ beim Export über eine Funktion ermittelt"""
+
+    typ = "gauge"
+
+    def __init__(self, name, hilfe, labels=(), registry=REGISTRY):
+        super().__init__(name, hilfe, labels, registry)
+        self._werte = {} if self.labels else {(): 0.0}
+        self._funktion = None
+
+    def set(self, wert, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._werte[key] = float(wert)
+
+    def inc(self, betrag=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._werte[key] = self._werte.get(key, 0.0) + betrag
+
+    def dec(self, betrag=1, **labels):
+        self.inc(-betrag, **labels)
+
+    def set_function(self, funktion):
+        """funktion() liefert den Wert – bei Labels ein dict {Labelwert oder Tupel: Wert}"""
+        self._funktion = funktion
+
+    def samples(self):
+        if self._funktion is not None:
+            try:
+                ergebnis = self._funktion()
+            except Exception as e:
+                print(f"⚠️ Metrik {self.name} konnte nicht ermittelt werden: {e}")
+                return []
+            if not self.labels:
+                werte = [((), ergebnis)]
+            else:
+                werte = sorted(((k if isinstance(k, tuple) else (k,)), v) for k, v in ergebnis.items())
+        else:
+            with self._lock:
+                werte = sorted(self._werte.items())
+        return [f"{self.name}{_labels_text(self.labels, k)} {_wert(float(v))}" for k, v in werte]
+
+
+class Histogram(_Metrik):
+    """Verteilung von Messwerten in kumulativen Buckets, dazu Summe und Anzahl"""
+
+    typ = "histogram"
+
+    def __init__(self, name, hilfe, labels=(), buckets=STANDARD_BUCKETS, registry=REGISTRY):
+        super().__init__(name, hilfe, labels, registry)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf)) + (math.inf,)
+        self._werte = {}  # Labelwerte -> [Zähler je Bucket, Summe, Anzahl]
+
+    def observe(self, wert, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, wert)
+        with self._lock:
+            eintrag = self._werte.get(key)
+            if eintrag is None:
+                eintrag = self._werte[key] = [[0] * len(self.buckets), 0.0, 0]
+            eintrag[0][i] += 1
+            eintrag[1] += wert
+            eintrag[2] += 1
+
+    def samples(self):
+        with self._lock:
+            werte = sorted((k, (list(e[0]), e[1], e[2])) for k, e in self._werte.items())
+        zeilen = []
+        for key, (zaehler, summe, anzahl) in werte:
+            kumuliert = 0
+            for grenze, n in zip(self.buckets, zaehler):
+                kumuliert += n
+                le = _labels_text(self.labels, key, [("le", _wert(grenze))])
+                zeilen.append(f"{self.name}_bucket{le} {kumuliert}")
+            zeilen.append(f"{self.name}_sum{_labels_text(self.labels, key)} {_wert(summe)}")
+            zeilen.append(f"{self.name}_count{_labels_text(self.labels, key)} {anzahl}")
+        return zeilen
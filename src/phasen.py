@@ -0,0 +1,66 @@
+# phasen.py – Zeitmessung einzelner Phasen des Scrapings (Navigation, Suche, Karten, Wartezeiten)
+#
+# Die Scrape-Funktionen markieren ihre Phasen mit `with phase("navigation"):`. Solange sich kein
+# Beobachter angemeldet hat, kostet das nur einen Listen-Check. Benchmarks, Metriken und Tracing
+# melden sich über add_observer() an und bekommen (name, start, dauer, attrs) je Phase.
+
+import threading
+import time
+from contextlib import contextmanager
+
+_observers = []
+_lock = threading.Lock()
+
+
+def add_observer(callback):
+    """Meldet callback(name, start, dauer, attrs) für alle künftigen Phasen an"""
+    with _lock:
+        _observers.append(callback)
+    return callback
+
+
+def remove_observer(callback):
+    with _lock:
+        if callback in _observers:
+            _observers.remove(callback)
+
+
+@contextmanager
+def phase(name, **attrs):
+    """Misst die Dauer des Blocks und meldet sie an alle Beobachter"""
+    if not _observers:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dauer = time.perf_counter() - start
+        for callback in list(_observers):
+            callback(name, start, dauer, attrs)
+
+
+class PhasenStatistik:
+    """Sammelt Phasendauern, z.B. für Benchmarks"""
+
+    def __init__(self):
+        self.dauern = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name, start, dauer, attrs):
+        with self._lock:
+            self.dauern.setdefault(name, []).append(dauer)
+
+    def zusammenfassung(self):
+        """{phase: {anzahl, summe, p50, p95}} in Sekunden"""
+        ergebnis = {}
+        with self._lock:
+            for name, werte in self.dauern.items():
+                sortiert = sorted(werte)
+                ergebnis[name] = {
+                    "anzahl": len(sortiert),
+                    "summe": sum(sortiert),
+                    "p50": sortiert[len(sortiert) // 2],
+                    "p95": sortiert[min(len(sortiert) - 1, int(len(sortiert) * 0.95))],
+                }
+        return ergebnis
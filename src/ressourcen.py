@@ -0,0 +1,124 @@
+# ressourcen.py – Schwere Seitenressourcen in den Automatisierungs-Seiten blockieren
+#
+# Zum Auslesen der Ergebniskarten reichen HTML und App-Skripte; Bilder, Schriften, Videos und
+# Tracking-Skripte kosten nur Ladezeit und Bandbreite. RessourcenPolitik hängt sich per page.route
+# an jede Playwright-Seite und bricht Anfragen nach Ressourcentyp oder URL-Muster (fnmatch) ab.
+# Skripte und Stylesheets werden stattdessen mit einer leeren Antwort bedient, damit die Seite
+# nicht auf Ladefehler läuft. Je Seite werden blockierte Anfragen und die geschätzt gesparten Bytes
+# gezählt (blockierte Ressourcen werden nie geladen, ihre echte Größe ist daher unbekannt).
+# Für Selenium gibt es kein Routing – dort blockiert Chrome per CDP nach URL-Mustern.
+
+import fnmatch
+import re
+import threading
+
+STANDARD_TYPEN = ("image", "media", "font")
+STANDARD_MUSTER = (
+    "*/li/track*", "*/tscp-serving/*", "*px.ads.linkedin.com/*", "*/sensorCollect*",
+    "*doubleclick.net/*", "*google-analytics.com/*", "*googletagmanager.com/*",
+)
+
+# Leere Ersatzantworten (Content-Type) statt Abbruch
+STUB_TYPEN = {"script": "application/javascript", "stylesheet": "text/css"}
+
+# Typische Größe je Ressourcentyp in Bytes, Grundlage der Schätzung
+GESCHAETZTE_BYTES = {
+    "image": 30_000, "media": 500_000, "font": 45_000, "script": 80_000,
+    "stylesheet": 40_000, "xhr": 5_000, "fetch": 5_000,
+}
+SONSTIGE_BYTES = 10_000
+
+# Für Selenium: Ressourcentypen als URL-Muster (CDP kennt nur URL-Blocklisten)
+TYP_ENDUNGEN = {
+    "image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"),
+    "media": ("*.mp4*", "*.webm*", "*.m4a*", "*.mp3*", "*.m3u8*"),
+    "font": ("*.woff*", "*.ttf*", "*.otf*", "*.eot*"),
+    "stylesheet": ("*.css*",),
+}
+
+
+class SeitenZaehler:
+    """Zähler einer Seite; stand() liefert (anfragen, blockiert, bytes_gespart)"""
+
+    def __init__(self):
+        self.anfragen = 0
+        self.blockiert = 0
+        self.bytes_gespart = 0
+
+    def stand(self):
+        return self.anfragen, self.blockiert, self.bytes_gespart
+
+
+class RessourcenPolitik:
+    """Legt fest, welche Anfragen der Automatisierungs-Seiten blockiert werden"""
+
+    def __init__(self, typen=STANDARD_TYPEN, muster=STANDARD_MUSTER, bei_blockiert=None):
+        self.typen = frozenset(typen)
+        self.muster = tuple(muster)
+        self._regex = re.compile("|".join(fnmatch.translate(m) for m in self.muster)) if self.muster else None
+        self.bei_blockiert = bei_blockiert  # bei_blockiert(typ, geschaetzte_bytes), z.B. für Metriken
+        self._zaehler = {}  # id(page) -> SeitenZaehler
+        self._lock = threading.Lock()
+
+    @property
+    def aktiv(self):
+        return bool(self.typen or self.muster)
+
+    def entscheiden(self, typ, url):
+        """None = laden, "stub" = leere Antwort, "abort" = abbrechen"""
+        if typ in self.typen or (self._regex is not None and self._regex.match(url)):
+            return "stub" if typ in STUB_TYPEN else "abort"
+        return None
+
+    def anwenden(self, page):
+        """Hängt die Politik an eine Playwright-Seite (im Thread, der die Seite benutzt, aufrufen)"""
+        if not self.aktiv:
+            return
+        zaehler = SeitenZaehler()
+        schluessel = id(page)
+        with self._lock:
+            self._zaehler[schluessel] = zaehler
+
+        def route(route):
+            anfrage = route.request
+            zaehler.anfragen += 1
+            aktion = self.entscheiden(anfrage.resource_type, anfrage.url)
+            if aktion is None:
+                route.continue_()
+                return
+            geschaetzt = GESCHAETZTE_BYTES.get(anfrage.resource_type, SONSTIGE_BYTES)
+            zaehler.blockiert += 1
+            zaehler.bytes_gespart += geschaetzt
+            if self.bei_blockiert:
+                self.bei_blockiert(anfrage.resource_type, geschaetzt)
+            if aktion == "stub":
+                route.fulfill(status=200, content_type=STUB_TYPEN[anfrage.resource_type], body="")
+            else:
+                route.abort("blockedbyclient")
+
+        def entfernen(_):
+            with self._lock:
+                self._zaehler.pop(schluessel, None)
+
+        page.route("**/*", route)
+        page.once("close", entfernen)
+
+    def stand(self, page):
+        """(anfragen, blockiert, bytes_gespart) einer Seite seit anwenden(); Nullen für fremde Seiten"""
+        with self._lock:
+            zaehler = self._zaehler.get(id(page))
+        return zaehler.stand() if zaehler else (0, 0, 0)
+
+    def url_blockliste(self):
+        """URL-Muster für Chromes Network.setBlockedURLs (Selenium)"""
+        muster = list(self.muster)
+        for typ in sorted(self.typen):
+            muster.extend(TYP_ENDUNGEN.get(typ, ()))
+        return muster
+
+    def selenium_anwenden(self, driver):
+        """Blockiert per CDP; ohne Chrome-Treiber (execute_cdp_cmd) ein No-op"""
+        if not self.aktiv or not hasattr(driver, "execute_cdp_cmd"):
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.url_blockliste()})
@@ -0,0 +1,93 @@
+# rollen_matcher.py – Einmal kompilierter Rollenfilter mit Wortgrenzen und Relevanz-Score
+#
+# Alle Stichworte eines Jobs werden zu einem einzigen regulären Ausdruck (Präfixbaum) kompiliert.
+# Kurze Stichworte wie "IT", "HR" oder "CIO" zählen nur als ganzes Wort – "it" trifft also nicht
+# mehr "Leitung". Längere Stichworte dürfen auch Teil eines zusammengesetzten Wortes sein
+# ("Marketing" in "Marketingleitung"), zählen dann aber nur halb.
+
+import re
+
+KURZWORT_MAX_LAENGE = 4  # Stichworte bis zu dieser Länge nur als ganzes Wort
+TEILWORT_GEWICHT = 0.5
+
+
+def _normalisieren(text):
+    return " ".join(text.casefold().split())
+
+
+def _trie_regex(woerter):
+    """Baut aus den Wörtern einen Präfixbaum und daraus einen kompakten regulären Ausdruck"""
+    trie = {}
+    for wort in woerter:
+        knoten = trie
+        for zeichen in wort:
+            knoten = knoten.setdefault(zeichen, {})
+        knoten[""] = True
+
+    def zu_regex(knoten):
+        ende = "" in knoten
+        zweige = [re.escape(z) + zu_regex(kind) for z, kind in sorted(knoten.items()) if z]
+        if not zweige:
+            return ""
+        # Längere Treffer zuerst, damit "it-leitung" vor "it" gewinnt
+        muster = zweige[0] if len(zweige) == 1 else "(?:" + "|".join(zweige) + ")"
+        return f"(?:{muster})?" if ende else muster
+
+    return zu_regex(trie)
+
+
+def _ist_wortzeichen(zeichen):
+    return zeichen.isalnum()
+
+
+class RollenMatcher:
+    """Bewertet Positionstexte gegen die Stichworte der gewählten Rollen"""
+
+    def __init__(self, stichworte):
+        self.stichworte = sorted({_normalisieren(s) for s in stichworte if s and s.strip()})
+        self._regex = re.compile(_trie_regex(self.stichworte)) if self.stichworte else None
+
+    def __bool__(self):
+        return self._regex is not None
+
+    def score(self, position):
+        """Relevanz eines Positionstexts; 0 bedeutet nicht relevant. Ohne Stichworte ist alles relevant."""
+        if self._regex is None:
+            return 1.0
+        text = _normalisieren(position)
+        score = 0.0
+        gefunden = set()
+        for treffer in self._regex.finditer(text):
+            wort = treffer.group()
+            if not wort or wort in gefunden:
+                continue
+            start, ende = treffer.span()
+            links_frei = start == 0 or not _ist_wortzeichen(text[start - 1])
+            rechts_frei = ende == len(text) or not _ist_wortzeichen(text[ende])
+            if links_frei and rechts_frei:
+                gewicht = 1.0
+            elif len(wort) > KURZWORT_MAX_LAENGE:
+                gewicht = TEILWORT_GEWICHT
+            else:
+                continue  # Kurzwort mitten in einem anderen Wort ("it" in "Leitung")
+            gefunden.add(wort)
+            # Spezifischere (längere) Stichworte zählen mehr
+            score += gewicht * len(wort)
+        return score
+
+    def rank(self, positionen, limit=None):
+        """Indizes der Positionen, absteigend nach Score (bei Gleichstand Seitenreihenfolge)
+
+        Es wird nur sortiert, nicht gefiltert: Positionen ohne Treffer (Score 0) füllen die übrigen
+        Plätze in Seitenreihenfolge auf – die Suche selbst hat schon nach den Rollen gefiltert, und
+        englische oder ungewöhnliche Titel sollen nicht zu einer Firma ohne Kontakte führen.
+
+        >>> m = RollenMatcher(["personal", "recruiting", "hr"])
+        >>> m.rank(["Sales Manager", "Head of Human Resources", "Personalleiterin", "HR Business Partner"], 3)
+        [2, 3, 0]
+        >>> m.rank(["Head of Human Resources", "Sales Manager"])
+        [0, 1]
+        """
+        bewertet = [(self.score(p), i) for i, p in enumerate(positionen)]
+        bewertet.sort(key=lambda b: (-b[0], b[1]))
+        return [i for _, i in bewertet[:limit]]
@@ -0,0 +1,399 @@
+# scheduler.py – Gemeinsame Browser-Sitzung für alle laufenden Jobs mit fairer Verteilung der Firmen
+#
+# Statt dass jeder Job einen eigenen Browser auf demselben Profil startet, reichen alle Jobs ihre
+# Firmen beim FirmenScheduler ein. Er besitzt die Sitzung (Start, Login, Pausen, Schließen nach
+# Leerlauf) und verteilt die Firmen per Weighted Fair Queuing: jede Firma bekommt einen virtuellen
+# Zielzeitpunkt (Start + 1/Gewicht), bearbeitet wird immer der kleinste. Eine kleine, neu
+# hinzugekommene Liste wird so sofort mit einer großen verzahnt, statt hinter ihr zu warten.
+# Das Gewicht ergibt sich aus der Job-Priorität (2 ** Priorität). Die Zahl der Seiten in der
+# Sitzung ist die globale Obergrenze für parallel gesuchte Firmen.
+#
+# vorwaermen() startet die Sitzung (inkl. Login und aller Seiten) schon beim Serverstart und hält sie
+# offen; eine leerlaufende Sitzung wird regelmäßig per gesund(sitzung) geprüft und bei Bedarf neu
+# gestartet. Der erste Job muss so nicht mehr auf Browserstart und Login warten.
+#
+# Mit `leerlauf` (leerlauf.Leerlauf) schläft die Sitzung in Pausen nicht einfach, sondern arbeitet
+# eingereihte Hintergrundaufgaben ab – ebenso, wenn keine Firma ansteht. Pausen werden je Job
+# abgerechnet (pausen_abrechnen: Anzahl, Dauer, dabei erledigte Aufgaben).
+
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+import traceback
+
+from phasen import phase
+
+PRIORITAET_MIN = -2
+PRIORITAET_MAX = 3
+
+
+def _leere_bilanz():
+    return {"pauses": 0, "pause_seconds": 0.0, "pause_tasks": 0}
+
+
+def gewicht_fuer(prioritaet):
+    """Anteil eines Jobs an der Sitzung; Priorität +1 verdoppelt ihn"""
+    return 2.0 ** max(PRIORITAET_MIN, min(PRIORITAET_MAX, int(prioritaet or 0)))
+
+
+class Sitzung:
+    """Laufende Browser-Sitzung, wie sie sitzung_starten() liefert
+
+    page wird im Besitzer-Thread des Schedulers benutzt; worker_page() (optional) öffnet im
+    aufrufenden Thread eine weitere Seite derselben Sitzung.
+    """
+
+    def __init__(self, page, close, worker_page=None, relogin=None):
+        self.page = page
+        self.close = close
+        self.worker_page = worker_page
+        self.relogin = relogin
+
+
+class _Auftrag:
+    """Die Firmen eines Jobs im Scheduler"""
+
+    def __init__(self, job_id, func, gewicht):
+        self.job_id = job_id
+        self.func = func
+        self.gewicht = gewicht
+        self.letztes_ziel = 0.0  # virtueller Zielzeitpunkt der zuletzt eingereihten Firma
+        self.ergebnisse = queue.Queue()
+        self.abgebrochen = False
+
+
+class FirmenScheduler:
+    """Verteilt die Firmen aller Jobs fair auf eine gemeinsame Browser-Sitzung"""
+
+    def __init__(self, sitzung_starten, max_concurrency=1, leerlauf_sekunden=60.0,
+                 pause_intervall=None, pause_dauer=None, relogin_nach=0, bei_pause=None,
+                 gesund=None, pruef_intervall=60.0, leerlauf=None):
+        self.sitzung_starten = sitzung_starten
+        self.max_concurrency = max(1, max_concurrency)
+        self.leerlauf_sekunden = leerlauf_sekunden
+        self.pause_intervall = pause_intervall  # (min, max) Minuten Arbeit bis zur nächsten Pause
+        self.pause_dauer = pause_dauer  # (min, max) Minuten
+        self.relogin_nach = relogin_nach  # nach so vielen Pausen neu einloggen (0 = nie)
+        self.bei_pause = bei_pause  # bei_pause(job_ids, minuten) bzw. bei_pause(job_ids, None) am Ende
+        self.gesund = gesund  # gesund(sitzung) -> bool, Prüfung einer leerlaufenden Sitzung
+        self.pruef_intervall = pruef_intervall
+        self.leerlauf = leerlauf  # Hintergrundaufgaben für Pausen und Leerlauf der Sitzung
+        self._cond = threading.Condition()
+        self._heap = []  # (Zielzeitpunkt, Nr, Auftrag, Index, Eintrag)
+        self._nr = itertools.count()
+        self._virtuelle_zeit = 0.0
+        self._auftraege = set()
+        self._in_arbeit = 0
+        self._pausiert = False
+        self._sitzung_ende = False
+        self._stop = threading.Event()
+        self._besitzer = None
+        self._naechste_pause = None
+        self._pausen = 0
+        self._pausen_je_job = {}  # job_id -> Bilanz der Pausen, die den Job betroffen haben
+        self._warm = False
+        self._geprueft = 0.0
+        self._bereit = threading.Event()
+
+    # --- Schnittstelle für Jobs -------------------------------------------------------------
+
+    def imap_unordered(self, job_id, func, items, prioritaet=0, pruefen=None, fenster=None):
+        """Reiht die Firmen eines Jobs ein und liefert (index, ergebnis), sobald sie fertig sind
+
+        func(page, item) läuft in einem Thread der Sitzung. pruefen() wird beim Warten etwa
+        jede Sekunde aufgerufen (z.B. für Abbrüche). Bricht der Aufrufer die Iteration ab, werden
+        seine noch wartenden Firmen verworfen. Mit `fenster` sind höchstens so viele Firmen des Jobs
+        gleichzeitig eingereiht oder in Arbeit; `items` wird erst nachgelesen, wenn der Aufrufer ein
+        Ergebnis abgeholt hat.
+        """
+        auftrag = _Auftrag(job_id, func, gewicht_fuer(prioritaet))
+        quelle = enumerate(items)
+        offen = 0
+
+        def nachschieben(anzahl):
+            nonlocal offen
+            with self._cond:
+                neu = 0
+                for idx, item in itertools.islice(quelle, anzahl):
+                    start = max(self._virtuelle_zeit, auftrag.letztes_ziel)
+                    auftrag.letztes_ziel = start + 1.0 / auftrag.gewicht
+                    heapq.heappush(self._heap, (auftrag.letztes_ziel, next(self._nr), auftrag, idx, item))
+                    neu += 1
+                if neu:
+                    self._besitzer_starten()
+                    self._cond.notify_all()
+            offen += neu
+
+        with self._cond:
+            self._auftraege.add(auftrag)
+            auftrag.letztes_ziel = self._virtuelle_zeit
+        try:
+            nachschieben(fenster)
+            while offen:
+                while True:
+                    try:
+                        idx, ergebnis = auftrag.ergebnisse.get(timeout=1.0)
+                        break
+                    except queue.Empty:
+                        if pruefen:
+                            pruefen()
+                if idx is None:
+                    raise ergebnis  # Sitzung konnte nicht gestartet werden
+                offen -= 1
+                yield idx, ergebnis
+                if fenster:
+                    nachschieben(1)
+        finally:
+            with self._cond:
+                auftrag.abgebrochen = True
+                self._auftraege.discard(auftrag)
+
+    def vorwaermen(self):
+        """Startet die Sitzung im Hintergrund, ohne auf Jobs zu warten, und hält sie offen"""
+        with self._cond:
+            self._warm = True
+            self._besitzer_starten()
+            self._cond.notify_all()
+
+    def warten_bis_bereit(self, timeout=None):
+        """Wartet, bis eine Sitzung gestartet und eingeloggt ist"""
+        return self._bereit.wait(timeout)
+
+    def pausen_abrechnen(self, job_id):
+        """Pausen, die einen Job betroffen haben (Anzahl, Sekunden, dabei erledigte Hintergrundaufgaben)
+
+        Setzt die Bilanz des Jobs zurück – aufrufen, wenn seine Firmen durch sind.
+        """
+        with self._cond:
+            return self._pausen_je_job.pop(job_id, None) or _leere_bilanz()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "jobs": len(self._auftraege),
+                "wartend": sum(1 for e in self._heap if not e[2].abgebrochen),
+                "in_arbeit": self._in_arbeit,
+                "pausiert": self._pausiert,
+                "sitzung_aktiv": self._besitzer is not None,
+                "sitzung_bereit": self._bereit.is_set(),
+                "warm": self._warm,
+                "leerlauf": self.leerlauf.stats() if self.leerlauf else None,
+            }
+
+    def stop(self, timeout=10.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+            besitzer = self._besitzer
+        if besitzer:
+            besitzer.join(timeout)
+
+    # --- Sitzung -------------------------------------------------------------------------------
+
+    def _besitzer_starten(self):
+        # nur mit self._cond aufrufen
+        if self._besitzer is None:
+            self._besitzer = threading.Thread(target=self._besitzer_loop, name="scheduler-sitzung", daemon=True)
+            self._besitzer.start()
+
+    def _naechste(self, besitzer=False):
+        """Nächste Firma nach kleinstem Zielzeitpunkt; None bei Sitzungsende (Besitzer: nach Leerlauf)
+
+        Der Besitzer bekommt außerdem "pause", wenn eine Pause fällig ist, "pruefen", wenn die
+        leerlaufende Sitzung geprüft werden soll, und "leerlauf", wenn er statt zu warten
+        Hintergrundaufgaben abarbeiten kann.
+        """
+        leer_seit = time.monotonic()
+        with self._cond:
+            while not self._stop.is_set() and not self._sitzung_ende:
+                if not self._pausiert:
+                    while self._heap and self._heap[0][2].abgebrochen:
+                        heapq.heappop(self._heap)
+                    if besitzer and self._heap and self._pause_faellig():
+                        return "pause"
+                    if self._heap:
+                        ziel, _, auftrag, idx, item = heapq.heappop(self._heap)
+                        self._virtuelle_zeit = max(self._virtuelle_zeit, ziel - 1.0 / auftrag.gewicht)
+                        self._in_arbeit += 1
+                        return auftrag, idx, item
+                if besitzer:
+                    if not self._heap and self.leerlauf and self.leerlauf.wartend():
+                        return "leerlauf"
+                    if self._heap or self._in_arbeit or self._pausiert:
+                        leer_seit = time.monotonic()
+                    elif not self._warm and time.monotonic() - leer_seit >= self.leerlauf_sekunden:
+                        return None
+                    elif self.gesund and time.monotonic() - self._geprueft >= self.pruef_intervall:
+                        return "pruefen"
+                self._cond.wait(1.0)
+            return None
+
+    def _bearbeiten(self, page, auftrag, idx, item):
+        try:
+            ergebnis = auftrag.func(page, item)
+        except Exception as e:
+            print(f"❌ Scheduler: Fehler bei '{item}': {e}")
+            traceback.print_exc()
+            ergebnis = None
+        auftrag.ergebnisse.put((idx, ergebnis))
+        with self._cond:
+            self._in_arbeit -= 1
+            self._cond.notify_all()
+
+    def _worker(self, sitzung, nr):
+        """Zusätzliche Seite derselben Sitzung in einem eigenen Thread"""
+        try:
+            with sitzung.worker_page() as page:
+                while True:
+                    aufgabe = self._naechste()
+                    if aufgabe is None:
+                        return
+                    self._bearbeiten(page, *aufgabe)
+        except Exception as e:
+            print(f"❌ Scheduler-Worker {nr} beendet: {e}")
+
+    def _besitzer_loop(self):
+        """Startet die Sitzung bei Bedarf, arbeitet mit und schließt sie nach Leerlauf"""
+        while not self._stop.is_set():
+            with self._cond:
+                while self._heap and self._heap[0][2].abgebrochen:
+                    heapq.heappop(self._heap)
+                if not self._heap and not self._warm:
+                    self._besitzer = None
+                    return
+            try:
+                sitzung = self.sitzung_starten()
+            except Exception as e:
+                print(f"❌ Scheduler: Sitzung konnte nicht gestartet werden: {e}")
+                self._alle_fehlschlagen(e)
+                with self._cond:
+                    if self._warm:
+                        print("⚠️ Scheduler: Vorwärmen aufgegeben, Sitzung startet mit dem nächsten Job")
+                        self._warm = False
+                continue
+
+            extra = self.max_concurrency - 1 if sitzung.worker_page else 0
+            threads = [threading.Thread(target=self._worker, args=(sitzung, i + 2),
+                                        name=f"scheduler-worker-{i + 2}", daemon=True) for i in range(extra)]
+            for t in threads:
+                t.start()
+            print(f"🌐 Scheduler: Sitzung gestartet ({1 + extra} Seiten)")
+            self._pause_planen()
+            self._pausen = 0
+            self._geprueft = time.monotonic()
+            self._bereit.set()
+            try:
+                while True:
+                    aufgabe = self._naechste(besitzer=True)
+                    if aufgabe is None:
+                        break
+                    if aufgabe == "pause":
+                        if not self._pausieren(sitzung):
+                            break  # Re-Login gescheitert, Jobs sind benachrichtigt
+                        continue
+                    if aufgabe == "pruefen":
+                        if not self._pruefen(sitzung):
+                            break  # schließen und neu starten
+                        continue
+                    if aufgabe == "leerlauf":
+                        # kurze Scheiben, damit neu eingereihte Firmen nicht lange warten
+                        self.leerlauf.abarbeiten(1.0, stop=self._stop)
+                        continue
+                    self._bearbeiten(sitzung.page, *aufgabe)
+            finally:
+                self._bereit.clear()
+                with self._cond:
+                    self._sitzung_ende = True
+                    self._cond.notify_all()
+                for t in threads:
+                    t.join()
+                try:
+                    sitzung.close()
+                except Exception as e:
+                    print(f"⚠️ Scheduler: Fehler beim Schließen der Sitzung: {e}")
+                with self._cond:
+                    self._sitzung_ende = False
+                print("💤 Scheduler: Sitzung geschlossen")
+        with self._cond:
+            self._besitzer = None
+
+    def _alle_fehlschlagen(self, fehler):
+        """Meldet allen wartenden Jobs einen Fehler der Sitzung und verwirft ihre Firmen"""
+        with self._cond:
+            for auftrag in self._auftraege:
+                auftrag.ergebnisse.put((None, fehler))
+            self._heap = []
+
+    def _pruefen(self, sitzung):
+        """Prüft eine leerlaufende Sitzung; False = schließen und neu starten"""
+        self._geprueft = time.monotonic()
+        try:
+            ok = self.gesund(sitzung)
+        except Exception as e:
+            print(f"⚠️ Scheduler: Prüfung der Sitzung fehlgeschlagen: {e}")
+            ok = False
+        if not ok:
+            print("🔄 Scheduler: Sitzung nicht mehr nutzbar, starte neu")
+        return ok
+
+    # --- Pausen (gelten für das ganze Konto, nicht je Job) --------------------------------------
+
+    def _pause_planen(self):
+        self._naechste_pause = None
+        if self.pause_intervall:
+            self._naechste_pause = time.monotonic() + random.uniform(*self.pause_intervall) * 60
+
+    def _pause_faellig(self):
+        return self._naechste_pause is not None and time.monotonic() >= self._naechste_pause
+
+    def _pausieren(self, sitzung):
+        """Pausiert die Sitzung; False, wenn sie danach nicht mehr nutzbar ist"""
+        minuten = random.uniform(*self.pause_dauer) if self.pause_dauer else 0
+        with self._cond:
+            self._pausiert = True
+            job_ids = [a.job_id for a in self._auftraege]
+        print(f"\n⏸️ Scheduler: Pause für {minuten:.0f} Minuten...")
+        if self.bei_pause:
+            self.bei_pause(job_ids, minuten)
+        beginn = time.monotonic()
+        aufgaben = 0
+        with phase("pause"):
+            # Laufende Firmen auf den anderen Seiten abwarten, dann pausieren
+            with self._cond:
+                while self._in_arbeit and not self._stop.is_set():
+                    self._cond.wait(1.0)
+            if self.leerlauf:
+                aufgaben = self.leerlauf.warten(minuten * 60, stop=self._stop)
+            else:
+                self._stop.wait(minuten * 60)
+        dauer = time.monotonic() - beginn
+        with self._cond:
+            # nur Jobs, die noch da sind – beendete haben bereits abgerechnet
+            for job_id in set(job_ids) & {a.job_id for a in self._auftraege}:
+                bilanz = self._pausen_je_job.setdefault(job_id, _leere_bilanz())
+                bilanz["pauses"] += 1
+                bilanz["pause_seconds"] = round(bilanz["pause_seconds"] + dauer, 1)
+                bilanz["pause_tasks"] += aufgaben
+        self._pausen += 1
+        weiter = True
+        if self.relogin_nach and sitzung.relogin and self._pausen % self.relogin_nach == 0:
+            print("🔄 Scheduler: Re-Login...")
+            try:
+                if not sitzung.relogin():
+                    print("⚠️ Re-Login fehlgeschlagen! Versuche fortzufahren...")
+            except Exception as e:
+                print(f"❌ Scheduler: Re-Login nicht möglich: {e}")
+                self._alle_fehlschlagen(e)
+                weiter = False
+        with self._cond:
+            self._pausiert = False
+            job_ids = [a.job_id for a in self._auftraege]
+            self._cond.notify_all()
+        if self.bei_pause:
+            self.bei_pause(job_ids, None)
+        self._pause_planen()
+        print(f"▶️ Scheduler: Pause beendet (Pausen bisher: {self._pausen})")
+        return weiter
@@ -0,0 +1,43 @@
+# schreiber.py – Ergebnisdatei gepuffert und in Stapeln schreiben
+#
+# Die Zeilen gehen weiter in Eingabereihenfolge in die Datei, werden aber nicht mehr nach jeder
+# Zeile auf die Platte geleert: flush() erfolgt alle flush_zeilen Zeilen, spätestens nach
+# flush_sekunden, und immer bevor der Aufrufer auf eine noch laufende Firma wartet – der
+# Live-Download sieht so alles, was fertig ist. Fortschritt (Job, Metriken) wird im selben Takt
+# gemeldet statt einmal pro Zeile.
+
+import time
+
+from phasen import phase
+
+
+class ZeilenSchreiber:
+    """Schreibt Ergebniszeilen über schreiben(*args) und leert die Datei stapelweise"""
+
+    def __init__(self, datei, schreiben, flush_zeilen=1000, flush_sekunden=2.0, bei_flush=None):
+        self.datei = datei
+        self.schreiben = schreiben  # schreiben(*args) schreibt eine Eingabezeile (ggf. mehrere CSV-Zeilen)
+        self.flush_zeilen = max(1, flush_zeilen)
+        self.flush_sekunden = flush_sekunden
+        self.bei_flush = bei_flush  # bei_flush(anzahl) nach jedem Stapel, z.B. job.advance
+        self.geschrieben = 0
+        self._offen = 0
+        self._letzter_flush = time.monotonic()
+
+    def zeile(self, *args):
+        self.schreiben(*args)
+        self.geschrieben += 1
+        self._offen += 1
+        if self._offen >= self.flush_zeilen or time.monotonic() - self._letzter_flush >= self.flush_sekunden:
+            self.flush()
+
+    def flush(self):
+        """Leert den Puffer und meldet die seit dem letzten Stapel geschriebenen Zeilen"""
+        self._letzter_flush = time.monotonic()
+        if not self._offen:
+            return
+        anzahl, self._offen = self._offen, 0
+        with phase("csv_write", zeilen=anzahl):
+            self.datei.flush()
+        if self.bei_flush:
+            self.bei_flush(anzahl)
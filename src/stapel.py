@@ -0,0 +1,122 @@
+# stapel.py – mehrere Listen in einem Job: gemeinsame Firmen nur einmal suchen
+#
+# Messelisten kommen oft zu zehnt und teilen sich viele Aussteller. Ein Stapel-Job sucht die
+# Vereinigung der Firmen aller Listen in einem Durchlauf (eine Sitzung, jede Firma einmal) und
+# schreibt danach je Liste ihre eigene Ergebnisdatei. Hier liegen die Teile ohne Browser und
+# Web-Framework: ZIP-Archive sicher entpacken, die Vereinigung und ihre Bilanz bilden, die
+# Firmenliste der Vereinigung schreiben und die Ergebnisse wieder bündeln.
+#
+#   dateien = zip_entpacken("messen.zip", lambda name: ziel / name)
+#   firmen, bilanz = vereinigen([erfassung["firmen"] for erfassung in erfassungen])
+#   firmenliste_schreiben(ziel / "stapel.csv", firmen)
+
+import csv
+import os
+import shutil
+import zipfile
+from pathlib import Path, PurePosixPath
+
+from tabellen import TABELLEN_ENDUNGEN
+
+STAPEL_ENDUNGEN = (".csv", *TABELLEN_ENDUNGEN)
+FIRMENSPALTE = "Firma"
+
+
+def _ignorieren(name):
+    """Verzeichnisse, versteckte Dateien und Metadaten von macOS/Windows im Archiv"""
+    teile = PurePosixPath(name.replace("\\", "/")).parts
+    return not teile or name.endswith("/") or teile[0] == "__MACOSX" or teile[-1].startswith(".") \
+        or teile[-1] in ("Thumbs.db", "desktop.ini")
+
+
+def zip_entpacken(zip_pfad, ablage, endungen=STAPEL_ENDUNGEN, max_dateien=None, max_bytes=None):
+    """Entpackt die Listen eines ZIP-Archivs; liefert [(Name, Pfad)] in Archiv-Reihenfolge
+
+    ablage(name) bestimmt den Zielpfad – verwendet wird nur der Dateiname ohne Verzeichnisse, Pfade
+    aus dem Archiv erreichen das Dateisystem also nie. Andere Endungen werden übersprungen. Mehr als
+    `max_dateien` Listen oder mehr als `max_bytes` entpackt (gezählt wird beim Schreiben, nicht nach
+    den Angaben im Archiv) ergeben einen ValueError.
+    """
+    dateien = []
+    geschrieben = 0
+    try:
+        with zipfile.ZipFile(zip_pfad) as zf:
+            for info in zf.infolist():
+                name = PurePosixPath(info.filename.replace("\\", "/")).name
+                if _ignorieren(info.filename) or Path(name).suffix.lower() not in endungen:
+                    continue
+                if max_dateien is not None and len(dateien) >= max_dateien:
+                    raise ValueError(f"Mehr als {max_dateien} Dateien im Archiv {Path(zip_pfad).name}")
+                ziel = ablage(name)
+                dateien.append((name, ziel))
+                with zf.open(info) as quelle, open(ziel, "wb") as f:
+                    while chunk := quelle.read(1024 * 1024):
+                        geschrieben += len(chunk)
+                        if max_bytes is not None and geschrieben > max_bytes:
+                            raise ValueError(f"Archiv {Path(zip_pfad).name} ist entpackt größer als "
+                                             f"{max_bytes / 2**20:.0f} MB")
+                        f.write(chunk)
+    except BaseException as e:
+        # Auch bei defekten Einträgen (CRC-Fehler, abgeschnitten) nichts Halbfertiges liegen lassen
+        for _, pfad in dateien:
+            Path(pfad).unlink(missing_ok=True)
+        if isinstance(e, zipfile.BadZipFile):
+            raise ValueError(f"{Path(zip_pfad).name} ist kein gültiges ZIP-Archiv: {e}") from e
+        raise
+    return dateien
+
+
+def vereinigen(firmen_je_datei):
+    """Vereinigung der Firmen mehrerer Listen und was sie spart
+
+    firmen_je_datei: je Liste {Firmenschlüssel: Firmenname}. Liefert (firmen, bilanz): die Firmen
+    aller Listen (Name des ersten Vorkommens) und die Bilanz – wie viele Firmen in mehr als einer
+    Liste stehen (shared_firms, shared_ratio bezogen auf die eindeutigen Firmen) und wie viele
+    Suchen gegenüber einzelnen Jobs entfallen (searches_saved).
+    """
+    firmen = {}
+    vorkommen = {}  # Firmenschlüssel -> Zahl der Listen
+    for liste in firmen_je_datei:
+        for key, firma in liste.items():
+            firmen.setdefault(key, firma)
+            vorkommen[key] = vorkommen.get(key, 0) + 1
+    je_liste = sum(len(liste) for liste in firmen_je_datei)
+    gemeinsam = sum(1 for anzahl in vorkommen.values() if anzahl > 1)
+    bilanz = {
+        "batch_files": len(firmen_je_datei),
+        "batch_firms": je_liste,
+        "unique_firms": len(firmen),
+        "shared_firms": gemeinsam,
+        "shared_ratio": round(gemeinsam / len(firmen), 3) if firmen else 0.0,
+        "searches_saved": je_liste - len(firmen),
+    }
+    return firmen, bilanz
+
+
+def firmenliste_schreiben(pfad, firmen):
+    """Schreibt die Firmen der Vereinigung als CSV mit der Spalte FIRMENSPALTE"""
+    tmp = Path(pfad).with_name(Path(pfad).name + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([FIRMENSPALTE])
+        writer.writerows([firma] for firma in firmen.values())
+    os.replace(tmp, pfad)
+
+
+def buendeln(zip_pfad, dateien):
+    """Packt [(Name im Archiv, Pfad)] in ein ZIP; doppelte Namen bekommen eine laufende Nummer"""
+    zip_pfad = Path(zip_pfad)
+    tmp = zip_pfad.with_name(zip_pfad.name + ".tmp")
+    vergeben = set()
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, pfad in dateien:
+            stamm, endung = os.path.splitext(name)
+            nr = 1
+            while name in vergeben:
+                nr += 1
+                name = f"{stamm} ({nr}){endung}"
+            vergeben.add(name)
+            with open(pfad, "rb") as quelle, zf.open(name, "w") as ziel:
+                shutil.copyfileobj(quelle, ziel, 1024 * 1024)
+    os.replace(tmp, zip_pfad)
+    return zip_pfad
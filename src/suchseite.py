@@ -0,0 +1,147 @@
+# suchseite.py – Eine offene Suchseite für viele Firmen (Playwright oder Selenium)
+#
+# Statt für jede Firma die Suchseite neu zu laden (App-Shell samt Skripten, danach feste 3–5 s
+# Wartezeit), bleibt die Seite offen: die neue Suche wird ins vorhandene Feld getippt und
+# abgeschickt, danach wird gewartet, bis die Trefferliste ausgetauscht ist. Dazu werden vor dem
+# Abschicken die Karten der alten Liste markiert; fertig ist die Suche, sobald keine markierte
+# Karte mehr da ist und sich die URL geändert hat oder neue Karten erschienen sind. Neu geladen
+# wird nur, wenn die Seite nicht mehr auf der Suche steht, das Suchfeld fehlt, das Abschicken
+# scheitert oder nach max_suchen Suchen (begrenzt den Speicher der Single-Page-App).
+
+import time
+
+from phasen import phase
+
+MARKIEREN_JS = """
+(sel) => {
+    document.querySelectorAll(sel).forEach((karte) => karte.setAttribute("data-salesnav-alt", ""));
+    return location.href;
+}
+"""
+
+GEWECHSELT_JS = """
+([sel, alteUrl]) => document.readyState !== "loading"
+    && !document.querySelector("[data-salesnav-alt]")
+    && (location.href !== alteUrl || !!document.querySelector(sel))
+"""
+
+KARTEN_DA_JS = "(sel) => !!document.querySelector(sel)"
+
+AKTUELL_JS = """
+([pfad, feld]) => location.pathname.startsWith(pfad) && !!document.querySelector(feld)
+"""
+
+
+class SuchSeite:
+    """Hält eine Suchseite über mehrere Firmen offen und schickt Suchen an Ort und Stelle ab"""
+
+    def __init__(self, page, url, suchfeld_selector, karten_selector, pause=None,
+                 timeout=15.0, leer_timeout=3.0, max_suchen=100):
+        self.page = page
+        self.url = url
+        self.pfad = "/" + url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0]
+        self.suchfeld_selector = suchfeld_selector
+        self.karten_selector = karten_selector
+        self.pause = pause or (lambda von, bis: None)  # pause(von, bis) für menschliches Tippen
+        self.timeout = timeout
+        self.leer_timeout = leer_timeout  # so lange auf Karten warten, danach gilt: keine Treffer
+        self.max_suchen = max_suchen
+        self.selenium = hasattr(page, 'current_url')
+        self.suchen_seit_laden = None  # None = noch nie geladen
+        self.neu_geladen = 0
+
+    # --- Backend-Unterschiede -------------------------------------------------------------------
+
+    def _js(self, funktion, arg):
+        if self.selenium:
+            return self.page.execute_script(f"return ({funktion})(arguments[0]);", arg)
+        return self.page.evaluate(funktion, arg)
+
+    def _warten(self, funktion, arg, timeout):
+        """Fragt funktion(arg) im Browser ab, bis sie wahr ist; Fehler während Navigationen zählen als nein"""
+        ende = time.monotonic() + timeout
+        while True:
+            try:
+                if self._js(funktion, arg):
+                    return True
+            except Exception:
+                pass  # Kontext wird gerade ausgetauscht
+            if time.monotonic() >= ende:
+                return False
+            time.sleep(0.05)
+
+    def _laden(self):
+        if self.selenium:
+            self.page.get(self.url)
+        else:
+            self.page.goto(self.url)
+        if not self._warten(AKTUELL_JS, [self.pfad, self.suchfeld_selector], self.timeout):
+            raise TimeoutError(f"Suchfeld auf {self.url} nicht gefunden")
+        self.suchen_seit_laden = 0
+        self.neu_geladen += 1
+
+    def _tippen(self, suche):
+        if self.selenium:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.common.keys import Keys
+
+            suchfeld = self.page.find_element(By.CSS_SELECTOR, self.suchfeld_selector)
+            suchfeld.clear()
+            self.pause(0.5, 0.8)
+            # Zeichen für Zeichen eingeben für natürlicheres Verhalten
+            for char in suche:
+                suchfeld.send_keys(char)
+                self.pause(0.05, 0.15)
+            suchfeld.send_keys(Keys.ENTER)
+        else:
+            suchfeld = self.page.locator(self.suchfeld_selector).first
+            suchfeld.wait_for(state="visible", timeout=5000)
+            suchfeld.focus()
+            self.pause(0.5, 0.8)
+            suchfeld.fill("")
+            for char in suche:
+                suchfeld.type(char)
+                self.pause(0.05, 0.15)
+            self.page.keyboard.press("Enter")
+
+    # --- Schnittstelle ------------------------------------------------------------------------------
+
+    def aktuell(self):
+        """Steht die Seite noch auf der Suche mit Suchfeld (und ist sie noch nicht zu alt)?"""
+        if self.suchen_seit_laden is None or self.suchen_seit_laden >= self.max_suchen:
+            return False
+        try:
+            return bool(self._js(AKTUELL_JS, [self.pfad, self.suchfeld_selector]))
+        except Exception:
+            return False
+
+    def bereit(self):
+        """Lädt die Suchseite nur, wenn sie nicht mehr brauchbar ist"""
+        if not self.aktuell():
+            with phase("navigation"):
+                self._laden()
+
+    def suchen(self, suche):
+        """Schickt eine Suche ab und wartet, bis die Trefferliste ausgetauscht ist
+
+        Scheitert das Abschicken auf der offenen Seite, wird einmal neu geladen und wiederholt.
+        """
+        for versuch in range(2):
+            if versuch:
+                with phase("navigation"):
+                    self._laden()
+            try:
+                with phase("search_submit"):
+                    alte_url = self._js(MARKIEREN_JS, self.karten_selector)
+                    with phase("typing"):
+                        self._tippen(suche)
+                    self.suchen_seit_laden += 1
+                    if not self._warten(GEWECHSELT_JS, [self.karten_selector, alte_url], self.timeout):
+                        raise TimeoutError("Trefferliste hat sich nicht geändert")
+                    # Neue URL, aber Liste evtl. noch im Aufbau: kurz auf Karten warten, sonst keine Treffer
+                    self._warten(KARTEN_DA_JS, self.karten_selector, self.leer_timeout)
+                return
+            except Exception as e:
+                if versuch:
+                    raise
+                print(f"⚠️ Suche auf offener Seite fehlgeschlagen ({e}), lade neu...")
@@ -0,0 +1,367 @@
+# tabellen.py – Excel- (.xlsx) und OpenDocument-Tabellen (.ods) zeilenweise lesen, ohne Zwischen-CSV
+#
+# Beide Formate sind ZIP-Archive mit XML. Das Tabellenblatt wird mit iterparse gestreamt; jede
+# fertig gelesene Zeile wird sofort aus dem Baum entfernt, der Speicher hängt also nicht von der
+# Zeilenzahl ab. Im Speicher bleibt nur, was das Format selbst zentral ablegt: die gemeinsame
+# Zeichenkettentabelle (sharedStrings) einer .xlsx und die Datumsformate aus styles.xml.
+# Werte kommen als Text wie in einem CSV-Export: Zahlen ohne Gleitkomma-Artefakte, Datumszellen als
+# ISO-Datum (.xlsx) bzw. mit ihrem angezeigten Text (.ods).
+#
+#   headers, zeilen = stream_tabelle("aussteller.xlsx", blatt="Liste", kopfzeile=3)
+#   for row in zeilen: ...                       # Dicts wie bei stream_csv
+
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+TABELLEN_ENDUNGEN = (".xlsx", ".xlsm", ".ods")
+MAX_SPALTEN = 16384  # XFD – mehr Spalten hat kein Tabellenblatt
+MAX_ZEILEN = 1048576
+
+# Eingebaute Excel-Zahlenformate für Datum/Uhrzeit (ECMA-376, 18.8.30)
+_DATUM_FORMAT_IDS = frozenset([*range(14, 23), *range(27, 37), *range(45, 48), *range(50, 59)])
+_FORMAT_OHNE_TEXT = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|_.|\*.')  # Literale, Farben/Bedingungen, Füllzeichen
+_SPALTE = re.compile(r"[A-Z]+")
+
+
+def ist_tabelle(pfad):
+    return Path(pfad).suffix.lower() in TABELLEN_ENDUNGEN
+
+
+def _lokal(name):
+    """Name ohne Namensraum – Transitional und Strict OOXML bzw. ODF-Versionen gleich behandeln"""
+    return name.rsplit("}", 1)[-1]
+
+
+def _attr(el, name, standard=None):
+    for schluessel, wert in el.attrib.items():
+        if _lokal(schluessel) == name:
+            return wert
+    return standard
+
+
+def _blatt_waehlen(namen, blatt):
+    """Index des gewählten Blatts: Name oder Nummer (1-basiert), ohne Angabe das erste"""
+    if blatt is None or str(blatt).strip() == "":
+        return 0
+    blatt = str(blatt).strip()
+    if blatt in namen:
+        return namen.index(blatt)
+    if blatt.isdigit() and 1 <= int(blatt) <= len(namen):
+        return int(blatt) - 1
+    raise ValueError(f"Tabellenblatt '{blatt}' nicht gefunden (vorhanden: {', '.join(namen)})")
+
+
+def _zeilen_streamen(datei, zeilen_tag, behaelter, start_tags=()):
+    """iterparse über `datei`; liefert ("zeile", Element) für jedes fertige `zeilen_tag`-Element
+
+    Danach wird die Zeile aus ihrem Behälter (innerstes offenes Element aus `behaelter`) gelöscht –
+    der Baum bleibt so klein wie eine Zeile. Für Elemente aus `start_tags` kommt zusätzlich
+    ("start", Element), z.B. um Tabellengrenzen zu erkennen.
+    """
+    namen = {}  # Tag mit Namensraum -> lokaler Name
+    offen = []
+    for ereignis, el in ET.iterparse(datei, events=("start", "end")):
+        name = namen.get(el.tag)
+        if name is None:
+            name = namen[el.tag] = _lokal(el.tag)
+        if ereignis == "start":
+            if name in behaelter:
+                offen.append(el)
+            if name in start_tags:
+                yield "start", el
+        elif name == zeilen_tag:
+            yield "zeile", el
+            if offen:
+                offen[-1].remove(el)
+            el.clear()
+        elif name in behaelter:
+            offen.pop()
+
+
+# --- .xlsx ---------------------------------------------------------------------------------------
+
+def _beziehungen(zf, pfad):
+    """{Id: (Typ, Pfad im Archiv)} aus der .rels-Datei zu `pfad`"""
+    verzeichnis, name = posixpath.split(pfad)
+    rels = posixpath.join(verzeichnis, "_rels", f"{name}.rels")
+    if rels not in zf.namelist():
+        return {}
+    ergebnis = {}
+    with zf.open(rels) as f:
+        for el in ET.parse(f).getroot():
+            ziel = el.get("Target", "")
+            ziel = ziel.lstrip("/") if ziel.startswith("/") else posixpath.normpath(posixpath.join(verzeichnis, ziel))
+            ergebnis[el.get("Id")] = (el.get("Type", ""), ziel)
+    return ergebnis
+
+
+def _xlsx_mappe(zf):
+    """(Blätter als [(Name, Pfad)], Pfad der sharedStrings, Pfad der styles, 1904-Datumssystem)"""
+    mappe = next((ziel for typ, ziel in _beziehungen(zf, "").values() if typ.endswith("/officeDocument")),
+                 "xl/workbook.xml")
+    rels = _beziehungen(zf, mappe)
+    blaetter = []
+    datum_1904 = False
+    with zf.open(mappe) as f:
+        for el in ET.parse(f).iter():
+            name = _lokal(el.tag)
+            if name == "sheet":
+                blaetter.append((el.get("name"), rels[_attr(el, "id")][1]))
+            elif name == "workbookPr":
+                datum_1904 = _attr(el, "date1904", "0") in ("1", "true")
+    texte = next((ziel for typ, ziel in rels.values() if typ.endswith("/sharedStrings")), None)
+    stile = next((ziel for typ, ziel in rels.values() if typ.endswith("/styles")), None)
+    return blaetter, texte, stile, datum_1904
+
+
+def _xlsx_text(el):
+    """Text eines <si>/<is>: einfacher <t> oder Formatierungsläufe <r><t>, ohne Lesehilfen (<rPh>)"""
+    teile = []
+    for kind in el:
+        name = _lokal(kind.tag)
+        if name == "t":
+            teile.append(kind.text or "")
+        elif name == "r":
+            teile.extend(t.text or "" for t in kind if _lokal(t.tag) == "t")
+    return "".join(teile)
+
+
+def _xlsx_texte(zf, pfad):
+    """Gemeinsame Zeichenkettentabelle"""
+    if not pfad or pfad not in zf.namelist():
+        return []
+    with zf.open(pfad) as f:
+        return [_xlsx_text(si) for _, si in _zeilen_streamen(f, "si", ("sst",))]
+
+
+def _xlsx_datumsstile(zf, pfad):
+    """Indizes der Zellformate (cellXfs), die ein Datums- oder Zeitformat haben"""
+    if not pfad or pfad not in zf.namelist():
+        return frozenset()
+    with zf.open(pfad) as f:
+        wurzel = ET.parse(f).getroot()
+    eigene = {}
+    xfs = []
+    for el in wurzel:
+        if _lokal(el.tag) == "numFmts":
+            eigene = {int(fmt.get("numFmtId")): fmt.get("formatCode", "") for fmt in el}
+        elif _lokal(el.tag) == "cellXfs":
+            xfs = [int(xf.get("numFmtId", "0")) for xf in el]
+
+    def ist_datum(fmt_id):
+        if fmt_id in eigene:
+            code = _FORMAT_OHNE_TEXT.sub("", eigene[fmt_id].split(";")[0]).lower()
+            return any(z in code for z in "dmyhs")
+        return fmt_id in _DATUM_FORMAT_IDS
+
+    return frozenset(i for i, fmt_id in enumerate(xfs) if ist_datum(fmt_id))
+
+
+def _zahl(text):
+    """Zahl wie im CSV-Export: 12 statt 12.0, 4.4 statt 4.4000000000000004"""
+    try:
+        wert = float(text)
+    except ValueError:
+        return text
+    if wert.is_integer() and abs(wert) < 1e15:
+        return str(int(wert))
+    return repr(wert)
+
+
+def _datum(text, datum_1904):
+    try:
+        wert = float(text)
+    except ValueError:
+        return text
+    basis = datetime(1904, 1, 1) if datum_1904 else datetime(1899, 12, 30)
+    zeitpunkt = basis + timedelta(days=wert)
+    if wert.is_integer():
+        return zeitpunkt.date().isoformat()
+    return zeitpunkt.isoformat(sep=" ", timespec="seconds")
+
+
+def _spalte(ref):
+    """Spaltenindex (0-basiert) aus einer Zellreferenz wie AB12"""
+    m = _SPALTE.match(ref)
+    index = 0
+    for buchstabe in m.group(0):
+        index = index * 26 + ord(buchstabe) - 64
+    return index - 1
+
+
+def _xlsx_zeilen(pfad, blatt):
+    with zipfile.ZipFile(pfad) as zf:
+        blaetter, texte_pfad, stile_pfad, datum_1904 = _xlsx_mappe(zf)
+        if not blaetter:
+            raise ValueError("Die Arbeitsmappe enthält kein Tabellenblatt")
+        _, blatt_pfad = blaetter[_blatt_waehlen([name for name, _ in blaetter], blatt)]
+        texte = _xlsx_texte(zf, texte_pfad)
+        datumsstile = _xlsx_datumsstile(zf, stile_pfad)
+        nr = 0
+        with zf.open(blatt_pfad) as f:
+            for _, zeile in _zeilen_streamen(f, "row", ("sheetData",)):
+                nr = int(zeile.get("r") or nr + 1)
+                werte = []
+                for zelle in zeile:
+                    if _lokal(zelle.tag) != "c":
+                        continue
+                    ref = zelle.get("r")
+                    spalte = _spalte(ref) if ref else len(werte)
+                    if spalte >= MAX_SPALTEN:
+                        continue
+                    typ = zelle.get("t", "n")
+                    wert = ""
+                    for kind in zelle:
+                        name = _lokal(kind.tag)
+                        if name == "v" and kind.text is not None:
+                            wert = kind.text
+                        elif name == "is":
+                            wert = _xlsx_text(kind)
+                    if typ == "s" and wert:
+                        wert = texte[int(wert)]
+                    elif typ == "b":
+                        wert = "TRUE" if wert == "1" else "FALSE" if wert else ""
+                    elif typ == "n" and wert:
+                        wert = _datum(wert, datum_1904) if int(zelle.get("s", "0")) in datumsstile else _zahl(wert)
+                    if spalte > len(werte):
+                        werte.extend([""] * (spalte - len(werte)))
+                    if spalte == len(werte):
+                        werte.append(wert)
+                    else:
+                        werte[spalte] = wert
+                yield nr, werte
+
+
+# --- .ods ----------------------------------------------------------------------------------------
+
+def _ods_inhalt(el):
+    """Text eines Absatzes inkl. verschachtelter Spans, Leerzeichen (text:s), Tabs und Umbrüche"""
+    teile = [el.text or ""]
+    for kind in el:
+        name = _lokal(kind.tag)
+        if name == "s":
+            teile.append(" " * int(_attr(kind, "c", "1")))
+        elif name == "tab":
+            teile.append("\t")
+        elif name == "line-break":
+            teile.append("\n")
+        elif name not in ("annotation", "note"):
+            teile.append(_ods_inhalt(kind))
+        teile.append(kind.tail or "")
+    return "".join(teile)
+
+
+def _ods_zelle(zelle):
+    absaetze = [_ods_inhalt(p) for p in zelle if _lokal(p.tag) in ("p", "h")]
+    if absaetze:
+        return "\n".join(absaetze)
+    return _attr(zelle, "value") or _attr(zelle, "date-value") or _attr(zelle, "boolean-value") or ""
+
+
+_ODS_BEHAELTER = ("table", "table-rows", "table-header-rows", "table-row-group")
+
+
+def _ods_zeilen(pfad, blatt):
+    gesucht = None if blatt is None or str(blatt).strip() == "" else str(blatt).strip()
+    namen = []
+    gewaehlt = None  # Element der gewählten Tabelle, sobald sie beginnt
+    nr = 0
+    with zipfile.ZipFile(pfad) as zf, zf.open("content.xml") as f:
+        for ereignis, el in _zeilen_streamen(f, "table-row", _ODS_BEHAELTER, start_tags=("table",)):
+            if ereignis == "start":
+                namen.append(_attr(el, "name", f"Tabelle{len(namen) + 1}"))
+                if gewaehlt is not None:
+                    return  # gewählte Tabelle ist zu Ende
+                if len(namen) == 1 if gesucht is None else gesucht in (namen[-1], str(len(namen))):
+                    gewaehlt = el
+                continue
+            if gewaehlt is None:
+                continue
+            wiederholt = min(int(_attr(el, "number-rows-repeated", "1")), MAX_ZEILEN)
+            werte = []
+            leer = 0  # noch nicht übernommene leere Zellen (nur vor einem Wert auffüllen)
+            for zelle in el:
+                if _lokal(zelle.tag) not in ("table-cell", "covered-table-cell"):
+                    continue
+                anzahl = int(_attr(zelle, "number-columns-repeated", "1"))
+                wert = _ods_zelle(zelle)
+                if not wert:
+                    leer += anzahl
+                    continue
+                werte.extend([""] * leer)
+                leer = 0
+                werte.extend([wert] * min(anzahl, MAX_SPALTEN - len(werte)))
+            if not any(w.strip() for w in werte):
+                nr += wiederholt  # leere Zeilen (oft hunderttausendfach wiederholt) nur zählen
+                continue
+            for _ in range(wiederholt):
+                nr += 1
+                yield nr, werte
+    if gewaehlt is None:
+        _blatt_waehlen(namen, blatt)  # meldet die vorhandenen Blätter
+        raise ValueError("Die Tabelle enthält kein Tabellenblatt")
+
+
+# --- gemeinsam -----------------------------------------------------------------------------------
+
+def tabellen_zeilen(pfad, blatt=None):
+    """Rohzeilen eines Tabellenblatts als (Zeilennummer, Werte); Zeilennummern 1-basiert wie in der Tabelle"""
+    if Path(pfad).suffix.lower() == ".ods":
+        return _ods_zeilen(pfad, blatt)
+    return _xlsx_zeilen(pfad, blatt)
+
+
+def blaetter(pfad):
+    """Namen der Tabellenblätter in ihrer Reihenfolge"""
+    if Path(pfad).suffix.lower() == ".ods":
+        namen = []
+        with zipfile.ZipFile(pfad) as zf, zf.open("content.xml") as f:
+            for ereignis, el in ET.iterparse(f, events=("start",)):
+                if _lokal(el.tag) == "table":
+                    namen.append(_attr(el, "name", f"Tabelle{len(namen) + 1}"))
+        return namen
+    with zipfile.ZipFile(pfad) as zf:
+        return [name for name, _ in _xlsx_mappe(zf)[0]]
+
+
+def kopf_und_zeilen(zeilen_lesen, kopfzeile=None):
+    """(headers, zeilen) aus Rohzeilen – gemeinsam für CSV und Tabellen
+
+    zeilen_lesen() liefert bei jedem Aufruf von vorn (Zeilennummer, Werte). Kopfzeile ist die erste
+    nicht leere Zeile ab `kopfzeile` (1-basiert, ohne Angabe ab Zeile 1); alles davor wird
+    übersprungen. Leere Header fallen weg, die Spaltenpositionen der übrigen bleiben erhalten.
+    `zeilen` ist ein Generator von Dicts, fehlende Spalten werden aufgefüllt, überzählige ignoriert.
+    """
+    kopf_nr = header_row = None
+    quelle = zeilen_lesen()
+    try:
+        for nr, values in quelle:
+            if (kopfzeile is None or nr >= kopfzeile) and any(v.strip() for v in values):
+                kopf_nr, header_row = nr, values
+                break
+    finally:
+        quelle.close()
+    if header_row is None:
+        raise ValueError("Die Datei ist leer" if kopfzeile is None else f"Ab Zeile {kopfzeile} gibt es keine Kopfzeile")
+
+    spalten = [(j, h.strip()) for j, h in enumerate(header_row) if h.strip()]
+    headers = [h for _, h in spalten]
+    if not headers:
+        raise ValueError("Keine gültigen Header gefunden")
+
+    def zeilen():
+        for nr, values in zeilen_lesen():
+            if nr <= kopf_nr or not any(v.strip() for v in values):
+                continue
+            yield {h: (values[j].strip() if j < len(values) else '') for j, h in spalten}
+
+    return headers, zeilen()
+
+
+def stream_tabelle(pfad, blatt=None, kopfzeile=None):
+    """Wie stream_csv für .xlsx/.ods: (headers, zeilen) des gewählten Blatts ab der Kopfzeile"""
+    return kopf_und_zeilen(lambda: tabellen_zeilen(pfad, blatt), kopfzeile)
@@ -1,8 +1,9 @@
 # main.py – Komplettes FastAPI-Backend mit Upload, Rollenfilter und Enrichment
 # Angepasst für Python 3.13 Kompatibilität
 
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -12,32 +13,56 @@ import csv
 import time
 import random
 import codecs
-import chardet
+import importlib.util
+import itertools
 import os
 import sys
 import subprocess
+import threading
 from urllib.parse import urljoin
 
-# Versuche, Selenium statt Playwright zu verwenden
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    print("✅ Selenium importiert")
-    USE_SELENIUM = True
-except ImportError:
-    print("⚠️ Selenium nicht gefunden, versuche Playwright...")
+from abgleich import abgleichen, referenz_kontakte, stand_laden, stand_speichern
+from anmeldung import AUTH_COOKIE, AnmeldeZustand, ist_login_url
+from aufnahmen import AufnahmeSpeicher
+from browser_pool import BrowserPool
+from downloads import datei_auslieferung, komprimieren, verfolgen, vorkomprimieren, waehle_kodierung
+from ereignisse import EreignisBus
+from firmen import firmen_key
+from jobs import FINAL_STATUSES, STATUS_DONE, JobCancelled, JobStore, JobWorkerPool, ReauthRequired, job_status
+from journal import EnrichmentJournal
+from karten import karte_aus_text, karten_aus_html
+from lead_cache import LeadCache
+from leerlauf import Leerlauf
+from metriken import CONTENT_TYPE, REGISTRY, Counter, Gauge, Histogram
+from phasen import add_observer, phase
+from ressourcen import STANDARD_MUSTER, STANDARD_TYPEN, RessourcenPolitik
+from rollen_matcher import RollenMatcher
+from scheduler import FirmenScheduler, Sitzung
+from schreiber import ZeilenSchreiber
+from stapel import STAPEL_ENDUNGEN, buendeln, firmenliste_schreiben, vereinigen, zip_entpacken
+from suchseite import SuchSeite
+from tabellen import ist_tabelle, kopf_und_zeilen, stream_tabelle
+from verteilung import verteilt_scrapen
+from zeitleiste import Zeitleiste
+
+def _modul_vorhanden(name):
+    """Prüft, ob ein Paket installiert ist, ohne es zu importieren"""
     try:
-        from playwright.sync_api import sync_playwright
-        print("✅ Playwright importiert")
-        USE_SELENIUM = False
-    except (ImportError, NotImplementedError) as e:
-        print(f"❌ Fehler beim Import: {e}")
-        raise ImportError("Weder Selenium noch Playwright konnten importiert werden. Bitte eines davon installieren.")
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Selenium bevorzugen, sonst Playwright – BROWSER_BACKEND=playwright|selenium erzwingt eines.
+# Die Treiber selbst werden erst beim ersten Browserstart importiert (schneller Serverstart).
+BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", "auto")
+if BROWSER_BACKEND != "playwright" and _modul_vorhanden("selenium"):
+    print("✅ Selenium gefunden")
+    USE_SELENIUM = True
+elif BROWSER_BACKEND != "selenium" and _modul_vorhanden("playwright"):
+    print("✅ Playwright gefunden")
+    USE_SELENIUM = False
+else:
+    raise ImportError("Weder Selenium noch Playwright konnten importiert werden. Bitte eines davon installieren.")
 
 app = FastAPI()
 
@@ -51,13 +76,131 @@ app.add_middleware(
 
 UPLOAD_DIR = Path("uploads")
 RESULT_DIR = Path("results")
-PROFILE_DIR = Path("profile").resolve()
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profile")).resolve()
 UPLOAD_DIR.mkdir(exist_ok=True)
 RESULT_DIR.mkdir(exist_ok=True)
 
+# Worker-Prozess eines verteilten Laufs (verteilung_worker.py setzt SHARD_WORKER=1): nur Browser und
+# Scraping – Job-Warteschlange und Lead-Cache des Servers werden weder geöffnet noch verändert
+SHARD_WORKER = os.getenv("SHARD_WORKER", "0") == "1"
+
+# Job-Warteschlange: Uploads werden nur eingereiht und von Hintergrund-Workern abgearbeitet
+JOB_DB_PATH = Path(os.getenv("JOB_DB_PATH", "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # Jobs teilen sich die Browser-Sitzung des Schedulers
+job_store = None if SHARD_WORKER else JobStore(JOB_DB_PATH)
+job_events = EreignisBus()  # Live-Fortschritt für GET /jobs/{id}/events
+
+# Journal je Job: erledigte Firmen werden laufend festgehalten, damit abgebrochene Jobs weiterlaufen können
+JOURNAL_DIR = Path(os.getenv("JOURNAL_DIR", "journals"))
+JOURNAL_DIR.mkdir(exist_ok=True)
+
+# Lead-Cache: bereits gescrapte Firmen (gleiche Rollenauswahl) werden nicht erneut gesucht
+LEAD_CACHE_PATH = Path(os.getenv("LEAD_CACHE_PATH", "lead_cache.sqlite3"))
+LEAD_CACHE_TTL_SECONDS = int(os.getenv("LEAD_CACHE_TTL_HOURS", "168")) * 3600
+LEAD_CACHE_TTL_LEER_SECONDS = 24 * 3600  # Firmen ohne Treffer
+LEAD_CACHE_MAX_ENTRIES = int(os.getenv("LEAD_CACHE_MAX_ENTRIES", "50000"))
+lead_cache = None if SHARD_WORKER else LeadCache(LEAD_CACHE_PATH, ttl_seconds=LEAD_CACHE_TTL_SECONDS,
+                                                  max_entries=LEAD_CACHE_MAX_ENTRIES)
+
+# Metriken für /metrics (Prometheus-Textformat)
+PHASEN_DAUER = Histogram("salesnav_phase_duration_seconds", "Dauer je Scraping-Phase", labels=("phase",))
+KARTEN_GEFUNDEN = Counter("salesnav_cards_found_total", "Ausgelesene Ergebniskarten")
+KONTAKTE_BEHALTEN = Counter("salesnav_contacts_kept_total", "Nach Rollenfilter behaltene Kontakte")
+FIRMEN_VERARBEITET = Counter("salesnav_firms_total", "Verarbeitete Firmen nach Quelle", labels=("source",))
+ZEILEN_GESCHRIEBEN = Counter("salesnav_rows_written_total", "Geschriebene Eingabezeilen")
+FEHLER = Counter("salesnav_errors_total", "Fehler nach Ausnahmetyp", labels=("type",))
+JOBS_IN_ARBEIT = Gauge("salesnav_jobs_in_flight", "Laufende Jobs")
+JOBS_WARTEND = Gauge("salesnav_jobs_queued", "Wartende Jobs")
+ZEILEN_IN_ARBEIT = Gauge("salesnav_rows_in_flight", "Noch offene Zeilen laufender Jobs")
+JOBS_IN_ARBEIT.set_function(lambda: job_store.stats()["jobs"].get("running", 0))
+JOBS_WARTEND.set_function(lambda: job_store.stats()["jobs"].get("queued", 0))
+ZEILEN_IN_ARBEIT.set_function(lambda: job_store.stats()["rows_in_flight"])
+add_observer(lambda name, start, dauer, attrs: PHASEN_DAUER.observe(dauer, phase=name))
+BLOCKIERTE_ANFRAGEN = Counter("salesnav_requests_blocked_total", "Blockierte Seitenressourcen", labels=("type",))
+GESPARTE_BYTES = Counter("salesnav_bytes_saved_estimated_total", "Geschätzt gesparte Bytes durch blockierte Ressourcen")
+
+# Ressourcen-Politik der Automatisierungs-Seiten: Ressourcentypen (Playwright) und URL-Muster (fnmatch),
+# die nicht geladen werden – leer = nichts blockieren
+BLOCK_RESOURCE_TYPES = [t.strip() for t in os.getenv("BLOCK_RESOURCE_TYPES", ",".join(STANDARD_TYPEN)).split(",") if t.strip()]
+BLOCK_URL_PATTERNS = [m.strip() for m in os.getenv("BLOCK_URL_PATTERNS", ",".join(STANDARD_MUSTER)).split(",") if m.strip()]
+
+def _blockiert_zaehlen(typ, geschaetzte_bytes):
+    BLOCKIERTE_ANFRAGEN.inc(type=typ)
+    GESPARTE_BYTES.inc(geschaetzte_bytes)
+
+ressourcen_politik = RessourcenPolitik(BLOCK_RESOURCE_TYPES, BLOCK_URL_PATTERNS, bei_blockiert=_blockiert_zaehlen)
+
 MAX_KONTAKTE_PRO_FIRMA = 3
 WARTEN_ZWISCHEN_FIRMEN = (5, 8)
+
+# Parallele Seiten im gemeinsamen Browser-Prozess (nur Playwright); 1 = sequentiell wie bisher
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_MAX_CONCURRENCY = int(os.getenv("BROWSER_MAX_CONCURRENCY", "0")) or None
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "0") == "1"
+
+# Gemeinsamer Scheduler für alle Jobs: eine Sitzung, faire Verteilung der Firmen, globale Obergrenze
+# an parallel gesuchten Firmen (Seiten der Sitzung); die Sitzung schließt nach Leerlauf
+SCHEDULER_IDLE_SECONDS = int(os.getenv("SCHEDULER_IDLE_SECONDS", "120"))
+# Sitzung schon beim Serverstart öffnen und einloggen (BROWSER_POOL_SIZE Seiten) und offen halten;
+# im Leerlauf alle SESSION_HEALTH_SECONDS prüfen und bei Bedarf neu starten
+BROWSER_WARM_START = os.getenv("BROWSER_WARM_START", "1") == "1"
+SESSION_HEALTH_SECONDS = int(os.getenv("SESSION_HEALTH_SECONDS", "60"))
+
+# Verteilte Verarbeitung sehr großer Listen: ab SHARD_MIN_FIRMEN zu scrapenden Firmen übernehmen
+# SHARD_WORKERS eigene Worker-Prozesse (je eigenes, eingeloggtes Profil) Einheiten zu SHARD_SIZE Firmen
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "0"))  # 0 = aus
+SHARD_SIZE = int(os.getenv("SHARD_SIZE", "25"))
+SHARD_MIN_FIRMEN = int(os.getenv("SHARD_MIN_FIRMEN", "500"))
+SHARD_QUEUE_PATH = Path(os.getenv("SHARD_QUEUE_PATH", "shards.sqlite3"))
+SHARD_LEASE_SECONDS = int(os.getenv("SHARD_LEASE_SECONDS", "600"))
+SHARD_PROFILE_PATTERN = os.getenv("SHARD_PROFILE_PATTERN", "profile_shard{nr}")
+
+# Pipeline Lesen -> Scrapen -> Schreiben: höchstens PIPELINE_WINDOW Firmen eines Jobs gleichzeitig
+# eingereiht oder in Arbeit; die Ergebnisdatei wird alle PIPELINE_FLUSH_ROWS Zeilen bzw. spätestens
+# nach PIPELINE_FLUSH_SECONDS geleert (Fortschritt im selben Takt)
+PIPELINE_WINDOW = int(os.getenv("PIPELINE_WINDOW", "32"))
+PIPELINE_FLUSH_ROWS = int(os.getenv("PIPELINE_FLUSH_ROWS", "1000"))
+PIPELINE_FLUSH_SECONDS = float(os.getenv("PIPELINE_FLUSH_SECONDS", "2"))
+
+# Zeitleiste je Job (Chrome-Trace-JSON neben dem Ergebnis, z.B. in ui.perfetto.dev öffnen): pro Job
+# über die Upload-Option "trace" oder mit TRACE_JOBS=1 für alle Jobs
+TRACE_JOBS = os.getenv("TRACE_JOBS", "0") == "1"
+
+# Delta-Lauf gegen eine frühere Ergebnisdatei (Upload-Feld "basis": Job-ID oder Dateiname): unveränderte
+# Firmen übernehmen deren Kontakte, solange diese höchstens DELTA_MAX_AGE_DAYS Tage alt sind (pro
+# Upload über "max_age_days"); neue, geänderte und veraltete Firmen werden gesucht
+DELTA_MAX_AGE_DAYS = float(os.getenv("DELTA_MAX_AGE_DAYS", "30"))
+
+# Stapel-Upload (/upload/batch: mehrere Listen oder ein ZIP): die Firmen aller Listen werden in einem Job
+# je einmal gesucht, danach bekommt jede Liste ihr eigenes Ergebnis (zusammen als ZIP)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+BATCH_MAX_MB = float(os.getenv("BATCH_MAX_MB", "500"))  # höchstens so viel entpackt je ZIP-Archiv
+
+# Für Benchmarks gegen den lokalen Nachbau (benchmarks/fixture_server.py): andere Basis-URL und
+# SALESNAV_SKIP_WAITS=1 überspringt die bewussten Wartezeiten (Tippen, zwischen Firmen)
+SALESNAV_BASE_URL = os.getenv("SALESNAV_BASE_URL", "https://www.linkedin.com").rstrip("/")
+SKIP_WAITS = os.getenv("SALESNAV_SKIP_WAITS", "0") == "1"
+
+# Gespeicherte Anmeldung (python src/anmeldung.py --login): ist sie vorhanden, starten alle Kontexte
+# kopflos mit diesem Zustand statt sichtbar auf PROFILE_DIR. Ohne gültige Anmeldung wird der Job als
+# needs_reauth markiert; auf eine Eingabe im Terminal wird nur mit LOGIN_INTERACTIVE=1 gewartet.
+SESSION_STATE_PATH = Path(os.getenv("SESSION_STATE_PATH", "session_state.json"))
+SESSION_HEADLESS = os.getenv("SESSION_HEADLESS", "1") == "1"
+LOGIN_INTERACTIVE = os.getenv("LOGIN_INTERACTIVE", "0") == "1"
+anmeldung = AnmeldeZustand(SESSION_STATE_PATH, SALESNAV_BASE_URL, os.getenv("SESSION_AUTH_COOKIE", AUTH_COOKIE))
 DEFAULT_FIELDS = ["Firma 1", "Firma (Gesamt)", "Name", "Aussteller", "Unternehmen"]
+CSV_SAMPLE_BYTES = 64 * 1024  # Stichprobe für Kodierungs-Erkennung
+
+# Die Suchseite bleibt je Browser-Seite offen, Suchen werden an Ort und Stelle abgeschickt;
+# nach SUCHSEITE_MAX_SUCHEN Suchen wird sie trotzdem neu geladen
+SUCHFELD_SELECTOR = "input[placeholder='Keywords für Suche']"
+SUCHSEITE_MAX_SUCHEN = int(os.getenv("SUCHSEITE_MAX_SUCHEN", "100"))
+
+# Aufzeichnung der Trefferlisten (HTML je Firma, komprimiert und inhaltsadressiert) für die
+# Wiedergabe ohne Browser: python src/aufnahmen.py --wiedergabe
+RECORD_SNAPSHOTS = os.getenv("RECORD_SNAPSHOTS", "0") == "1"
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "snapshots"))
+aufnahmen = AufnahmeSpeicher(SNAPSHOT_DIR) if RECORD_SNAPSHOTS else None
 
 # Konstanten für die Pausensteuerung
 PAUSE_INTERVAL_MIN = 25  # Minuten
@@ -66,6 +209,12 @@ PAUSE_DURATION_MIN = 4   # Minuten
 PAUSE_DURATION_MAX = 8   # Minuten
 RELOGIN_AFTER_PAUSES = 2  # Nach wievielen Pausen soll neu eingeloggt werden
 
+# Pausen und Wartezeiten zwischen Firmen sind Leerlauf der Browser-Sitzung: dann laufen eingereihte
+# Hintergrundaufgaben (Lead-Cache aufräumen, fertige Ergebnisse vorkomprimieren, die Firmenliste des
+# nächsten wartenden Jobs vorbereiten), statt nur zu schlafen
+leerlauf = Leerlauf()
+VORBEREITEN_JOBS = 1  # so viele wartende Jobs werden im Voraus erfasst (hält deren Firmen im Speicher)
+
 POSITIONEN = {
     "Marketing": ["marketing", "brand", "performance", "digitale projekte", "e-commerce"],
     "IT": ["it", "cio", "edv", "admin", "entwicklung", "digital", "projekt", "sap"],
@@ -83,32 +232,66 @@ ALLE_ROLLEN_STICHWORTE = {
     "Produktion": ["Produktion", "Fertigung", "Lager", "Materialwirtschaft", "Qualität", "Fuhrpark", "Konfektionierung", "Versand", "Digital Transformation", "Logistik"]
 }
 
-def detect_encoding(file_path):
-    """Erkennt die Kodierung einer Datei"""
+# Liest alle Ergebniskarten in einem Browser-Aufruf aus, statt inner_text/locator/get_attribute
+# einzeln pro Karte abzufragen (jeweils ein Round-Trip zwischen Python und Browser). Zerlegt
+# werden Text und Link in Python (karten.karte_aus_text) – genauso wie bei der Wiedergabe.
+KARTEN_SELECTOR = "li.artdeco-list__item"
+KARTEN_EXTRAKTION_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((card) => ({
+    text: (card.innerText || "").trim(),
+    href: Array.from(card.querySelectorAll("a[href*='/sales/lead/']"))
+        .map((a) => a.getAttribute("href"))
+        .find((href) => href && href.includes("/sales/lead/")) || "",
+}))
+"""
+# HTML der Trefferliste für die Aufzeichnung
+AUFNAHME_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), (card) => card.outerHTML).join("\\n")
+"""
+
+def detect_encoding(file_path, sample_size=None):
+    """Erkennt die Kodierung einer Datei anhand einer begrenzten Stichprobe"""
     with open(file_path, 'rb') as f:
-        result = chardet.detect(f.read())
-        if result['confidence'] > 0.7:
-            return result['encoding']
+        sample = f.read(sample_size or CSV_SAMPLE_BYTES)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    import chardet  # erst bei Bedarf laden (teurer Import)
+    result = chardet.detect(sample)
+    if result['confidence'] > 0.7:
+        # Reines ASCII in der Stichprobe heißt nicht, dass später keine Umlaute kommen
+        if result['encoding'] and result['encoding'].lower() == 'ascii':
+            return 'utf-8'
+        return result['encoding']
     return 'utf-8-sig'  # Fallback auf UTF-8 mit BOM
 
-def detect_delimiter(file_path, encoding):
-    """Erkennt das Trennzeichen in einer CSV-Datei"""
+def detect_delimiter(file_path, encoding, kopfzeile=None):
+    """Erkennt das Trennzeichen in einer CSV-Datei (Anführungszeichen werden beachtet)
+
+    Maßgeblich ist die Kopfzeile, wie stream_csv sie findet: der erste nicht leere Datensatz, bei
+    `kopfzeile` ab diesem Datensatz. Gezählt wird wie dort in CSV-Datensätzen, nicht in Zeilen –
+    eine Zelle mit Zeilenumbruch in den Titelzeilen verschiebt die Zählung also nicht.
+    """
     delimiters = [',', ';', '\t', '|']
     best_delimiter = ','  # Standard-Fallback
     most_columns = 0
-    
+
+    def kopf_datensatz(delimiter):
+        with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+            for nr, values in enumerate(csv.reader(f, delimiter=delimiter), 1):
+                if nr >= (kopfzeile or 1) and any(v.strip() for v in values):
+                    return values
+        return None
+
     try:
-        with codecs.open(file_path, 'r', encoding=encoding, errors='replace') as f:
-            first_line = f.readline().strip()
-            if not first_line:
+        for delimiter in delimiters:
+            kopf = kopf_datensatz(delimiter)
+            if kopf is None:
                 return best_delimiter
-                
-            for delimiter in delimiters:
-                columns = len(first_line.split(delimiter))
-                print(f"Delimiter '{delimiter}': {columns} Spalten in der ersten Zeile")
-                if columns > most_columns:
-                    most_columns = columns
-                    best_delimiter = delimiter
+            columns = len(kopf)
+            print(f"Delimiter '{delimiter}': {columns} Spalten in der Kopfzeile")
+            if columns > most_columns:
+                most_columns = columns
+                best_delimiter = delimiter
     except Exception as e:
         print(f"⚠️ Fehler bei der Delimiter-Erkennung: {e}")
     
@@ -135,50 +318,37 @@ def detect_firmenspalte(headers):
         
     return None
 
-def load_csv(file_path):
-    """Robustes CSV-Laden mit Fehlerbehandlung"""
-    encoding = detect_encoding(file_path)
-    delimiter = detect_delimiter(file_path, encoding)
+def stream_csv(file_path, encoding=None, delimiter=None, kopfzeile=None):
+    """Liest eine CSV-Datei zeilenweise mit echten CSV-Regeln (Anführungszeichen, mehrzeilige Zellen)
+
+    Liefert (headers, zeilen, delimiter); `zeilen` ist ein Generator von Dicts, die Datei wird erst
+    beim Iterieren gelesen. Kodierung und Trennzeichen werden aus einer Stichprobe bestimmt. Mit
+    `kopfzeile` (1-basiert) beginnt die Suche nach dem Kopf erst bei diesem Datensatz.
+    """
+    encoding = encoding or detect_encoding(file_path)
+    delimiter = delimiter or detect_delimiter(file_path, encoding, kopfzeile)
     print(f"📊 Erkannte Kodierung: {encoding}, Trennzeichen: '{delimiter}'")
-    
-    headers = []
-    rows = []
-    
+
+    def datensaetze():
+        with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+            yield from enumerate(csv.reader(f, delimiter=delimiter), 1)
+
+    headers, zeilen = kopf_und_zeilen(datensaetze, kopfzeile)
+    return headers, zeilen, delimiter
+
+def stream_eingabe(file_path, blatt=None, kopfzeile=None, encoding=None, delimiter=None):
+    """stream_csv für CSV, stream_tabelle für .xlsx/.ods – Tabellen liefern als Trennzeichen None"""
+    if ist_tabelle(file_path):
+        headers, zeilen = stream_tabelle(file_path, blatt=blatt, kopfzeile=kopfzeile)
+        print(f"📊 Tabelle {Path(file_path).suffix.lower()}, Blatt: {blatt or 'erstes'}, {len(headers)} Spalten")
+        return headers, zeilen, None
+    return stream_csv(file_path, encoding=encoding, delimiter=delimiter, kopfzeile=kopfzeile)
+
+def load_csv(file_path):
+    """Robustes CSV-Laden mit Fehlerbehandlung (lädt alle Zeilen, siehe stream_csv)"""
     try:
-        with codecs.open(file_path, 'r', encoding=encoding, errors='replace') as f:
-            # Prüfe, ob die Datei leer ist
-            content = f.read()
-            if not content.strip():
-                raise ValueError("Die CSV-Datei ist leer")
-            
-            lines = content.splitlines()
-            if not lines:
-                raise ValueError("Keine Zeilen in der CSV-Datei gefunden")
-                
-            # Extrahiere Header
-            header_line = lines[0]
-            headers = [h.strip() for h in header_line.split(delimiter)]
-            headers = [h for h in headers if h]  # Leere Headers entfernen
-            
-            if not headers:
-                raise ValueError("Keine gültigen Header gefunden")
-                
-            # Verarbeite Datenzeilen
-            for i in range(1, len(lines)):
-                line = lines[i].strip()
-                if not line:
-                    continue
-                    
-                values = line.split(delimiter)
-                
-                # Anpassen der Zeilenlänge wenn nötig
-                if len(values) < len(headers):
-                    values.extend([''] * (len(headers) - len(values)))
-                elif len(values) > len(headers):
-                    values = values[:len(headers)]
-                    
-                row = {headers[j]: values[j].strip() for j in range(len(headers))}
-                rows.append(row)
+        headers, zeilen, delimiter = stream_csv(file_path)
+        rows = list(zeilen)
     except Exception as e:
         print(f"❌ Fehler beim CSV-Laden: {e}")
         raise ValueError(f"Fehler beim Verarbeiten der CSV-Datei: {e}")
@@ -186,56 +356,197 @@ def load_csv(file_path):
     return headers, rows, delimiter
 
 def start_browser():
-    """Startet einen Browser mit Playwright"""
+    """Startet einen Browser mit Playwright (mit gespeicherter Anmeldung kopflos)"""
     print("🌐 Starte Browser mit Playwright...")
+    if anmeldung.vorhanden():
+        anmeldung.sicherstellen()  # abgelaufenes Cookie: gar nicht erst starten
     try:
+        from playwright.sync_api import sync_playwright
         p = sync_playwright().start()
-        browser = p.chromium.launch_persistent_context(str(PROFILE_DIR), headless=False)
+        if anmeldung.vorhanden():
+            browser = p.chromium.launch(headless=SESSION_HEADLESS).new_context(**anmeldung.kontext_optionen())
+        else:
+            browser = p.chromium.launch_persistent_context(str(PROFILE_DIR), headless=BROWSER_HEADLESS)
         page = browser.new_page()
+        ressourcen_politik.anwenden(page)
         return page, p, browser  # Rückgabe: page, p, browser
     except Exception as e:
         print(f"❌ Fehler beim Starten von Playwright: {e}")
         
-        # Nur wenn Selenium importiert wurde, versuche den Fallback
-        if 'webdriver' in globals() and 'Options' in globals():
+        # Nur wenn Selenium installiert ist, versuche den Fallback
+        if USE_SELENIUM or _modul_vorhanden("selenium"):
             print("⚠️ Fallback auf Selenium...")
+            from selenium import webdriver
             options = webdriver.ChromeOptions()
             options.add_argument(f"user-data-dir={str(PROFILE_DIR)}")
+            if BROWSER_HEADLESS:
+                options.add_argument("--headless=new")
             driver = webdriver.Chrome(options=options)
+            ressourcen_politik.selenium_anwenden(driver)
             return driver, None, None
         else:
             raise ValueError(f"Weder Playwright noch Selenium konnte gestartet werden: {e}")
 
+def start_browser_pool():
+    """Startet den Browser-Pool (mit gespeicherter Anmeldung kopflos, sonst auf PROFILE_DIR)"""
+    if anmeldung.vorhanden():
+        anmeldung.sicherstellen()
+        return BrowserPool(BROWSER_POOL_SIZE, PROFILE_DIR, headless=SESSION_HEADLESS,
+                           page_setup=ressourcen_politik.anwenden, storage_state=anmeldung.pfad).start()
+    return BrowserPool(BROWSER_POOL_SIZE, PROFILE_DIR, headless=BROWSER_HEADLESS,
+                       page_setup=ressourcen_politik.anwenden).start()
+
+def close_browser(browser, p, browser_context):
+    """Schließt Playwright- bzw. Selenium-Browser"""
+    try:
+        if p and browser_context:
+            browser_context.close()
+            p.stop()
+        else:
+            browser.quit()
+    except Exception as e:
+        print(f"⚠️ Fehler beim Schließen des Browsers: {e}")
+
+def _menschliche_pause(von, bis):
+    """Zufällige Wartezeit zwischen Aktionen; entfällt mit SALESNAV_SKIP_WAITS=1"""
+    if not SKIP_WAITS:
+        time.sleep(random.uniform(von, bis))
+
+def _manuell_einloggen(aktuelle_url):
+    """Wartet nur mit LOGIN_INTERACTIVE=1 auf einen Login im Terminal, sonst ReauthRequired"""
+    if not LOGIN_INTERACTIVE:
+        raise ReauthRequired("LinkedIn-Anmeldung erforderlich – bitte anmelden (python src/anmeldung.py --login), "
+                             "danach den Job erneut starten")
+    print("🔐 Bitte manuell einloggen...")
+    input("Drücke ENTER nach dem Login...")
+    time.sleep(2)
+    return not ist_login_url(aktuelle_url())
+
 def perform_login(browser):
-    """Führt den Login-Prozess durch"""
+    """Prüft die Anmeldung; ohne gültige Anmeldung ReauthRequired statt auf eine Eingabe zu warten"""
+    if not hasattr(browser, 'current_url') and anmeldung.vorhanden():
+        # Gespeicherte Anmeldung: eine HTTP-Anfrage mit den Cookies des Kontexts, kein Seitenaufbau
+        anmeldung.sicherstellen(browser.context.request)
+        print("✅ Gespeicherte Anmeldung gültig")
+        return True
     if hasattr(browser, 'current_url'):  # Selenium-Browser
-        browser.get("https://www.linkedin.com/sales/")
-        time.sleep(3)
-        if "login" in browser.current_url or "checkpoint" in browser.current_url:
-            print("🔐 Bitte manuell einloggen...")
-            input("Drücke ENTER nach dem Login...")
-            time.sleep(2)
-            if "login" in browser.current_url or "checkpoint" in browser.current_url:
-                return False
-            return True
+        browser.get(f"{SALESNAV_BASE_URL}/sales/")
+        _menschliche_pause(3, 3)
+        if ist_login_url(browser.current_url):
+            return _manuell_einloggen(lambda: browser.current_url)
         else:
             print("✅ Bereits eingeloggt")
             return True
     else:  # Playwright-Browser
-        browser.goto("https://www.linkedin.com/sales/")
-        time.sleep(3)
-        if "login" in browser.url or "checkpoint" in browser.url:
-            print("🔐 Bitte manuell einloggen...")
-            input("Drücke ENTER nach dem Login...")
-            time.sleep(2)
-            if "login" in browser.url or "checkpoint" in browser.url:
-                return False
-            return True
+        browser.goto(f"{SALESNAV_BASE_URL}/sales/")
+        _menschliche_pause(3, 3)
+        if ist_login_url(browser.url):
+            return _manuell_einloggen(lambda: browser.url)
         else:
             print("✅ Bereits eingeloggt")
             return True
 
-def scrape_leads_selenium(driver, firma, relevante_keywords, rollen_filter):
+def extract_cards_playwright(page):
+    """Liest alle Ergebniskarten mit einem einzigen page.evaluate aus"""
+    return [karte_aus_text(k["text"], k["href"]) for k in page.evaluate(KARTEN_EXTRAKTION_JS, KARTEN_SELECTOR)]
+
+def extract_cards_selenium(driver):
+    """Liest alle Ergebniskarten mit einem einzigen execute_script aus"""
+    karten = driver.execute_script(f"return ({KARTEN_EXTRAKTION_JS})(arguments[0]);", KARTEN_SELECTOR)
+    return [karte_aus_text(k["text"], k["href"]) for k in karten]
+
+def trefferliste_aufnehmen(browser, firma, suche, rollen):
+    """Speichert das HTML der Trefferliste (nur mit RECORD_SNAPSHOTS=1); Fehler stören die Suche nicht"""
+    if aufnahmen is None:
+        return
+    try:
+        with phase("snapshot"):
+            if hasattr(browser, 'current_url'):  # Selenium-Browser
+                html = browser.execute_script(f"return ({AUFNAHME_JS})(arguments[0]);", KARTEN_SELECTOR)
+            else:
+                html = browser.evaluate(AUFNAHME_JS, KARTEN_SELECTOR)
+            aufnahmen.ablegen(firma, rollen, html, suche=suche)
+    except Exception as e:
+        print(f"⚠️ Aufnahme für '{firma}' fehlgeschlagen: {e}")
+
+def build_rollen_matcher(rollen):
+    """Kompiliert die Stichworte der gewählten Rollen einmal pro Job zu einem RollenMatcher
+
+    Eigene Rollen ohne Stichwortliste werden wie in der Suche mit ihrem Namen als Stichwort gewertet.
+    """
+    stichworte = []
+    for rolle in rollen:
+        rolle = rolle.strip()
+        if rolle not in POSITIONEN and rolle not in ALLE_ROLLEN_STICHWORTE:
+            stichworte.append(rolle)
+            continue
+        stichworte.extend(POSITIONEN.get(rolle, []))
+        stichworte.extend(ALLE_ROLLEN_STICHWORTE.get(rolle, []))
+    return RollenMatcher(stichworte)
+
+def contacts_from_cards(cards, matcher=None):
+    """Wandelt ausgelesene Karten in Kontakte um und behält die relevantesten MAX_KONTAKTE_PRO_FIRMA
+
+    Doppelte Namen und Karten ohne Lead-Link werden übersprungen. Mit Matcher kommen Karten mit
+    passender Position zuerst (nach Relevanz), die übrigen Plätze füllen Karten ohne Treffer in
+    Seitenreihenfolge; ohne Matcher gilt nur die Seitenreihenfolge.
+    """
+    kandidaten = []
+    seen_names = set()
+    for card in cards:
+        print(f"RAW CARD TEXT:\n{card['text']}\n---")
+        if not card["firmaline"]:  # weniger als drei Zeilen
+            continue
+        if card["name"] in seen_names:
+            continue
+        seen_names.add(card["name"])
+        if not card["href"]:
+            continue
+        kandidaten.append(card)
+
+    with phase("role_filter"):
+        if matcher:
+            auswahl = matcher.rank([c["position"] for c in kandidaten], MAX_KONTAKTE_PRO_FIRMA)
+        else:
+            auswahl = range(min(len(kandidaten), MAX_KONTAKTE_PRO_FIRMA))
+
+    KARTEN_GEFUNDEN.inc(len(cards))
+    contacts = []
+    for i in auswahl:
+        card = kandidaten[i]
+        print(f"✔ Kontakt gefunden: {card['name']} | {card['position']}")
+        contacts.append({
+            "Name": card["name"],
+            "Position": card["position"],
+            "LinkedIn Profil": urljoin(SALESNAV_BASE_URL, card["href"])
+        })
+    KONTAKTE_BEHALTEN.inc(len(contacts))
+    return contacts
+
+_wiedergabe_matcher = {}  # Rollenauswahl -> RollenMatcher (je Wiedergabe-Prozess)
+
+def kontakte_aus_html(html, rollen):
+    """Auswertung einer aufgezeichneten Trefferliste wie beim Scrapen, ohne Browser (siehe aufnahmen.py)"""
+    schluessel = tuple(rollen)
+    matcher = _wiedergabe_matcher.get(schluessel)
+    if matcher is None:
+        matcher = _wiedergabe_matcher[schluessel] = build_rollen_matcher(rollen)
+    return contacts_from_cards(karten_aus_html(html), matcher)
+
+def suchseite_fuer(page):
+    """Offene Suchseite je Browser-Seite (wird über alle Firmen hinweg wiederverwendet)
+
+    Sie hängt an der Seite bzw. dem Selenium-Driver selbst und verschwindet mit ihm – kein globales
+    Verzeichnis, das geschlossene Browser festhält oder über eine wiederverwendete id() verwechselt.
+    """
+    seite = getattr(page, "_suchseite", None)
+    if seite is None:
+        seite = SuchSeite(page, f"{SALESNAV_BASE_URL}/sales/search/people", SUCHFELD_SELECTOR, KARTEN_SELECTOR,
+                          pause=_menschliche_pause, max_suchen=SUCHSEITE_MAX_SUCHEN)
+        page._suchseite = seite
+    return seite
+
+def scrape_leads_selenium(driver, firma, matcher, rollen_filter):
     """Scrape-Funktion für Selenium"""
     contacts = []
     
@@ -254,79 +565,37 @@ def scrape_leads_selenium(driver, firma, relevante_keywords, rollen_filter):
     print(f"🔍 Suche: {suche}")
     
     try:
-        # Zur Suchseite navigieren
-        driver.get("https://www.linkedin.com/sales/search/people")
-        time.sleep(random.uniform(3.0, 5.0))
+        # Suchseite nur laden, wenn sie nicht mehr offen ist
+        seite = suchseite_fuer(driver)
+        seite.bereit()
         
-        # Suchfeld finden und Suchanfrage eingeben
+        # Suchanfrage im vorhandenen Feld abschicken, warten bis die Trefferliste wechselt
         try:
-            suchfeld = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder='Keywords für Suche']"))
-            )
-            suchfeld.clear()
-            time.sleep(random.uniform(0.5, 0.8))
-            
-            # Zeichen für Zeichen eingeben für natürlicheres Verhalten
-            for char in suche:
-                suchfeld.send_keys(char)
-                time.sleep(random.uniform(0.05, 0.15))
-                
-            suchfeld.send_keys(Keys.ENTER)
-            time.sleep(random.uniform(3.0, 5.0))
+            seite.suchen(suche)
         except Exception as e:
             print(f"⚠️ Fehler bei der Suche: {e}")
+            FEHLER.inc(type=type(e).__name__)
             return []
+        trefferliste_aufnehmen(driver, firma, suche, rollen_filter)
         
         # Karten finden und verarbeiten
         try:
-            cards = driver.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item")
-            print(f"\nFirma: {firma} → Karten gefunden: {len(cards)}")
-            
-            seen_names = set()
-            for card in cards[:MAX_KONTAKTE_PRO_FIRMA]:
-                try:
-                    card_text = card.text.strip()
-                    print(f"RAW CARD TEXT:\n{card_text}\n---")
-                    
-                    lines = [l.strip() for l in card_text.split("\n") if l.strip()]
-                    if len(lines) < 3:
-                        continue
-                        
-                    name, position, firmaline = lines[0], lines[1], lines[2]
-                    if name in seen_names:
-                        continue
-                    seen_names.add(name)
-                    
-                    # Link finden
-                    link_elements = card.find_elements(By.CSS_SELECTOR, "a[href*='/sales/lead/']")
-                    link = ""
-                    for l in link_elements:
-                        href = l.get_attribute("href")
-                        if href and "/sales/lead/" in href:
-                            link = href
-                            break
-                            
-                    if not link:
-                        continue
-                        
-                    print(f"✔ Kontakt gefunden: {name} | {position}")
-                    contacts.append({
-                        "Name": name,
-                        "Position": position,
-                        "LinkedIn Profil": link
-                    })
-                except Exception as e:
-                    print(f"❌ Fehler bei Card: {e}")
+            with phase("card_extraction"):
+                cards = extract_cards_selenium(driver)
+                print(f"\nFirma: {firma} → Karten gefunden: {len(cards)}")
+                contacts = contacts_from_cards(cards, matcher)
             
         except Exception as e:
             print(f"❌ Fehler beim Scrapen: {e}")
+            FEHLER.inc(type=type(e).__name__)
     
     except Exception as e:
         print(f"❌ Unerwarteter Fehler: {e}")
+        FEHLER.inc(type=type(e).__name__)
     
     return contacts
 
-def scrape_leads_playwright(page, firma, relevante_keywords, rollen_filter):
+def scrape_leads_playwright(page, firma, matcher, rollen_filter):
     """Scrape-Funktion für Playwright"""
     # Extrahiere Suchbegriffe für alle ausgewählten Rollen
     suchbegriffe = []
@@ -342,92 +611,222 @@ def scrape_leads_playwright(page, firma, relevante_keywords, rollen_filter):
     
     print(f"🔍 Suche: {suche}")
     
-    page.goto("https://www.linkedin.com/sales/search/people")
-    time.sleep(random.uniform(3.0, 5.0))
+    # Suchseite nur laden, wenn sie nicht mehr offen ist
+    seite = suchseite_fuer(page)
+    seite.bereit()
 
     try:
-        suchfeld = page.locator("input[placeholder='Keywords für Suche']").first
-        suchfeld.wait_for(state="visible", timeout=5000)
-        suchfeld.focus()
-        time.sleep(random.uniform(0.5, 0.8))
-        suchfeld.fill("")
-        for char in suche:
-            suchfeld.type(char)
-            time.sleep(random.uniform(0.05, 0.15))
-        page.keyboard.press("Enter")
-        time.sleep(random.uniform(3.0, 5.0))
+        seite.suchen(suche)
     except Exception as e:
         print(f"⚠️ Fehler bei Suche nach '{firma}': {e}")
+        FEHLER.inc(type=type(e).__name__)
         return []
+    trefferliste_aufnehmen(page, firma, suche, rollen_filter)
 
-    contacts = []
-    seen_names = set()
-    cards = page.locator("li.artdeco-list__item").all()
-    print(f"\nFirma: {firma} → Karten gefunden: {len(cards)}")
+    with phase("card_extraction"):
+        cards = extract_cards_playwright(page)
+        print(f"\nFirma: {firma} → Karten gefunden: {len(cards)}")
+        return contacts_from_cards(cards, matcher)
+
+def scrape_leads(browser, firma, matcher, rollen_filter):
+    """Unified scrape function that works with both Selenium and Playwright"""
+    if hasattr(browser, 'current_url'):  # Selenium-Browser
+        return scrape_leads_selenium(browser, firma, matcher, rollen_filter)
+    else:  # Playwright-Browser
+        return scrape_leads_playwright(browser, firma, matcher, rollen_filter)
+
+def write_result_rows(writer, row, contacts):
+    """Schreibt eine Eingabezeile mit ihren Kontakten (eine Ausgabezeile je Kontakt)"""
+    if not contacts:
+        writer.writerow(row)
+        return
+    for idx, contact in enumerate(contacts[:MAX_KONTAKTE_PRO_FIRMA]):
+        row_copy = row.copy()
+        for k, v in contact.items():
+            row_copy[f"{k} {idx+1}"] = v
+        writer.writerow(row_copy)
+
+def scrape_firma(page, firma, matcher, rollen):
+    """Sucht eine Firma inkl. Wartezeit danach; None bei Fehler (wird nicht gecacht)"""
+    print(f"\n🔍 Verarbeite Firma: {firma}")
+    try:
+        _, blockiert_vorher, gespart_vorher = ressourcen_politik.stand(page)
+        contacts = scrape_leads(page, firma, matcher, rollen)
+        _, blockiert, gespart = ressourcen_politik.stand(page)
+        if blockiert > blockiert_vorher:
+            print(f"🚫 {blockiert - blockiert_vorher} Ressourcen blockiert (~{(gespart - gespart_vorher) / 1024:.0f} KB gespart)")
+        with phase("inter_firm_wait"):
+            if not SKIP_WAITS:
+                leerlauf.warten(random.uniform(*WARTEN_ZWISCHEN_FIRMEN))
+        return contacts
+    except Exception as e:
+        print(f"❌ Unerwarteter Fehler bei '{firma}': {e}")
+        FEHLER.inc(type=type(e).__name__)
+        return None
+
+def result_path(input_file):
+    """Pfad der Ergebnisdatei zu einer Eingabedatei"""
+    return RESULT_DIR / f"{Path(input_file).stem}_result.csv"
+
+def trace_path(input_file):
+    """Pfad der Zeitleiste (Chrome-Trace-JSON) neben der Ergebnisdatei"""
+    return RESULT_DIR / f"{Path(input_file).stem}_result.trace.json"
+
+def basis_ergebnis(basis):
+    """Frühere Ergebnisdatei zu einer Job-ID oder einem Dateinamen in RESULT_DIR; None, wenn es sie nicht gibt"""
+    job = job_store.get(basis)
+    name = job["result_file"] if job is not None else Path(basis).name
+    if not name or not name.endswith("_result.csv"):
+        return None
+    pfad = RESULT_DIR / name
+    return pfad if pfad.exists() else None
 
-    for card in cards[:MAX_KONTAKTE_PRO_FIRMA]:
+def referenz_laden(basis_file, rollen):
+    """Kontakte und Zeitpunkte je Firma aus einer früheren Ergebnisdatei (Delta-Lauf)
+
+    Liefert (referenz, zeitpunkte) für abgleich.abgleichen; wurde die Referenz mit einer anderen
+    Rollenauswahl erstellt, ist sie unbrauchbar und beides bleibt leer.
+    """
+    stand_rollen, zeitpunkte = stand_laden(basis_file)
+    if stand_rollen is not None and stand_rollen != sorted(rollen):
+        print(f"⚠️ Referenz {Path(basis_file).name} hat andere Rollen ({', '.join(stand_rollen)}) – alle Firmen werden gesucht")
+        return {}, {}
+    headers, zeilen, _ = stream_csv(basis_file)
+    firma_field = detect_firmenspalte(headers)
+    if not firma_field:
+        raise ValueError(f"Keine gültige Spalte für Firmennamen in der Referenz {Path(basis_file).name} gefunden.")
+    referenz = referenz_kontakte(zeilen, firma_field, MAX_KONTAKTE_PRO_FIRMA)
+    if zeitpunkte is None:  # Ergebnis ohne Stand-Datei: alle Firmen so alt wie die Datei
+        zeitpunkte = dict.fromkeys(referenz, Path(basis_file).stat().st_mtime)
+    return referenz, zeitpunkte
+
+def _warten(job, seconds):
+    """Wartet und arbeitet dabei Hintergrundaufgaben ab; bei Jobs abbrechbar. Liefert die Zahl erledigter Aufgaben"""
+    return leerlauf.warten(seconds, pruefen=job.check_cancelled if job else None)
+
+_vorbereitet = {}  # (Pfad, Größe, Änderungszeit, Blatt, Kopfzeile) -> Erfassung eines wartenden Jobs
+_vorbereitet_lock = threading.Lock()
+
+def _datei_stand(input_file, blatt=None, kopfzeile=None):
+    stat = Path(input_file).stat()
+    return str(input_file), stat.st_size, stat.st_mtime_ns, blatt, kopfzeile
+
+def _erfassen_schritte(input_file, blatt=None, kopfzeile=None, schritt=10_000):
+    """Erster Durchlauf über die Eingabe als Generator – liefert alle `schritt` Zeilen None
+
+    Ergebnis (return) ist die Erfassung: Kodierung, Trennzeichen (beide None bei .xlsx/.ods), Header,
+    Firmenspalte, Firmen je Schlüssel (erstes Vorkommen), letzte Zeile je Firma und die Zeilenzahlen.
+    """
+    encoding = None if ist_tabelle(input_file) else detect_encoding(input_file)
+    headers, rows, delimiter = stream_eingabe(input_file, blatt, kopfzeile, encoding=encoding)
+
+    # Firmenspalte finden
+    firma_field = detect_firmenspalte(headers)
+    if not firma_field:
+        raise ValueError("Keine gültige Spalte für Firmennamen gefunden.")
+
+    # Zeilen nach kanonischem Firmenschlüssel gruppieren – jede Firma wird nur einmal gesucht,
+    # Zeilen ohne Firmennamen werden direkt übernommen
+    firmen = {}        # Firmenschlüssel -> Firmenname des ersten Vorkommens
+    letzte_zeile = {}  # Firmenschlüssel -> letzte Zeile mit dieser Firma (danach Kontakte freigeben)
+    rows_total = rows_with_firma = 0
+    for idx, row in enumerate(rows):
+        rows_total += 1
+        firma = row.get(firma_field, "").strip()
+        if firma:
+            key = firmen_key(firma)
+            rows_with_firma += 1
+            letzte_zeile[key] = idx
+            firmen.setdefault(key, firma)
+        if rows_total % schritt == 0:
+            yield
+    return {"encoding": encoding, "delimiter": delimiter, "headers": headers, "firma_field": firma_field,
+            "firmen": firmen, "letzte_zeile": letzte_zeile, "rows_total": rows_total,
+            "rows_with_firma": rows_with_firma}
+
+def firmen_erfassen(input_file, blatt=None, kopfzeile=None):
+    """Erster Durchlauf – aus dem Leerlauf übernommen, wenn vorbereiten() schon gelaufen ist"""
+    with _vorbereitet_lock:
+        erfassung = _vorbereitet.pop(_datei_stand(input_file, blatt, kopfzeile), None)
+    if erfassung is not None:
+        print("⚡ Firmenliste wurde im Leerlauf vorbereitet")
+        return erfassung
+    schritte = _erfassen_schritte(input_file, blatt, kopfzeile)
+    while True:
         try:
-            card_text = card.inner_text().strip()
-            print(f"RAW CARD TEXT:\n{card_text}\n---")
-            lines = [l.strip() for l in card_text.split("\n") if l.strip()]
-            if len(lines) < 3:
-                continue
-            name, position, firmaline = lines[0], lines[1], lines[2]
-            if name in seen_names:
-                continue
-            seen_names.add(name)
-
-            link_els = card.locator("a[href*='/sales/lead/']").all()
-            link = ""
-            for l in link_els:
-                href = l.get_attribute("href")
-                if href and "/sales/lead/" in href:
-                    link = urljoin("https://www.linkedin.com", href)
-                    break
-            if not link:
-                continue
+            next(schritte)
+        except StopIteration as ende:
+            return ende.value
 
-            print(f"✔ Kontakt gefunden: {name} | {position}")
+def vorbereiten(input_file, blatt=None, kopfzeile=None):
+    """Hintergrundaufgabe: erster Durchlauf für einen wartenden Job, schrittweise im Leerlauf"""
+    schluessel = _datei_stand(input_file, blatt, kopfzeile)
+    with _vorbereitet_lock:
+        if schluessel in _vorbereitet:
+            return
+    erfassung = yield from _erfassen_schritte(input_file, blatt, kopfzeile)
+    with _vorbereitet_lock:
+        _vorbereitet[schluessel] = erfassung
+        while len(_vorbereitet) > VORBEREITEN_JOBS:
+            del _vorbereitet[next(iter(_vorbereitet))]  # älteste Vorbereitung verwerfen
 
-            contacts.append({
-                "Name": name,
-                "Position": position,
-                "LinkedIn Profil": link
-            })
-        except Exception as e:
-            print(f"❌ Fehler bei Card: {e}")
-            continue
+def leerlauf_auffuellen():
+    """Reiht die Hintergrundaufgaben für eine Pause ein (bereits anstehende werden übersprungen)"""
+    if SHARD_WORKER:
+        return  # Cache-Pflege und wartende Jobs sind Sache des Servers
+    leerlauf.einreihen("lead_cache_pflege", lead_cache.purge_expired)
+    for wartend in job_store.next_queued(VORBEREITEN_JOBS):
+        optionen = wartend["options"]
+        if optionen.get("batch_files"):  # Eingabe ist die Firmenliste des Stapels, eine einfache CSV
+            eingabe = (None, None)
+        else:
+            eingabe = (optionen.get("sheet"), optionen.get("header_row"))
+        leerlauf.einreihen(f"vorbereiten:{wartend['id']}", vorbereiten, wartend["input_file"], *eingabe)
 
-    return contacts
+def run_enrichment(input_file: str, rollen: list[str], job=None, refresh_cache: bool = False,
+                   scheduler=None, priority: int = 0, trace: bool = TRACE_JOBS, basis_file=None,
+                   max_alter_tage: float = DELTA_MAX_AGE_DAYS, blatt=None, kopfzeile=None, vorgabe=None) -> Path:
+    """Hauptfunktion für die Anreicherung der Daten
 
-def scrape_leads(browser, firma, relevante_keywords, rollen_filter):
-    """Unified scrape function that works with both Selenium and Playwright"""
-    if hasattr(browser, 'current_url'):  # Selenium-Browser
-        return scrape_leads_selenium(browser, firma, relevante_keywords, rollen_filter)
-    else:  # Playwright-Browser
-        return scrape_leads_playwright(browser, firma, relevante_keywords, rollen_filter)
+    Mit `scheduler` laufen die Firmen über die gemeinsame Sitzung aller Jobs (fair verteilt nach
+    `priority`), ohne eigenen Browser, Login und eigene Pausen. Mit `trace` wird eine Zeitleiste
+    aller Firmen und Phasen nach trace_path() geschrieben, auch wenn der Job scheitert. Mit
+    `basis_file` (frühere Ergebnisdatei) läuft ein Delta: unveränderte Firmen, deren Kontakte höchstens
+    `max_alter_tage` alt sind, werden übernommen statt gesucht. Eingaben als .xlsx/.ods werden direkt
+    gelesen (`blatt`: Name oder Nummer, sonst das erste; `kopfzeile`: 1-basiert, sonst die erste
+    nicht leere Zeile); das Ergebnis ist immer eine CSV. `vorgabe` ({Firmenschlüssel: (Kontakte,
+    Zeitpunkt)}) sind schon gesuchte Firmen, z.B. aus dem gemeinsamen Durchlauf eines Stapels.
+    """
+    eingabe = (blatt, kopfzeile)
+    if not trace:
+        return _run_enrichment(input_file, rollen, job, refresh_cache, scheduler, priority, basis_file, max_alter_tage,
+                               eingabe, vorgabe=vorgabe)
+    zeitleiste = Zeitleiste(trace_path(input_file), name=f"Job {job.job_id}" if job else Path(input_file).stem)
+    if job:
+        job.set_summary(trace_file=zeitleiste.pfad.name)
+    with zeitleiste.aufzeichnen():
+        return _run_enrichment(input_file, rollen, job, refresh_cache, scheduler, priority, basis_file,
+                               max_alter_tage, eingabe, zeitleiste, vorgabe=vorgabe)
 
-def run_enrichment(input_file: str, rollen: list[str]) -> Path:
-    """Hauptfunktion für die Anreicherung der Daten"""
+def _run_enrichment(input_file, rollen, job, refresh_cache, scheduler, priority, basis_file, max_alter_tage,
+                    eingabe=(None, None), zeitleiste=None, vorgabe=None):
     try:
-        # CSV-Daten laden
-        headers, rows, delimiter = load_csv(input_file)
-        
-        # Relevante Keywords für die Rollen finden
-        relevante_keywords = []
-        for rolle in rollen:
-            rolle = rolle.strip()
-            if rolle in POSITIONEN:
-                relevante_keywords.extend(POSITIONEN[rolle])
-
-        # Firmenspalte finden
-        firma_field = detect_firmenspalte(headers)
-        if not firma_field:
-            raise ValueError("Keine gültige Spalte für Firmennamen gefunden.")
+        # CSV-Daten streamen – die Datei wird zweimal gelesen (Firmen sammeln, Ergebnis schreiben),
+        # statt alle Zeilen im Speicher zu halten; gemerkt wird nur je Firma, nicht je Zeile
+        blatt, kopfzeile = eingabe
+        erfassung = firmen_erfassen(input_file, blatt, kopfzeile)
+        encoding, delimiter = erfassung["encoding"], erfassung["delimiter"]
+        headers, firma_field = erfassung["headers"], erfassung["firma_field"]
+        firmen, letzte_zeile = erfassung["firmen"], erfassung["letzte_zeile"]
+        rows_total, rows_with_firma = erfassung["rows_total"], erfassung["rows_with_firma"]
+        del erfassung
+
+        # Rollenfilter einmal pro Job kompilieren
+        matcher = build_rollen_matcher(rollen)
 
         # Ausgabedatei vorbereiten
         basename = Path(input_file).stem
-        output_file = RESULT_DIR / f"{basename}_result.csv"
+        output_file = result_path(input_file)
 
         # Header für LinkedIn-Kontakte hinzufügen
         for i in range(1, MAX_KONTAKTE_PRO_FIRMA + 1):
@@ -436,100 +835,392 @@ def run_enrichment(input_file: str, rollen: list[str]) -> Path:
                 if new_field not in headers:
                     headers.append(new_field)
 
-        # Browser starten
-        browser, p, browser_context = start_browser()
-        
-        # Wenn der Browser nicht gestartet werden konnte, abbrechen
-        if not browser:
-            raise ValueError("Browser konnte nicht gestartet werden")
+        if job:
+            job.set_total(rows_total)
+        dedup_ratio = round(1 - len(firmen) / rows_with_firma, 3) if rows_with_firma else 0.0
+        print(f"🧮 {rows_with_firma} Zeilen mit Firma → {len(firmen)} eindeutige Firmen (Dedup-Quote {dedup_ratio:.0%})")
+
+        # Bereits erledigte Firmen aus dem Journal (Resume nach Absturz/Neustart), dann aus dem Cache
+        # übernehmen – nur der Rest muss in den Browser
+        journal = EnrichmentJournal(JOURNAL_DIR / f"{basename}.jsonl")
+        fertig = {key: contacts for key, contacts in journal.load(rollen).items() if key in firmen}
+        resumed = len(fertig)
+        if resumed:
+            print(f"♻️ Resume: {resumed} Firmen bereits im Journal, werden übersprungen")
+
+        # Wann die Kontakte je Firma gesucht wurden – landet in der Stand-Datei für spätere Delta-Läufe.
+        # Journal und Cache zählen als jetzt (Cache-Einträge sind höchstens LEAD_CACHE_TTL alt)
+        jetzt = time.time()
+        zeitpunkte = dict.fromkeys(fertig, jetzt)
+
+        # Delta-Lauf: unveränderte, nicht veraltete Firmen aus der früheren Ergebnisdatei übernehmen
+        aus_referenz = set()
+        if basis_file:
+            referenz, referenz_zeitpunkte = referenz_laden(basis_file, rollen)
+            offen = {key: firma for key, firma in firmen.items() if key not in fertig}
+            uebernehmen, gruende = abgleichen(offen, referenz, referenz_zeitpunkte, max_alter_tage * 86400,
+                                              LEAD_CACHE_TTL_LEER_SECONDS, jetzt)
+            del referenz, referenz_zeitpunkte, offen
+            for key, (contacts, zeitpunkt) in uebernehmen.items():
+                fertig[key] = contacts
+                zeitpunkte[key] = zeitpunkt
+            aus_referenz = set(uebernehmen)
+            FIRMEN_VERARBEITET.inc(len(aus_referenz), source="delta")
+            print(f"🔁 Delta gegen {Path(basis_file).name}: {gruende['uebernommen']} Firmen übernommen, "
+                  f"{gruende['neu']} neu, {gruende['geaendert']} geändert, {gruende['veraltet']} veraltet")
+            if job:
+                job.set_summary(delta_basis=Path(basis_file).name, delta_firms=gruende)
+
+        # Stapel: Firmen aus dem gemeinsamen Durchlauf aller Listen übernehmen
+        aus_vorgabe = 0
+        if vorgabe:
+            for key in firmen:
+                if key in vorgabe and key not in fertig:
+                    fertig[key], zeitpunkte[key] = vorgabe[key]
+                    aus_vorgabe += 1
+            print(f"📚 Stapel: {aus_vorgabe} Firmen aus dem gemeinsamen Durchlauf übernommen")
+
+        zu_scrapen = {}  # Firmenschlüssel -> Firmenname
+        for key, firma in firmen.items():
+            if key in fertig:
+                continue
+            contacts = None if refresh_cache else lead_cache.get(firma, rollen)
+            if contacts is None:
+                zu_scrapen[key] = firma
+            else:
+                fertig[key] = contacts
+                zeitpunkte[key] = jetzt
+        cache_hits = len(firmen) - len(zu_scrapen) - resumed - len(aus_referenz) - aus_vorgabe
+        FIRMEN_VERARBEITET.inc(resumed, source="journal")
+        FIRMEN_VERARBEITET.inc(cache_hits, source="cache")
+        print(f"💾 Cache: {cache_hits} Treffer, {len(zu_scrapen)} Firmen zu scrapen" + (" (Refresh erzwungen)" if refresh_cache else ""))
+        if job:
+            job.set_summary(rows_with_firma=rows_with_firma, unique_firms=len(firmen), dedup_ratio=dedup_ratio,
+                            cache_hits=cache_hits, cache_misses=len(zu_scrapen), resumed_firms=resumed)
+
+        def suchen(page, firma):
+            if zeitleiste is None:
+                return scrape_firma(page, firma, matcher, rollen)
+            # Läuft evtl. in einem Thread des Schedulers oder Pools: Phasen dort diesem Job zuordnen
+            with zeitleiste.aktiv(), zeitleiste.span(firma, kategorie="firma"):
+                return scrape_firma(page, firma, matcher, rollen)
+
+        # Sehr große Listen gehen an eigene Worker-Prozesse
+        verteilt = SHARD_WORKERS > 0 and len(zu_scrapen) >= SHARD_MIN_FIRMEN
+
+        # Browser starten (nur wenn nicht alles im Cache war) – mehrere parallele Seiten nur mit Playwright
+        pool = pool_ergebnisse = None
+        browser = p = browser_context = None
+        if zu_scrapen and not scheduler and not verteilt:
+            if not USE_SELENIUM and BROWSER_POOL_SIZE > 1:
+                pool = start_browser_pool()
+                browser = pool.page
+            else:
+                browser, p, browser_context = start_browser()
             
-        # Login durchführen
-        logged_in = perform_login(browser)
-        if not logged_in:
-            if p and browser_context:
-                browser_context.close()
-                p.stop()
+            # Wenn der Browser nicht gestartet werden konnte, abbrechen
+            if not browser:
+                raise ValueError("Browser konnte nicht gestartet werden")
+
+        pausen = {"pauses": 0, "pause_seconds": 0.0, "pause_tasks": 0}  # eigene Pausen (ohne Scheduler)
+        try:
+            if not zu_scrapen:
+                ergebnisse = iter(())
+            elif verteilt:
+                run_id = f"{job.job_id if job else basename}-{uuid.uuid4().hex[:6]}"
+                pool_ergebnisse = verteilt_scrapen(SHARD_QUEUE_PATH, run_id, zu_scrapen, rollen, SHARD_WORKERS,
+                                                   SHARD_SIZE, SHARD_PROFILE_PATTERN, SHARD_LEASE_SECONDS,
+                                                   pruefen=job.check_cancelled if job else None)
+                ergebnisse = pool_ergebnisse
+            elif scheduler:
+                keys = list(zu_scrapen.keys())
+                pool_ergebnisse = scheduler.imap_unordered(job.job_id if job else basename, suchen,
+                                                           zu_scrapen.values(), prioritaet=priority,
+                                                           pruefen=job.check_cancelled if job else None,
+                                                           fenster=PIPELINE_WINDOW)
+                ergebnisse = ((keys[i], contacts) for i, contacts in pool_ergebnisse)
             else:
-                browser.quit()
-            raise ValueError("LinkedIn-Login fehlgeschlagen")
-
-        # CSV-Datei für Ergebnisse erstellen
-        with open(output_file, "w", newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=headers, delimiter=delimiter or ',')
-            writer.writeheader()
-
-            # Pausensteuerung initialisieren
-            next_pause_time = datetime.now() + timedelta(minutes=random.randint(PAUSE_INTERVAL_MIN, PAUSE_INTERVAL_MAX))
-            pause_count = 0
-            processed_count = 0
-
-            # Verarbeite jede Firma
-            for row in rows:
-                current_time = datetime.now()
-                
-                # Prüfen, ob eine Pause fällig ist
-                if current_time >= next_pause_time:
-                    pause_duration = random.randint(PAUSE_DURATION_MIN, PAUSE_DURATION_MAX)
-                    print(f"\n⏸️ Zeit für eine Pause! Pausiere für {pause_duration} Minuten...")
-                    time.sleep(pause_duration * 60)  # Umrechnung in Sekunden
-                    pause_count += 1
-                    print(f"▶️ Pause beendet. Fortfahren mit der Suche... (Pausen bisher: {pause_count})")
-                    
-                    # Nach festgelegter Anzahl an Pausen neu einloggen
-                    if pause_count % RELOGIN_AFTER_PAUSES == 0:
-                        print("🔄 Führe Re-Login durch...")
-                        if not perform_login(browser):
-                            print("⚠️ Re-Login fehlgeschlagen! Versuche fortzufahren...")
-                    
-                    # Neuen Zeitpunkt für die nächste Pause festlegen
-                    next_pause_time = datetime.now() + timedelta(minutes=random.randint(PAUSE_INTERVAL_MIN, PAUSE_INTERVAL_MAX))
-                    print(f"⏱️ Nächste Pause geplant um: {next_pause_time.strftime('%H:%M:%S')}")
-
-                firma = row.get(firma_field, "").strip()
-                if not firma:
-                    writer.writerow(row)
-                    continue
-
-                processed_count += 1
-                print(f"\n🔍 Verarbeite Firma {processed_count}/{len(rows)}: {firma}")
-                
-                try:
-                    contacts = scrape_leads(browser, firma, relevante_keywords, rollen)
-                    if not contacts:
-                        writer.writerow(row)
-                    else:
-                        for idx, contact in enumerate(contacts[:MAX_KONTAKTE_PRO_FIRMA]):
-                            row_copy = row.copy()
-                            for k, v in contact.items():
-                                row_copy[f"{k} {idx+1}"] = v
-                            writer.writerow(row_copy)
-                            outfile.flush()
-                    time.sleep(random.uniform(*WARTEN_ZWISCHEN_FIRMEN))
-                except Exception as e:
-                    print(f"❌ Unerwarteter Fehler bei '{firma}': {e}")
-                    writer.writerow(row)
-                    continue
-
-        # Browser schließen
-        if p and browser_context:
-            browser_context.close()
-            p.stop()
-        else:
-            browser.quit()
+                # Login durchführen
+                with phase("login"):
+                    logged_in = perform_login(browser)
+                if not logged_in:
+                    raise ValueError("LinkedIn-Login fehlgeschlagen")
+
+                if pool:
+                    # Ergebnisse kommen in beliebiger Reihenfolge zurück und werden unten wieder sortiert
+                    keys = list(zu_scrapen.keys())
+                    pool_ergebnisse = pool.imap_unordered(suchen, zu_scrapen.values(), BROWSER_MAX_CONCURRENCY,
+                                                          fenster=PIPELINE_WINDOW)
+                    ergebnisse = ((keys[i], contacts) for i, contacts in pool_ergebnisse)
+                else:
+                    ergebnisse = ((key, suchen(browser, firma)) for key, firma in zu_scrapen.items())
+
+            # CSV-Datei für Ergebnisse erstellen
+            with open(output_file, "w", newline='', encoding='utf-8', buffering=1024 * 1024) as outfile:
+                writer = csv.DictWriter(outfile, fieldnames=headers, delimiter=delimiter or ',')
+                writer.writeheader()
+
+                def zeilen_gemeldet(anzahl):
+                    ZEILEN_GESCHRIEBEN.inc(anzahl)
+                    if job:
+                        job.advance(anzahl)
+
+                schreiber = ZeilenSchreiber(outfile, lambda row, contacts: write_result_rows(writer, row, contacts),
+                                            PIPELINE_FLUSH_ROWS, PIPELINE_FLUSH_SECONDS, bei_flush=zeilen_gemeldet)
+
+                # Pausensteuerung initialisieren
+                next_pause_time = datetime.now() + timedelta(minutes=random.randint(PAUSE_INTERVAL_MIN, PAUSE_INTERVAL_MAX))
+                pause_count = 0
+                processed_count = 0
+                kontakte_gesamt = 0
+
+                def naechstes_ergebnis():
+                    """Holt das nächste gescrapte Ergebnis, sichert es und pausiert bei Bedarf"""
+                    nonlocal next_pause_time, pause_count, processed_count, kontakte_gesamt
+                    key, contacts = next(ergebnisse)
+                    if contacts is not None:
+                        journal.append(key, firmen[key], contacts, rollen)
+                        # Leere Ergebnisse nur kurz cachen – sie können auch von einer gestörten Suche stammen
+                        lead_cache.put(firmen[key], rollen, contacts,
+                                       ttl_seconds=None if contacts else LEAD_CACHE_TTL_LEER_SECONDS)
+                        zeitpunkte[key] = time.time()  # fehlgeschlagene Firmen gelten im nächsten Delta als veraltet
+                    fertig[key] = contacts or []
+                    FIRMEN_VERARBEITET.inc(source="scraped" if contacts is not None else "failed")
+                    processed_count += 1
+                    kontakte_gesamt += len(fertig[key])
+                    print(f"✔ Firma {processed_count}/{len(zu_scrapen)} fertig: {firmen[key]}")
+                    if job:
+                        job.emit("contacts", firma=firmen[key], found=len(fertig[key]), contacts_total=kontakte_gesamt,
+                                 firms_done=processed_count, firms_total=len(zu_scrapen))
+                        job.check_cancelled()
+
+                    # Prüfen, ob eine Pause fällig ist (Scheduler und Worker-Prozesse pausieren selbst)
+                    if browser and datetime.now() >= next_pause_time:
+                        pause_duration = random.randint(PAUSE_DURATION_MIN, PAUSE_DURATION_MAX)
+                        print(f"\n⏸️ Zeit für eine Pause! Pausiere für {pause_duration} Minuten...")
+                        if job:
+                            job.emit("pause_started", minutes=pause_duration,
+                                     until=(datetime.now() + timedelta(minutes=pause_duration)).isoformat(timespec="seconds"))
+                        if pool:
+                            pool.pause()
+                        pause_beginn = time.monotonic()
+                        with phase("pause"):
+                            leerlauf_auffuellen()
+                            pausen["pause_tasks"] += _warten(job, pause_duration * 60)  # Umrechnung in Sekunden
+                        pause_count += 1
+                        pausen["pauses"] = pause_count
+                        pausen["pause_seconds"] = round(pausen["pause_seconds"] + time.monotonic() - pause_beginn, 1)
+                        print(f"▶️ Pause beendet. Fortfahren mit der Suche... (Pausen bisher: {pause_count})")
+                        
+                        # Nach festgelegter Anzahl an Pausen neu einloggen
+                        if pause_count % RELOGIN_AFTER_PAUSES == 0:
+                            print("🔄 Führe Re-Login durch...")
+                            if not perform_login(browser):
+                                print("⚠️ Re-Login fehlgeschlagen! Versuche fortzufahren...")
+                        if pool:
+                            pool.resume()
+                        if job:
+                            job.emit("pause_ended", pauses=pause_count)
+                        
+                        # Neuen Zeitpunkt für die nächste Pause festlegen
+                        next_pause_time = datetime.now() + timedelta(minutes=random.randint(PAUSE_INTERVAL_MIN, PAUSE_INTERVAL_MAX))
+                        print(f"⏱️ Nächste Pause geplant um: {next_pause_time.strftime('%H:%M:%S')}")
+
+                # Zweiter Durchlauf: Zeilen in der ursprünglichen Reihenfolge schreiben. Jede Zeile wartet,
+                # bis ihre Firma fertig ist; Kontakte einer Firma gehen in jede Zeile mit demselben Schlüssel
+                # und werden nach deren letzter Zeile freigegeben
+                _, rows, _ = stream_eingabe(input_file, blatt, kopfzeile, encoding=encoding, delimiter=delimiter)
+                rows_reused = rows_scraped = 0
+                for idx, row in enumerate(rows):
+                    firma = row.get(firma_field, "").strip()
+                    key = firmen_key(firma) if firma else None
+                    rows_reused += key in aus_referenz
+                    rows_scraped += key in zu_scrapen
+                    if key is not None and key not in fertig:
+                        schreiber.flush()  # Fertiges sichtbar machen, bevor auf die Firma gewartet wird
+                        if job:
+                            job.emit("row_started", row=idx + 1, firma=firmen[key])
+                        with phase("result_wait"):
+                            while key not in fertig:
+                                naechstes_ergebnis()
+                    schreiber.zeile(row, fertig.get(key))
+                    if key is not None and letzte_zeile[key] == idx:
+                        del fertig[key]
+                schreiber.flush()
+
+            stand_speichern(output_file, rollen, zeitpunkte)
+            journal.remove()  # Ergebnis ist vollständig, ein Resume braucht das Journal nicht mehr
+            if basis_file:
+                print(f"🔁 Delta: {rows_reused} Zeilen übernommen, {rows_scraped} Zeilen gescrapt")
+            if job:
+                job.set_summary(rows_reused=rows_reused, rows_scraped=rows_scraped)
+            leerlauf.einreihen(f"vorkomprimieren:{output_file.name}", vorkomprimieren, output_file)
+        finally:
+            journal.close()
+            if pool_ergebnisse is not None:
+                pool_ergebnisse.close()  # keine weiteren Firmen dieses Jobs annehmen
+            if scheduler:
+                pausen = scheduler.pausen_abrechnen(job.job_id if job else basename)
+            if job:
+                job.set_summary(**pausen)
+            # Browser schließen
+            if pool:
+                pool.close()
+            elif browser:
+                close_browser(browser, p, browser_context)
             
         print(f"\n✅ Verarbeitung abgeschlossen! Ergebnis gespeichert unter: {output_file}")
         return output_file
         
+    except JobCancelled:
+        raise
     except Exception as e:
         # Fehlerbehandlung für die gesamte Funktion
         print(f"❌ Fehler in run_enrichment: {e}")
+        FEHLER.inc(type=type(e).__name__)
         import traceback
         traceback.print_exc()
         raise
 
+def run_batch(input_file, dateien, rollen, job=None, refresh_cache=False, scheduler=None, priority=0,
+              trace=TRACE_JOBS, blatt=None, kopfzeile=None) -> Path:
+    """Stapel-Job: sucht die Firmenliste des Stapels (`input_file`, siehe stapel.py) in einem Durchlauf
+    und schreibt danach jede Liste aus `dateien` ([{"name", "input_file", "rows"}]) ohne weitere Suche
+
+    Liefert das ZIP mit den Ergebnissen aller Listen; einzeln stehen sie in batch_results der Zusammenfassung.
+    """
+    run_enrichment(input_file, rollen, job=job, refresh_cache=refresh_cache, scheduler=scheduler,
+                   priority=priority, trace=trace)
+    referenz, zeitpunkte = referenz_laden(result_path(input_file), rollen)
+    jetzt = time.time()
+    vorgabe = {key: (contacts, zeitpunkte.get(key, jetzt)) for key, (_, contacts) in referenz.items()}
+    del referenz, zeitpunkte
+
+    if job:
+        job.set_total(job.rows_done + sum(datei["rows"] for datei in dateien))
+    ergebnisse = []
+    for datei in dateien:
+        if job:
+            job.check_cancelled()
+        print(f"📄 Stapel: schreibe {datei['name']}")
+        # Übrig bleiben nur Firmen, deren Liste sich seit dem Upload geändert hat – auch die über den Scheduler
+        ergebnis = run_enrichment(datei["input_file"], rollen, scheduler=scheduler, priority=priority, trace=False,
+                                  blatt=blatt, kopfzeile=kopfzeile, vorgabe=vorgabe)
+        ergebnisse.append({"name": datei["name"], "result_file": ergebnis.name})
+        if job:
+            job.advance(datei["rows"])
+            job.set_summary(batch_results=ergebnisse)  # fertige Listen sind schon einzeln abrufbar
+            job.emit("batch_file", name=datei["name"], result_file=ergebnis.name)
+    return buendeln(result_path(input_file).with_suffix(".zip"),
+                    [(f"{Path(e['name']).stem}_result.csv", RESULT_DIR / e["result_file"]) for e in ergebnisse])
+
+def start_session():
+    """Startet Browser bzw. Browser-Pool und loggt ein – Sitzung für den FirmenScheduler"""
+    if not USE_SELENIUM and BROWSER_POOL_SIZE > 1:
+        pool = start_browser_pool()
+        sitzung = Sitzung(pool.page, pool.close, worker_page=pool.worker_page)
+    else:
+        browser, p, browser_context = start_browser()
+        sitzung = Sitzung(browser, lambda: close_browser(browser, p, browser_context))
+    sitzung.relogin = lambda: perform_login(sitzung.page)
+    try:
+        with phase("login"):
+            logged_in = perform_login(sitzung.page)
+    except Exception:
+        sitzung.close()
+        raise
+    if not logged_in:
+        sitzung.close()
+        raise ValueError("LinkedIn-Login fehlgeschlagen")
+    if SHARD_WORKER:
+        return sitzung
+    wieder_eingereiht = job_store.requeue_reauth()
+    if wieder_eingereiht:
+        print(f"🔁 {wieder_eingereiht} Jobs nach neuer Anmeldung wieder eingereiht")
+    return sitzung
+
+def session_gesund(sitzung):
+    """Lebenszeichen der Sitzung ohne Navigation: Browser antwortet und ist nicht ausgeloggt"""
+    page = sitzung.page
+    if hasattr(page, 'current_url'):  # Selenium-Browser
+        page.execute_script("return 1")
+        url = page.current_url
+    else:
+        page.evaluate("1")
+        url = page.url
+        if anmeldung.vorhanden() and not anmeldung.pruefen(page.context.request):
+            return False
+    return not ist_login_url(url)
+
+def _pause_melden(job_ids, minuten):
+    """Meldet Pausen der gemeinsamen Sitzung an alle betroffenen Jobs; zu Beginn werden Hintergrundaufgaben eingereiht"""
+    if minuten is not None:
+        leerlauf_auffuellen()
+    for job_id in job_ids:
+        if minuten is None:
+            job_events.emit(job_id, "pause_ended")
+        else:
+            bis = datetime.now() + timedelta(minutes=minuten)
+            job_events.emit(job_id, "pause_started", minutes=round(minuten), until=bis.isoformat(timespec="seconds"))
+
+firmen_scheduler = FirmenScheduler(
+    start_session,
+    max_concurrency=(BROWSER_MAX_CONCURRENCY or BROWSER_POOL_SIZE) if not USE_SELENIUM else 1,
+    leerlauf_sekunden=SCHEDULER_IDLE_SECONDS,
+    pause_intervall=(PAUSE_INTERVAL_MIN, PAUSE_INTERVAL_MAX),
+    pause_dauer=(PAUSE_DURATION_MIN, PAUSE_DURATION_MAX),
+    relogin_nach=RELOGIN_AFTER_PAUSES,
+    bei_pause=_pause_melden,
+    gesund=session_gesund,
+    pruef_intervall=SESSION_HEALTH_SECONDS,
+    leerlauf=leerlauf,
+)
+
+def _run_job(job, handle):
+    """Runner für die Job-Worker – alle Jobs laufen über den gemeinsamen Scheduler"""
+    if job["options"].get("batch_files"):
+        return run_batch(job["input_file"], job["options"]["batch_files"], job["rollen"], job=handle,
+                         refresh_cache=job["options"].get("refresh_cache", False),
+                         scheduler=firmen_scheduler, priority=job["options"].get("priority", 0),
+                         trace=job["options"].get("trace", False) or TRACE_JOBS,
+                         blatt=job["options"].get("sheet"), kopfzeile=job["options"].get("header_row"))
+    return run_enrichment(job["input_file"], job["rollen"], job=handle,
+                          refresh_cache=job["options"].get("refresh_cache", False),
+                          scheduler=firmen_scheduler, priority=job["options"].get("priority", 0),
+                          trace=job["options"].get("trace", False) or TRACE_JOBS,
+                          basis_file=RESULT_DIR / job["options"]["delta_basis"] if job["options"].get("delta_basis") else None,
+                          max_alter_tage=job["options"].get("max_age_days", DELTA_MAX_AGE_DAYS),
+                          blatt=job["options"].get("sheet"), kopfzeile=job["options"].get("header_row"))
+
+job_workers = JobWorkerPool(job_store, _run_job, workers=JOB_WORKERS, events=job_events)
+
+@app.on_event("startup")
+def start_job_workers():
+    job_workers.start()
+    if BROWSER_WARM_START:
+        firmen_scheduler.vorwaermen()  # Start und Login laufen im Hintergrund
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_workers.stop()
+    firmen_scheduler.stop()
+
 @app.post("/upload")
-def upload_csv(file: UploadFile = File(...), rollen: str = Form("")):
-    """FastAPI-Endpunkt zum Hochladen einer CSV-Datei"""
+def upload_csv(file: UploadFile = File(...), rollen: str = Form(""), refresh: bool = Form(False),
+               priority: int = Form(0), trace: bool = Form(False), basis: str = Form(""),
+               max_age_days: float = Form(DELTA_MAX_AGE_DAYS), blatt: str = Form(""), kopfzeile: int = Form(0)):
+    """FastAPI-Endpunkt zum Hochladen einer CSV-, .xlsx- oder .ods-Datei – reiht einen Job ein und antwortet sofort
+
+    Mit `basis` (Job-ID oder Name einer früheren _result.csv) läuft der Job als Delta; wie viele Zeilen
+    übernommen und wie viele gescrapt wurden, steht danach in rows_reused/rows_scraped der Zusammenfassung.
+    Bei Tabellen wählt `blatt` das Blatt (Name oder Nummer) und `kopfzeile` die Zeile des Kopfes (0 = automatisch).
+    """
+    basis_file = None
+    if basis.strip():
+        basis_file = basis_ergebnis(basis.strip())
+        if basis_file is None:
+            return JSONResponse(status_code=404, content={"error": "Referenz-Ergebnis nicht gefunden."})
+
     uid = uuid.uuid4().hex[:8]
     save_path = UPLOAD_DIR / f"{uid}_{file.filename}"
     
@@ -537,23 +1228,209 @@ def upload_csv(file: UploadFile = File(...), rollen: str = Form("")):
         shutil.copyfileobj(file.file, buffer)
 
     rollen_liste = [r.strip() for r in rollen.split(",") if r.strip()]
+    job = job_store.create(save_path, rollen_liste, filename=file.filename,
+                           options={"refresh_cache": refresh, "priority": priority, "trace": trace,
+                                    "delta_basis": basis_file.name if basis_file else None,
+                                    "max_age_days": max_age_days, "sheet": blatt.strip() or None,
+                                    "header_row": kopfzeile if kopfzeile > 0 else None})
+    print(f"📤 Job {job['id']} eingereiht für {file.filename} mit Rollen: {rollen_liste}")
+    return JSONResponse(status_code=202, content=job_status(job))
+
+@app.post("/upload/batch")
+def upload_batch(files: list[UploadFile] = File(...), rollen: str = Form(""), refresh: bool = Form(False),
+                 priority: int = Form(0), trace: bool = Form(False), blatt: str = Form(""), kopfzeile: int = Form(0)):
+    """FastAPI-Endpunkt für mehrere Listen auf einmal (CSV, .xlsx, .ods oder ZIP-Archive damit) – ein Job
+
+    Firmen, die in mehreren Listen stehen, werden nur einmal gesucht; jede Liste bekommt ihr eigenes
+    Ergebnis, das Job-Ergebnis ist ein ZIP aller Ergebnisse. Die Antwort enthält schon die Bilanz:
+    shared_firms/shared_ratio (Firmen in mehr als einer Liste) und searches_saved (entfallene Suchen).
+    """
+    uid = uuid.uuid4().hex[:8]
+    nummern = itertools.count(1)
+
+    def ablage(name):
+        return UPLOAD_DIR / f"{uid}_{next(nummern):02d}_{name}"
+
+    dateien = []  # (Name, gespeicherter Pfad)
+    blatt_wahl, kopfzeile_wahl = blatt.strip() or None, kopfzeile if kopfzeile > 0 else None
     try:
-        print(f"📤 Starte Enrichment für {file.filename} mit Rollen: {rollen_liste}")
-        result_path = run_enrichment(str(save_path), rollen_liste)
-        return {"result_file": result_path.name}
+        for upload in files:
+            endung = Path(upload.filename).suffix.lower()
+            if endung == ".zip":
+                zip_pfad = UPLOAD_DIR / f"{uid}_{Path(upload.filename).name}"
+                with zip_pfad.open("wb") as buffer:
+                    shutil.copyfileobj(upload.file, buffer)
+                try:
+                    dateien += zip_entpacken(zip_pfad, ablage, max_dateien=BATCH_MAX_FILES - len(dateien),
+                                             max_bytes=BATCH_MAX_MB * 2**20)
+                finally:
+                    zip_pfad.unlink(missing_ok=True)
+            elif endung in STAPEL_ENDUNGEN:
+                save_path = ablage(Path(upload.filename).name)
+                dateien.append((Path(upload.filename).name, save_path))  # vorher, damit auch Halbfertiges aufgeräumt wird
+                with save_path.open("wb") as buffer:
+                    shutil.copyfileobj(upload.file, buffer)
+            else:
+                raise ValueError(f"{upload.filename}: nur CSV, .xlsx, .ods oder ZIP")
+            if len(dateien) > BATCH_MAX_FILES:
+                raise ValueError(f"Höchstens {BATCH_MAX_FILES} Listen je Stapel")
+        if not dateien:
+            raise ValueError("Keine CSV-, .xlsx- oder .ods-Datei im Stapel")
+
+        # Erster Durchlauf je Liste schon hier: ungültige Listen fallen vor dem Einreihen auf, und die
+        # Bilanz steht in der Antwort
+        firmen_je_datei, batch_files = [], []
+        for name, pfad in dateien:
+            try:
+                erfassung = firmen_erfassen(pfad, blatt_wahl, kopfzeile_wahl)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+            firmen_je_datei.append(erfassung["firmen"])
+            batch_files.append({"name": name, "input_file": str(pfad), "rows": erfassung["rows_total"]})
     except Exception as e:
-        import traceback
-        print(f"❌ Fehler beim Enrichment: {e}")
-        traceback.print_exc()
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        for _, pfad in dateien:
+            pfad.unlink(missing_ok=True)
+        if isinstance(e, ValueError):
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        raise
+
+    firmen, bilanz = vereinigen(firmen_je_datei)
+    del firmen_je_datei
+    firmenliste = UPLOAD_DIR / f"{uid}_stapel.csv"
+    firmenliste_schreiben(firmenliste, firmen)
+
+    rollen_liste = [r.strip() for r in rollen.split(",") if r.strip()]
+    job = job_store.create(firmenliste, rollen_liste, filename=f"Stapel aus {len(dateien)} Listen",
+                           options={"refresh_cache": refresh, "priority": priority, "trace": trace,
+                                    "sheet": blatt_wahl, "header_row": kopfzeile_wahl, "batch_files": batch_files},
+                           summary=bilanz)
+    print(f"📤 Stapel-Job {job['id']} eingereiht: {len(dateien)} Listen, {bilanz['unique_firms']} eindeutige Firmen, "
+          f"{bilanz['shared_ratio']:.0%} in mehreren Listen, {bilanz['searches_saved']} Suchen gespart")
+    return JSONResponse(status_code=202, content=job_status(job))
+
+@app.get("/jobs")
+def list_jobs(limit: int = 50):
+    """FastAPI-Endpunkt für die letzten Jobs"""
+    return {"jobs": [job_status(j) for j in job_store.list(limit)]}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """FastAPI-Endpunkt für Status, Zeilenzahlen, ETA und Ergebnisdatei eines Jobs"""
+    job = job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    return job_status(job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """FastAPI-Endpunkt für Live-Fortschritt als Server-Sent Events (ersetzt das Polling von /jobs/{id})"""
+    job = await run_in_threadpool(job_store.get, job_id)  # SQLite-Abfrage nicht auf der Event-Loop
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    try:
+        seit = int(request.headers.get("last-event-id") or 0)  # Wiederaufnahme nach Verbindungsabbruch
+    except ValueError:
+        seit = 0
+    stream = job_events.stream(job_id, seit, snapshot=job_status(job), beendet=job["status"] in FINAL_STATUSES)
+    return StreamingResponse(stream, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """FastAPI-Endpunkt zum Abbrechen eines Jobs"""
+    job = job_store.request_cancel(job_id, events=job_events)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    return job_status(job)
+
+@app.post("/jobs/{job_id}/retry")
+def retry_job(job_id: str):
+    """FastAPI-Endpunkt zum erneuten Starten eines fehlgeschlagenen Jobs – erledigte Firmen werden übersprungen"""
+    job = job_store.requeue(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    return job_status(job)
 
 @app.get("/result/{filename}")
-def download_result(filename: str):
-    """FastAPI-Endpunkt zum Herunterladen des Ergebnisses"""
+def download_result(filename: str, request: Request):
+    """FastAPI-Endpunkt zum Herunterladen des Ergebnisses (gzip/zstd, ETag/Last-Modified, Range)"""
     file_path = RESULT_DIR / filename
-    if file_path.exists():
-        return FileResponse(file_path, filename=filename)
-    return JSONResponse(status_code=404, content={"error": "Datei nicht gefunden."})
+    if not file_path.exists():
+        return JSONResponse(status_code=404, content={"error": "Datei nicht gefunden."})
+    if file_path.suffix == ".zip":  # Ergebnisse eines Stapel-Jobs, schon komprimiert
+        status, headers, body = datei_auslieferung(file_path, request.headers, filename, "application/zip",
+                                                   komprimierbar=False)
+    else:
+        status, headers, body = datei_auslieferung(file_path, request.headers, filename)
+    if body is None:
+        return Response(status_code=status, headers=headers)
+    return StreamingResponse(body, status_code=status, headers=headers)
+
+@app.get("/jobs/{job_id}/result")
+def download_job_result(job_id: str, request: Request, follow: bool = False):
+    """FastAPI-Endpunkt für das Ergebnis eines Jobs – auch während er läuft
+
+    Laufende Jobs liefern die bisher geschriebenen Zeilen; mit follow=true bleibt die Verbindung
+    offen und neue Zeilen folgen, bis der Job beendet ist.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    if job["status"] == STATUS_DONE:
+        return download_result(job["result_file"], request)
+    if job["options"].get("batch_files"):
+        # Laufend schreibt ein Stapel-Job nur seine Firmenliste – die Ergebnisse je Liste gibt es einzeln
+        # unter /result/{name}, sobald sie in batch_results stehen, das ZIP erst am Ende
+        return JSONResponse(status_code=409, content={"error": "Stapel-Job ist noch nicht fertig.",
+                                                      "batch_results": job["summary"].get("batch_results", [])})
+
+    file_path = result_path(job["input_file"])
+    kodierung = waehle_kodierung(request.headers.get("accept-encoding"))
+    laeuft = lambda: job_store.get(job_id)["status"] not in FINAL_STATUSES
+    body = komprimieren(verfolgen(file_path, laeuft, folgen=follow), kodierung, sofort_senden=follow)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{file_path.name}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+        "X-Accel-Buffering": "no",
+    }
+    if kodierung != "identity":
+        headers["Content-Encoding"] = kodierung
+    return StreamingResponse(body, media_type="text/csv; charset=utf-8", headers=headers)
+
+@app.get("/jobs/{job_id}/trace")
+def download_job_trace(job_id: str, request: Request):
+    """FastAPI-Endpunkt für die Zeitleiste eines mit Tracing gelaufenen Jobs (Chrome-Trace-JSON)"""
+    job = job_store.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": "Job nicht gefunden."})
+    file_path = trace_path(job["input_file"])
+    if not file_path.exists():
+        return JSONResponse(status_code=404, content={"error": "Keine Zeitleiste für diesen Job."})
+    status, headers, body = datei_auslieferung(file_path, request.headers, file_path.name, "application/json")
+    if body is None:
+        return Response(status_code=status, headers=headers)
+    return StreamingResponse(body, status_code=status, headers=headers)
+
+@app.get("/scheduler/stats")
+def get_scheduler_stats():
+    """FastAPI-Endpunkt für den Zustand der gemeinsamen Browser-Sitzung"""
+    return firmen_scheduler.stats()
+
+@app.get("/session")
+def get_session():
+    """FastAPI-Endpunkt für die gespeicherte Anmeldung (vorhanden, Alter, Cookie gültig)"""
+    return anmeldung.status()
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """FastAPI-Endpunkt für Größe und Trefferquote des Lead-Caches"""
+    return lead_cache.stats()
+
+@app.get("/metrics")
+def get_metrics():
+    """FastAPI-Endpunkt für Prometheus (Phasendauern, Karten, Kontakte, Fehler, Jobs und Zeilen in Arbeit)"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
 
 @app.get("/roles")
 def get_roles():
@@ -0,0 +1,281 @@
+# verteilung.py – Verteilte Verarbeitung großer Listen mit Worker-Prozessen
+#
+# Der Koordinator (run_enrichment) teilt die zu scrapenden Firmen in Arbeitseinheiten und legt sie
+# in einer SQLite-Warteschlange ab. Worker-Prozesse (verteilung_worker.py, je eigenes Profil und
+# eigene Sitzung) holen sich Einheiten mit einem Lease und schreiben jedes Firmenergebnis sofort
+# als Teilergebnis zurück. Läuft ein Lease ab (Worker abgestürzt oder hängt), wird die Einheit neu
+# vergeben; bereits geschriebene Teilergebnisse werden dabei übersprungen. Der Koordinator liest die
+# Teilergebnisse laufend und schreibt sie wie gewohnt in der ursprünglichen Reihenfolge.
+#
+# Die Warteschlange ist eine einzelne SQLite-Datei; für mehrere Rechner wird sie später durch
+# einen gemeinsamen Dienst mit derselben Schnittstelle ersetzt.
+
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+UNIT_PENDING = "pending"
+UNIT_LEASED = "leased"
+UNIT_DONE = "done"
+UNIT_FAILED = "failed"
+UNIT_CANCELLED = "cancelled"
+
+MAX_VERSUCHE = 3
+
+
+class LeaseVerloren(Exception):
+    """Die Einheit wurde inzwischen einem anderen Worker zugeteilt (Lease abgelaufen)"""
+
+
+class ArbeitsQueue:
+    """SQLite-Warteschlange für Arbeitseinheiten mit Leases und Teilergebnissen"""
+
+    def __init__(self, db_path, timeout=30.0):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        # Mehrere Prozesse greifen zu – WAL erlaubt Lesen während geschrieben wird
+        self._conn = sqlite3.connect(str(self.db_path), timeout=timeout, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    nr INTEGER NOT NULL,
+                    rollen TEXT NOT NULL,
+                    firmen TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER DEFAULT 0,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS units_run_status ON units (run_id, status);
+                CREATE TABLE IF NOT EXISTS results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id TEXT NOT NULL,
+                    unit_id INTEGER NOT NULL,
+                    key TEXT NOT NULL,
+                    contacts TEXT,
+                    UNIQUE (run_id, key)
+                );
+            """)
+
+    def _transaktion(self, sql_func):
+        """Führt sql_func(conn) in einer exklusiven Transaktion aus (atomar über Prozesse hinweg)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                ergebnis = sql_func(self._conn)
+                self._conn.execute("COMMIT")
+                return ergebnis
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def create_run(self, run_id, firmen, rollen, shard_size):
+        """Teilt [(key, firma)] in Einheiten zu shard_size Firmen; liefert die Zahl der Einheiten"""
+        firmen = list(firmen)
+        einheiten = [firmen[i:i + shard_size] for i in range(0, len(firmen), shard_size)]
+
+        def anlegen(conn):
+            conn.executemany(
+                "INSERT INTO units (run_id, nr, rollen, firmen, status) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, nr, json.dumps(list(rollen)), json.dumps(e, ensure_ascii=False), UNIT_PENDING)
+                 for nr, e in enumerate(einheiten)],
+            )
+        self._transaktion(anlegen)
+        return len(einheiten)
+
+    def claim(self, worker, lease_seconds, run_id=None):
+        """Vergibt die nächste freie Einheit (oder eine mit abgelaufenem Lease) an `worker`"""
+        def holen(conn):
+            jetzt = time.time()
+            sql = ("SELECT * FROM units WHERE (status = ? OR (status = ? AND lease_until < ?))"
+                   + (" AND run_id = ?" if run_id else "") + " ORDER BY id LIMIT 1")
+            params = (UNIT_PENDING, UNIT_LEASED, jetzt) + ((run_id,) if run_id else ())
+            row = conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= MAX_VERSUCHE:
+                conn.execute("UPDATE units SET status = ?, error = ? WHERE id = ?",
+                             (UNIT_FAILED, row["error"] or "Lease zu oft abgelaufen", row["id"]))
+                return "nochmal"
+            conn.execute("UPDATE units SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                         "WHERE id = ?", (UNIT_LEASED, worker, jetzt + lease_seconds, row["id"]))
+            return row
+
+        while True:
+            row = self._transaktion(holen)
+            if row != "nochmal":
+                break
+        if row is None:
+            return None
+        einheit = dict(row)
+        einheit["rollen"] = json.loads(einheit["rollen"])
+        einheit["firmen"] = json.loads(einheit["firmen"])
+        return einheit
+
+    def extend(self, unit_id, worker, lease_seconds):
+        """Verlängert das Lease; False, wenn die Einheit inzwischen einem anderen Worker gehört"""
+        def verlaengern(conn):
+            cur = conn.execute("UPDATE units SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                               (time.time() + lease_seconds, unit_id, worker, UNIT_LEASED))
+            return cur.rowcount == 1
+        return self._transaktion(verlaengern)
+
+    def done_keys(self, run_id, keys):
+        """Firmenschlüssel, für die schon ein Teilergebnis vorliegt"""
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM results WHERE run_id = ?", (run_id,)).fetchall()
+        vorhanden = {r["key"] for r in rows}
+        return {k for k in keys if k in vorhanden}
+
+    def put_result(self, run_id, unit_id, key, contacts):
+        """Teilergebnis einer Firma; contacts=None bedeutet Fehler (wird nicht gecacht)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO results (run_id, unit_id, key, contacts) VALUES (?, ?, ?, ?)",
+                (run_id, unit_id, key, None if contacts is None else json.dumps(contacts, ensure_ascii=False)),
+            )
+
+    def complete(self, unit_id, worker):
+        def abschliessen(conn):
+            conn.execute("UPDATE units SET status = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                         (UNIT_DONE, unit_id, worker))
+        self._transaktion(abschliessen)
+
+    def fail(self, unit_id, worker, error):
+        """Gibt eine Einheit nach einem Fehler zurück; nach MAX_VERSUCHE gilt sie als fehlgeschlagen"""
+        def zurueckgeben(conn):
+            conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL, "
+                "lease_until = NULL, error = ? WHERE id = ? AND worker = ?",
+                (MAX_VERSUCHE, UNIT_FAILED, UNIT_PENDING, str(error), unit_id, worker),
+            )
+        self._transaktion(zurueckgeben)
+
+    def results_since(self, run_id, last_id):
+        """Neue Teilergebnisse als [(id, key, contacts)]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, key, contacts FROM results WHERE run_id = ? AND id > ? ORDER BY id", (run_id, last_id)
+            ).fetchall()
+        return [(r["id"], r["key"], None if r["contacts"] is None else json.loads(r["contacts"])) for r in rows]
+
+    def failed_units(self, run_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, firmen, error FROM units WHERE run_id = ? AND status = ?",
+                                      (run_id, UNIT_FAILED)).fetchall()
+        return [(r["id"], json.loads(r["firmen"]), r["error"]) for r in rows]
+
+    def claimable_units(self, run_id):
+        """Einheiten eines Laufs, die gerade vergeben werden könnten (frei oder Lease abgelaufen)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM units WHERE run_id = ? AND (status = ? OR (status = ? AND lease_until < ?))",
+                (run_id, UNIT_PENDING, UNIT_LEASED, time.time()),
+            ).fetchone()[0]
+
+    def cancel_run(self, run_id):
+        def abbrechen(conn):
+            conn.execute("UPDATE units SET status = ? WHERE run_id = ? AND status IN (?, ?)",
+                         (UNIT_CANCELLED, run_id, UNIT_PENDING, UNIT_LEASED))
+        self._transaktion(abbrechen)
+
+    def purge_run(self, run_id):
+        """Entfernt einen abgeschlossenen Lauf (Ergebnisse liegen dann in Journal und Cache)"""
+        def loeschen(conn):
+            conn.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+            conn.execute("DELETE FROM units WHERE run_id = ?", (run_id,))
+        self._transaktion(loeschen)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def worker_id(nr):
+    return f"{socket.gethostname()}-{os.getpid()}-{nr}"
+
+
+def verteilt_scrapen(queue_path, run_id, zu_scrapen, rollen, worker_anzahl, shard_size, profile_muster,
+                     lease_seconds, pruefen=None, poll_interval=1.0):
+    """Koordinator: verteilt {key: firma} auf lokale Worker-Prozesse und liefert (key, contacts)
+
+    Die Ergebnisse kommen in der Reihenfolge, in der die Worker sie schreiben. Abgestürzte Worker
+    werden neu gestartet, solange noch Einheiten offen sind; ihre Einheiten werden nach Ablauf
+    des Leases neu vergeben. Bricht der Aufrufer ab, werden offene Einheiten storniert und die
+    Worker beendet.
+    """
+    queue = ArbeitsQueue(queue_path)
+    einheiten = queue.create_run(run_id, zu_scrapen.items(), rollen, shard_size)
+    worker_anzahl = max(1, min(worker_anzahl, einheiten))
+    print(f"🧩 Verteilt: {len(zu_scrapen)} Firmen in {einheiten} Einheiten auf {worker_anzahl} Worker-Prozesse")
+
+    skript = Path(__file__).with_name("verteilung_worker.py")
+    umgebung = {**os.environ, "SHARD_QUEUE_PATH": str(Path(queue_path).resolve())}
+
+    def starten(nr):
+        profil = Path(profile_muster.format(nr=nr)).resolve()
+        return subprocess.Popen(
+            [sys.executable, str(skript), "--run", run_id, "--profile", str(profil),
+             "--lease", str(lease_seconds), "--exit-when-idle"],
+            env=umgebung, stdin=subprocess.DEVNULL,
+        )
+
+    prozesse = {nr: starten(nr) for nr in range(1, worker_anzahl + 1)}
+    offen = set(zu_scrapen)
+    letzte_id = 0
+    neustarts = 0
+    try:
+        while offen:
+            neu = queue.results_since(run_id, letzte_id)
+            for ergebnis_id, key, contacts in neu:
+                letzte_id = ergebnis_id
+                if key in offen:
+                    offen.discard(key)
+                    yield key, contacts
+            for unit_id, firmen, error in queue.failed_units(run_id):
+                verloren = [key for key, _ in firmen if key in offen]
+                if verloren:
+                    print(f"❌ Einheit {unit_id} endgültig fehlgeschlagen ({error}), {len(verloren)} Firmen ohne Ergebnis")
+                for key in verloren:
+                    offen.discard(key)
+                    yield key, None
+            if neu or not offen:
+                continue
+            if pruefen:
+                pruefen()
+            if queue.claimable_units(run_id):
+                for nr, proc in list(prozesse.items()):
+                    if proc.poll() is None:
+                        continue
+                    if proc.returncode != 0:
+                        neustarts += 1
+                        if neustarts > worker_anzahl * MAX_VERSUCHE:
+                            raise RuntimeError("Worker-Prozesse stürzen wiederholt ab")
+                    print(f"🔁 Worker {nr} beendet (Code {proc.returncode}), starte neu")
+                    prozesse[nr] = starten(nr)
+            time.sleep(poll_interval)
+        queue.purge_run(run_id)
+    finally:
+        if offen:
+            queue.cancel_run(run_id)
+        for proc in prozesse.values():
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in prozesse.values():
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        queue.close()
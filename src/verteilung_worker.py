@@ -0,0 +1,94 @@
+# verteilung_worker.py – Worker-Prozess für verteilte Läufe (siehe verteilung.py)
+#
+# Holt Arbeitseinheiten aus der Warteschlange, sucht die Firmen mit eigener Sitzung (eigenes Profil,
+# eigener Login, eigene Pausen über den FirmenScheduler) und schreibt jedes Ergebnis sofort zurück.
+# Das Profil muss einmal manuell eingeloggt worden sein. Eine gespeicherte Anmeldung gilt nur je
+# Worker (Standard: session_state.json im Profil, anlegen mit anmeldung.py --login --pfad ...) –
+# die des Servers wird nie mitbenutzt. Job-Warteschlange und Lead-Cache des Servers bleiben unberührt.
+#
+#   python src/verteilung_worker.py --profile profile_shard1            # alle Läufe, dauerhaft
+#   python src/verteilung_worker.py --run <id> --exit-when-idle ...     # vom Koordinator gestartet
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+
+def bearbeiten(t, queue, einheit, ich, lease_seconds):
+    """Sucht die noch offenen Firmen einer Einheit und schreibt die Teilergebnisse"""
+    from verteilung import LeaseVerloren
+
+    run_id = einheit["run_id"]
+    rollen = einheit["rollen"]
+    erledigt = queue.done_keys(run_id, [key for key, _ in einheit["firmen"]])
+    firmen = [(key, firma) for key, firma in einheit["firmen"] if key not in erledigt]
+    matcher = t.build_rollen_matcher(rollen)
+    print(f"🧩 Einheit {einheit['id']} (Lauf {run_id}): {len(firmen)} Firmen, {len(erledigt)} schon erledigt")
+
+    letzte_verlaengerung = time.monotonic()
+
+    def lease_halten():
+        nonlocal letzte_verlaengerung
+        if time.monotonic() - letzte_verlaengerung < lease_seconds / 3:
+            return
+        if not queue.extend(einheit["id"], ich, lease_seconds):
+            raise LeaseVerloren(f"Einheit {einheit['id']}")
+        letzte_verlaengerung = time.monotonic()
+
+    ergebnisse = t.firmen_scheduler.imap_unordered(
+        f"einheit-{einheit['id']}", lambda page, firma: t.scrape_firma(page, firma, matcher, rollen),
+        [firma for _, firma in firmen], pruefen=lease_halten,
+    )
+    for idx, contacts in ergebnisse:
+        queue.put_result(run_id, einheit["id"], firmen[idx][0], contacts)
+        lease_halten()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker für verteilte Enrichment-Läufe")
+    parser.add_argument("--profile", required=True, help="eigenes Browser-Profil dieses Workers")
+    parser.add_argument("--state", help="gespeicherte Anmeldung dieses Workers (Standard: im Profil)")
+    parser.add_argument("--queue", help="Pfad der Warteschlange (Standard: SHARD_QUEUE_PATH)")
+    parser.add_argument("--run", help="nur Einheiten dieses Laufs bearbeiten")
+    parser.add_argument("--lease", type=int, default=600, help="Lease-Dauer in Sekunden")
+    parser.add_argument("--exit-when-idle", action="store_true", help="beenden, sobald keine Einheit frei ist")
+    parser.add_argument("--poll", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # testmain_neu liest Profil, Anmeldung und Worker-Modus beim Import
+    profil = Path(args.profile).resolve()
+    os.environ["PROFILE_DIR"] = str(profil)
+    os.environ["SESSION_STATE_PATH"] = str(Path(args.state).resolve() if args.state else profil / "session_state.json")
+    os.environ["SHARD_WORKER"] = "1"
+    import testmain_neu as t
+    from verteilung import ArbeitsQueue, LeaseVerloren, worker_id
+
+    queue = ArbeitsQueue(args.queue or t.SHARD_QUEUE_PATH)
+    ich = worker_id(1)
+    anmeldung = "gespeicherte Anmeldung" if t.anmeldung.vorhanden() else "Profil-Login"
+    print(f"👷 Verteilungs-Worker {ich} mit Profil {t.PROFILE_DIR} ({anmeldung})")
+    try:
+        while True:
+            einheit = queue.claim(ich, args.lease, run_id=args.run)
+            if einheit is None:
+                if args.exit_when_idle:
+                    break
+                time.sleep(args.poll)
+                continue
+            try:
+                bearbeiten(t, queue, einheit, ich, args.lease)
+            except LeaseVerloren as e:
+                print(f"⚠️ Lease verloren, Einheit wird anderweitig bearbeitet: {e}")
+            except Exception as e:
+                print(f"❌ Einheit {einheit['id']} fehlgeschlagen: {e}")
+                queue.fail(einheit["id"], ich, e)
+            else:
+                queue.complete(einheit["id"], ich)
+    finally:
+        t.firmen_scheduler.stop()
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# zeitleiste.py – Zeitleiste eines einzelnen Jobs im Chrome-Trace-Format
+#
+# Aggregierte Phasendauern (/metrics) erklären nicht, warum eine Firma 90 s brauchte und die nächste
+# 12 s. Mit Tracing nimmt ein Job jede Firma und jede Phase darin (Navigation, Tippen und Abschicken,
+# Karten, Rollenfilter, CSV-Schreiben, Wartezeiten, Pausen) als Span auf und schreibt sie als
+# Trace-Event-JSON – lesbar mit chrome://tracing, ui.perfetto.dev oder speedscope.
+# Zugeordnet wird über den Thread: aktiv() bindet die Zeitleiste an den aufrufenden Thread. Phasen
+# der gemeinsamen Sitzung ohne gebundene Zeitleiste (Pause, Login im Scheduler) gehen an alle
+# laufenden Zeitleisten. Läuft keine, ist auch kein Beobachter angemeldet.
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from phasen import add_observer, remove_observer
+
+SITZUNGS_PHASEN = ("pause", "login")
+
+_lokal = threading.local()
+_laufend = set()
+_lock = threading.Lock()
+
+
+def _beobachten(name, start, dauer, attrs):
+    zeitleiste = getattr(_lokal, "zeitleiste", None)
+    if zeitleiste is not None:
+        zeitleiste.eintragen(name, start, dauer, attrs)
+    elif name in SITZUNGS_PHASEN:
+        with _lock:
+            laufend = list(_laufend)
+        for zeitleiste in laufend:
+            zeitleiste.eintragen(name, start, dauer, attrs, kategorie="sitzung")
+
+
+class Zeitleiste:
+    """Spans eines Jobs; aufzeichnen() nimmt auf und speichert am Ende nach `pfad`"""
+
+    def __init__(self, pfad, name=None, max_ereignisse=500_000):
+        self.pfad = Path(pfad)
+        self.name = name or self.pfad.stem
+        self.max_ereignisse = max_ereignisse  # Obergrenze gegen unbegrenzt wachsende Traces
+        self.verworfen = 0
+        self._ereignisse = []
+        self._threads = {}  # Thread-ID -> Name
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def eintragen(self, name, start, dauer, attrs=None, kategorie="phase"):
+        """Ein abgeschlossener Span; start in time.perf_counter(), dauer in Sekunden"""
+        thread = threading.current_thread()
+        ereignis = {
+            "name": name, "cat": kategorie, "ph": "X", "pid": os.getpid(), "tid": thread.ident,
+            "ts": round((start - self._start) * 1e6, 1), "dur": round(dauer * 1e6, 1),
+        }
+        if attrs:
+            ereignis["args"] = attrs
+        with self._lock:
+            if len(self._ereignisse) >= self.max_ereignisse:
+                self.verworfen += 1
+                return
+            self._threads.setdefault(thread.ident, thread.name)
+            self._ereignisse.append(ereignis)
+
+    @contextmanager
+    def span(self, name, kategorie="phase", **attrs):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.eintragen(name, start, time.perf_counter() - start, attrs, kategorie)
+
+    @contextmanager
+    def aktiv(self):
+        """Phasen des aufrufenden Threads gehen für die Dauer des Blocks an diese Zeitleiste"""
+        vorher = getattr(_lokal, "zeitleiste", None)
+        _lokal.zeitleiste = self
+        try:
+            yield self
+        finally:
+            _lokal.zeitleiste = vorher
+
+    @contextmanager
+    def aufzeichnen(self):
+        """Nimmt auf, solange der Block läuft (im aufrufenden Thread aktiv), und speichert danach"""
+        with _lock:
+            if not _laufend:
+                add_observer(_beobachten)
+            _laufend.add(self)
+        try:
+            with self.aktiv(), self.span(self.name, kategorie="job"):
+                yield self
+        finally:
+            with _lock:
+                _laufend.discard(self)
+                if not _laufend:
+                    remove_observer(_beobachten)
+            self.speichern()
+
+    def speichern(self):
+        pid = os.getpid()
+        with self._lock:
+            ereignisse = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}]
+            ereignisse += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                           for tid, name in self._threads.items()]
+            ereignisse += self._ereignisse
+            verworfen = self.verworfen
+        tmp = self.pfad.with_name(self.pfad.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": ereignisse, "displayTimeUnit": "ms",
+                       "otherData": {"job": self.name, "verworfen": verworfen}}, f, default=str)
+        os.replace(tmp, self.pfad)